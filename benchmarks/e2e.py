@@ -0,0 +1,343 @@
+"""
+End-to-end benchmarks against a local Unmanic stand-in server.
+
+Runs polling, pagination, fan-out and mutation scenarios through Unmanic
+against StandInServer and reports requests per second, p50/p99 latency and
+peak RSS. The server runs in the same process, so the peak RSS includes
+it. Results are written as JSON so runs can be compared.
+
+Usage:
+    python -m benchmarks.e2e --tasks 100000 --latency 0.002 --output run.json
+    python -m benchmarks.e2e --compare run.json --output new.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from unmanic_api import Unmanic, UnmanicError
+from unmanic_api.__version__ import __version__
+from unmanic_api.testing import StandInServer
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+SCENARIOS = ("polling", "pagination", "fan_out", "mutations")
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """
+    Object holding the result of one benchmark scenario.
+
+    Attributes:
+
+    name: The scenario name.
+
+    requests: The number of API calls made.
+
+    errors: The number of API calls that raised UnmanicError.
+
+    duration: The wall clock duration in seconds.
+
+    requests_per_second: Throughput over the whole scenario.
+
+    p50: The median call latency in milliseconds.
+
+    p99: The 99th percentile call latency in milliseconds.
+
+    max: The slowest call latency in milliseconds.
+
+    peak_rss_kb: Peak resident set size of the process so far in KiB,
+        including the in-process stand-in server, None if unknown.
+    """
+
+    name: str
+    requests: int
+    errors: int
+    duration: float
+    requests_per_second: float
+    p50: float
+    p99: float
+    max: float
+    peak_rss_kb: Optional[int]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+
+    values: The sorted samples.
+
+    pct: The percentile, 0-100.
+
+    Returns:
+        float: The sample at that percentile, 0.0 if there are none.
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB, stand-in server included."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def run_calls(
+    name: str,
+    calls: List[Callable[[], Awaitable]],
+    concurrency: int = 1,
+) -> ScenarioResult:
+    """
+    Run calls with bounded concurrency, timing each one.
+
+    Args:
+
+    name: The scenario name.
+
+    calls: Zero-argument callables returning the awaitable to time.
+
+    concurrency: The maximum number of calls in flight.
+
+    Returns:
+        ScenarioResult: The timing summary.
+    """
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(calls)
+
+    async def worker() -> None:
+        nonlocal errors
+        for call in pending:
+            started = time.perf_counter()
+            try:
+                await call()
+            except UnmanicError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        name=name,
+        requests=len(latencies),
+        errors=errors,
+        duration=round(duration, 6),
+        requests_per_second=round(len(latencies) / duration, 2) if duration else 0.0,
+        p50=round(percentile(latencies, 50), 3),
+        p99=round(percentile(latencies, 99), 3),
+        max=round(latencies[-1], 3) if latencies else 0.0,
+        peak_rss_kb=peak_rss_kb(),
+    )
+
+
+async def polling(unmanic: Unmanic, requests: int) -> ScenarioResult:
+    """A control loop polling worker status and the head of the queue."""
+    calls = [
+        unmanic.get_workers_status if i % 2 == 0 else unmanic.get_pending_tasks
+        for i in range(requests)
+    ]
+    return await run_calls("polling", calls)
+
+
+async def pagination(unmanic: Unmanic, page_size: int) -> ScenarioResult:
+    """Walk the whole task history page by page."""
+    for attempt in range(5):
+        try:
+            total = (await unmanic.get_task_history(length=1)).recordsTotal
+            break
+        except UnmanicError:
+            if attempt == 4:
+                raise
+    calls = [
+        (lambda start=start: unmanic.get_task_history(start=start, length=page_size))
+        for start in range(0, total, page_size)
+    ]
+    return await run_calls("pagination", calls)
+
+
+async def fan_out(unmanic: Unmanic, requests: int, concurrency: int) -> ScenarioResult:
+    """Many concurrent reads, as a dashboard refreshing every panel at once."""
+    reads = (unmanic.get_settings, unmanic.get_workers_status, unmanic.get_version, unmanic.get_pending_tasks)
+    calls = [reads[i % len(reads)] for i in range(requests)]
+    return await run_calls("fan_out", calls, concurrency=concurrency)
+
+
+async def mutations(unmanic: Unmanic, requests: int) -> ScenarioResult:
+    """Alternating pause and resume of a worker."""
+    calls = [
+        (lambda: unmanic.pause_worker("W0")) if i % 2 == 0 else (lambda: unmanic.resume_worker("W0"))
+        for i in range(requests)
+    ]
+    return await run_calls("mutations", calls)
+
+
+async def run(
+    scenarios=SCENARIOS,
+    tasks: int = 1000,
+    workers: int = 4,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    requests: int = 200,
+    concurrency: int = 16,
+    page_size: int = 500,
+    seed: Optional[int] = 0,
+) -> Dict:
+    """
+    Start a stand-in server and run the scenarios against it.
+
+    Args:
+
+    scenarios: The scenario names to run.
+
+    tasks: The number of pending and completed tasks on the server.
+
+    workers: The number of workers on the server.
+
+    latency: Server side latency per request in seconds.
+
+    error_rate: Fraction of requests the server fails with HTTP 500.
+
+    requests: Calls per scenario (pagination walks the history instead).
+
+    concurrency: Calls in flight for the fan-out scenario.
+
+    page_size: Page length for pagination.
+
+    seed: Seed for error injection.
+
+    Returns:
+        Dict: The run parameters and a result per scenario.
+    """
+    parameters = {
+        "tasks": tasks,
+        "workers": workers,
+        "latency": latency,
+        "error_rate": error_rate,
+        "requests": requests,
+        "concurrency": concurrency,
+        "page_size": page_size,
+    }
+
+    results = []
+    async with StandInServer(
+        pending_tasks=tasks,
+        completed_tasks=tasks,
+        workers=workers,
+        latency=latency,
+        error_rate=error_rate,
+        seed=seed,
+    ) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            functions = {
+                "polling": lambda: polling(unmanic, requests),
+                "pagination": lambda: pagination(unmanic, page_size),
+                "fan_out": lambda: fan_out(unmanic, requests, concurrency),
+                "mutations": lambda: mutations(unmanic, requests),
+            }
+            for name in scenarios:
+                results.append(asdict(await functions[name]()))
+
+    return {
+        "unmanic_api": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+
+def compare(previous: Dict, current: Dict) -> List[str]:
+    """
+    Describe the change between two runs.
+
+    Args:
+
+    previous: An earlier run, as returned by run().
+
+    current: The new run.
+
+    Returns:
+        List: One line per scenario present in both runs.
+    """
+    before = {result["name"]: result for result in previous["results"]}
+    lines = []
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        changes = []
+        for key in ("requests_per_second", "p50", "p99"):
+            if old[key]:
+                changes.append(f"{key} {(result[key] - old[key]) / old[key] * 100:+.1f}%")
+        lines.append(f"{result['name']}: " + ", ".join(changes))
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario to run, repeatable. Defaults to all.")
+    parser.add_argument("--tasks", type=int, default=1000, help="Pending and completed tasks on the server (10 to 100000).")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Server latency per request in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failed with HTTP 500.")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per scenario.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Calls in flight for fan-out.")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="Compare against a previous results file.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(
+        scenarios=args.scenario or SCENARIOS,
+        tasks=args.tasks,
+        workers=args.workers,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        page_size=args.page_size,
+    ))
+
+    for result in report["results"]:
+        print(
+            f"{result['name']:<12} {result['requests']:>7} req "
+            f"{result['requests_per_second']:>10.1f} req/s "
+            f"p50 {result['p50']:>8.3f} ms  p99 {result['p99']:>8.3f} ms  "
+            f"errors {result['errors']}  peak rss {result['peak_rss_kb']} KiB (with server)"
+        )
+
+    if args.compare:
+        with open(args.compare) as fptr:
+            for line in compare(json.load(fptr), report):
+                print(line)
+
+    if args.output:
+        with open(args.output, "w") as fptr:
+            json.dump(report, fptr, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+Micro-benchmarks for the model parsers in unmanic_api.models.
+
+Times each from_dict parser over synthetic payloads at several scales and
+measures peak allocations with tracemalloc. Results are compared with a
+local baseline and the run fails when a parser regresses beyond the
+allowed ratio.
+
+The comparison is a local workflow and does not run in CI: timings depend
+on the machine and allocation counts on the Python version, so no baseline
+is checked in. Record one with --update-baseline on the machine doing the
+comparison, before the change under test; a baseline recorded under
+another Python version is ignored.
+
+Usage:
+    python -m benchmarks.parsers
+    python -m benchmarks.parsers --update-baseline
+    python -m benchmarks.parsers --scale 100000 --time-tolerance 1.2
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from unmanic_api.models import (
+    CompletedTask,
+    PendingTask,
+    Settings,
+    TaskHistory,
+    TaskQueue,
+    Worker,
+)
+from unmanic_api.testing import (
+    make_completed_tasks,
+    make_pending_tasks,
+    make_settings,
+    make_workers,
+)
+
+BASELINE = os.path.join(os.path.dirname(__file__), "parsers_baseline.json")
+SCALES = (10, 1000, 10000)
+
+
+@dataclass(frozen=True)
+class ParserResult:
+    """
+    Object holding the measurements of one parser at one scale.
+
+    Attributes:
+
+    name: The parser name.
+
+    scale: The number of items in the payload.
+
+    seconds: Best wall time to parse the whole payload.
+
+    ns_per_item: Best wall time per item in nanoseconds.
+
+    peak_bytes: Peak memory allocated while parsing the payload once.
+    """
+
+    name: str
+    scale: int
+    seconds: float
+    ns_per_item: float
+    peak_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.scale}]"
+
+
+def _each(parser: Callable[[dict], Any]) -> Callable[[List[dict]], Any]:
+    return lambda items: [parser(item) for item in items]
+
+
+def _container(items: List[dict]) -> dict:
+    return {"recordsTotal": len(items), "recordsFiltered": len(items), "results": items}
+
+
+# name -> (payload builder, parse function)
+CASES: Dict[str, Tuple[Callable[[int], Any], Callable[[Any], Any]]] = {
+    "Worker.from_dict": (make_workers, _each(Worker.from_dict)),
+    "PendingTask.from_dict": (make_pending_tasks, _each(PendingTask.from_dict)),
+    "CompletedTask.from_dict": (make_completed_tasks, _each(CompletedTask.from_dict)),
+    "Settings.from_dict": (lambda scale: [make_settings() for _ in range(scale)], _each(Settings.from_dict)),
+    "TaskQueue.from_dict": (lambda scale: _container(make_pending_tasks(scale)), TaskQueue.from_dict),
+    "TaskHistory.from_dict": (lambda scale: _container(make_completed_tasks(scale)), TaskHistory.from_dict),
+}
+
+
+def measure(name: str, scale: int, min_time: float = 0.2, repeat: int = 5) -> ParserResult:
+    """
+    Time and measure allocations of one parser at one scale.
+
+    Args:
+
+    name: The parser name, a key of CASES.
+
+    scale: The number of items in the payload.
+
+    min_time: Minimum seconds per timing round, loops are added to reach it.
+
+    repeat: The number of timing rounds; the best is kept.
+
+    Returns:
+        ParserResult: The measurements.
+    """
+    build, parse = CASES[name]
+    payload = build(scale)
+
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            parse(payload)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat - 1):
+            started = time.perf_counter()
+            for _ in range(loops):
+                parse(payload)
+            best = min(best, (time.perf_counter() - started) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        parse(payload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return ParserResult(
+        name=name,
+        scale=scale,
+        seconds=best,
+        ns_per_item=best / scale * 1e9,
+        peak_bytes=peak,
+    )
+
+
+def run(scales=SCALES, names=None, min_time: float = 0.2) -> List[ParserResult]:
+    """
+    Measure every parser at every scale.
+
+    Args:
+
+    scales: The payload sizes.
+
+    names: The parsers to measure, defaults to all of CASES.
+
+    min_time: Minimum seconds per timing round.
+
+    Returns:
+        List: A ParserResult per parser and scale.
+    """
+    return [
+        measure(name, scale, min_time=min_time)
+        for name in (names or CASES)
+        for scale in scales
+    ]
+
+
+def check(
+    results: List[ParserResult],
+    baseline: Dict[str, Dict],
+    time_tolerance: float = 1.5,
+    memory_tolerance: float = 1.1,
+) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Args:
+
+    results: The new measurements.
+
+    baseline: Stored measurements keyed by ParserResult.key.
+
+    time_tolerance: Allowed ratio of new to baseline time.
+
+    memory_tolerance: Allowed ratio of new to baseline peak allocations.
+
+    Returns:
+        List: A description of every regression, empty if there are none.
+    """
+    regressions = []
+    for result in results:
+        stored = baseline.get(result.key)
+        if stored is None:
+            continue
+        if result.seconds > stored["seconds"] * time_tolerance:
+            regressions.append(
+                f"{result.key}: {result.ns_per_item:.0f} ns/item, "
+                f"baseline {stored['ns_per_item']:.0f} ns/item"
+            )
+        if result.peak_bytes > stored["peak_bytes"] * memory_tolerance:
+            regressions.append(
+                f"{result.key}: peak {result.peak_bytes} bytes, "
+                f"baseline {stored['peak_bytes']} bytes"
+            )
+    return regressions
+
+
+def load_baseline(path: str = BASELINE) -> Dict[str, Dict]:
+    """
+    Load stored measurements keyed by ParserResult.key.
+
+    Returns:
+        Dict: The measurements, empty when there is no baseline or it was
+        recorded under another Python version.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fptr:
+        stored = json.load(fptr)
+    if tuple(stored.get("python", "").split(".")[:2]) != platform.python_version_tuple()[:2]:
+        return {}
+    return stored["results"]
+
+
+def save_baseline(results: List[ParserResult], path: str = BASELINE) -> None:
+    """Store measurements as the new baseline."""
+    with open(path, "w") as fptr:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": {result.key: asdict(result) for result in results},
+            },
+            fptr,
+            indent=2,
+            sort_keys=True,
+        )
+        fptr.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, action="append", help="Payload size, repeatable.")
+    parser.add_argument("--parser", action="append", choices=sorted(CASES), help="Parser to measure, repeatable.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round.")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=1.5, help="Allowed slowdown ratio.")
+    parser.add_argument("--memory-tolerance", type=float, default=1.1, help="Allowed allocation growth ratio.")
+    args = parser.parse_args(argv)
+
+    results = run(scales=args.scale or SCALES, names=args.parser, min_time=args.min_time)
+    for result in results:
+        print(f"{result.key:<32} {result.ns_per_item:>10.0f} ns/item {result.peak_bytes:>12} bytes peak")
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline for Python {platform.python_version()} at {args.baseline}, record one with --update-baseline")
+        return 0
+    regressions = check(
+        results,
+        baseline,
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Import-time benchmark for unmanic_api.
+
+Runs each import statement in a fresh interpreter with -X importtime and
+reports the cumulative import cost of the package and whether the HTTP
+stack (aiohttp, yarl, async_timeout) was loaded. Fails when the cost of a
+statement exceeds its budget or a light import pulls in the HTTP stack.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --output startup.json
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+HTTP_STACK = ("aiohttp", "yarl", "async_timeout")
+
+# statement -> (budget in microseconds, whether the HTTP stack may load)
+# The client import measures 250-400 ms, nearly all of it aiohttp; its
+# budget leaves room for noise but fails well before the cost doubles.
+STATEMENTS: Dict[str, tuple] = {
+    "import unmanic_api": (25000, False),
+    "import unmanic_api.exceptions": (25000, False),
+    "import unmanic_api.models": (100000, False),
+    "from unmanic_api import Unmanic": (500000, True),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class StartupResult:
+    """
+    Object holding the import cost of one statement.
+
+    Attributes:
+
+    statement: The import statement.
+
+    microseconds: Best cumulative time of the imports caused by the statement.
+
+    http_stack: Whether aiohttp, yarl or async_timeout were imported.
+
+    budget: The allowed microseconds.
+    """
+
+    statement: str
+    microseconds: int
+    http_stack: bool
+    budget: int
+
+
+def _importtime(statement: str) -> List[tuple]:
+    """Run a statement with -X importtime, returning (cumulative us, indent, module) per import."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        universal_newlines=True,
+        check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is not None:
+            imports.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    return imports
+
+
+def measure_once(statement: str) -> tuple:
+    """
+    Run a statement in a fresh interpreter with -X importtime.
+
+    Args:
+
+    statement: The import statement.
+
+    Returns:
+        tuple: Cumulative microseconds of the imports caused by the
+        statement, whether the HTTP stack loaded.
+    """
+    startup = {module for _, _, module in _importtime("pass")}
+
+    total = 0
+    http_stack = False
+    for cumulative, indent, module in _importtime(statement):
+        # Top-level entries have the smallest indent; nested ones are
+        # already included in their parent's cumulative time.
+        if indent == 1 and module not in startup:
+            total += cumulative
+        if module in HTTP_STACK:
+            http_stack = True
+    return total, http_stack
+
+
+def measure(statement: str, repeat: int = 5) -> StartupResult:
+    """
+    Measure a statement, keeping the best of several runs.
+
+    Args:
+
+    statement: The import statement, a key of STATEMENTS.
+
+    repeat: The number of runs.
+
+    Returns:
+        StartupResult: The measurement.
+    """
+    budget, _ = STATEMENTS[statement]
+    runs = [measure_once(statement) for _ in range(repeat)]
+    return StartupResult(
+        statement=statement,
+        microseconds=min(total for total, _ in runs),
+        http_stack=any(http_stack for _, http_stack in runs),
+        budget=budget,
+    )
+
+
+def check(results: List[StartupResult]) -> List[str]:
+    """
+    Find statements over budget or loading the HTTP stack when they should not.
+
+    Args:
+
+    results: The measurements.
+
+    Returns:
+        List: A description of every failure, empty if there are none.
+    """
+    failures = []
+    for result in results:
+        _, http_allowed = STATEMENTS[result.statement]
+        if result.microseconds > result.budget:
+            failures.append(f"{result.statement!r}: {result.microseconds} us, budget {result.budget} us")
+        if result.http_stack and not http_allowed:
+            failures.append(f"{result.statement!r}: imports the HTTP stack")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    results = [measure(statement, args.repeat) for statement in STATEMENTS]
+    for result in results:
+        stack = "http stack" if result.http_stack else "no http stack"
+        print(f"{result.statement:<36} {result.microseconds:>9} us  {stack}")
+
+    if args.output:
+        with open(args.output, "w") as fptr:
+            json.dump([asdict(result) for result in results], fptr, indent=2)
+
+    failures = check(results)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+Synchronous client example.
+
+Connect to Unmanic instance from synchronous code, print the version number and the status of each worker.
+"""
+from unmanic_api import SyncUnmanic
+
+def main():
+    with SyncUnmanic('localhost') as unmanic:
+        print(unmanic.get_version())
+        for worker in unmanic.get_workers_status():
+            print(f"{worker.name}: {'idle' if worker.idle else worker.current_file}")
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,10 @@ setup(
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
     description="Asynchronous Python client for Unmanic.",
+    extras_require={"parquet": ["pyarrow"]},
+    entry_points={
+        "console_scripts": ["unmanic-api=unmanic_api.cli:main"],
+    },
     include_package_data=True,
     version=get_version(),
     install_requires=[val.strip() for val in open("requirements.txt")],
@@ -0,0 +1,47 @@
+"""Tests for the Unmanic-API benchmarks."""
+import json
+
+from benchmarks import parsers
+
+
+def test_parser_benchmarks() -> None:
+    """Test every parser is measured at every scale."""
+    results = parsers.run(scales=(1, 5), min_time=0.001)
+
+    assert len(results) == len(parsers.CASES) * 2
+    for result in results:
+        assert result.seconds > 0
+        assert result.peak_bytes > 0
+
+def test_parser_benchmarks_check() -> None:
+    """Test regressions beyond the tolerance are reported."""
+    result = parsers.measure("PendingTask.from_dict", 10, min_time=0.001)
+    baseline = {
+        result.key: {
+            "seconds": result.seconds / 10,
+            "ns_per_item": result.ns_per_item / 10,
+            "peak_bytes": result.peak_bytes,
+        }
+    }
+
+    regressions = parsers.check([result], baseline)
+    assert len(regressions) == 1
+    assert "ns/item" in regressions[0]
+
+    assert parsers.check([result], baseline, time_tolerance=100) == []
+    assert parsers.check([result], {}) == []
+
+def test_parser_baseline_python_version(tmp_path) -> None:
+    """Test a baseline recorded under another Python version is ignored."""
+    results = [parsers.measure("PendingTask.from_dict", 10, min_time=0.001)]
+    path = str(tmp_path / "baseline.json")
+
+    parsers.save_baseline(results, path)
+    assert list(parsers.load_baseline(path)) == [results[0].key]
+
+    with open(path) as fptr:
+        stored = json.load(fptr)
+    stored["python"] = "2.7.18"
+    with open(path, "w") as fptr:
+        json.dump(stored, fptr)
+    assert parsers.load_baseline(path) == {}
@@ -0,0 +1,167 @@
+"""Tests for Unmanic-API bulk operations."""
+import asyncio
+import datetime
+
+import pytest
+from unmanic_api import Unmanic, UnmanicError
+from unmanic_api.bulk import batches, scan_paths, submit_batches
+from unmanic_api.testing import StandInServer, make_completed_tasks
+
+
+@pytest.mark.asyncio
+async def test_submit_batches_concurrency():
+    """Test batches are bounded in flight and failures marked per item."""
+    in_flight = 0
+    peak = 0
+
+    async def submit(batch):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if 13 in batch:
+            raise UnmanicError("Injected")
+        return 7 not in batch
+
+    report = await submit_batches(range(1, 41), submit, batch_size=5, concurrency=3)
+
+    assert peak == 3
+    assert report.batches == 8
+    assert sorted(report.failed) == [6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+    assert len(report.succeeded) == 30
+    assert {outcome.error for outcome in report.outcomes if not outcome.success} == {"rejected by server", "UnmanicError: Injected"}
+
+@pytest.mark.asyncio
+async def test_batches_async_source():
+    """Test async sources are grouped with a short final batch."""
+    async def source():
+        for item in range(7):
+            yield item
+
+    assert [batch async for batch in batches(source(), 3)] == [[0, 1, 2], [3, 4, 5], [6]]
+
+@pytest.mark.asyncio
+async def test_requeue_failed_tasks():
+    """Test failed history tasks are reprocessed in batches."""
+    async with StandInServer(pending_tasks=0, completed_tasks=0) as server:
+        server.history = make_completed_tasks(100, failure_every=4)
+        async with Unmanic(server.host, server.port) as unmanic:
+            report = await unmanic.requeue_failed_tasks(batch_size=10, concurrency=2, page_size=30)
+
+    assert sorted(report.succeeded) == list(range(4, 101, 4))
+    assert report.failed == []
+    assert report.batches == 3
+    assert server.requests["v2/history/reprocess"] == 3
+    assert len(server.pending) == 25
+
+@pytest.mark.asyncio
+async def test_requeue_failed_tasks_history_shrinks():
+    """Test history entries removed by reprocessing do not shift later pages."""
+    async with StandInServer(pending_tasks=0, completed_tasks=0) as server:
+        server.history = make_completed_tasks(100, failure_every=4)
+        async with Unmanic(server.host, server.port) as unmanic:
+            reprocess = unmanic.reprocess_history_tasks
+
+            async def reprocess_and_remove(id_list, library_id=None):
+                success = await reprocess(id_list, library_id)
+                server.history = [task for task in server.history if task["id"] not in id_list]
+                return success
+
+            unmanic.reprocess_history_tasks = reprocess_and_remove
+            report = await unmanic.requeue_failed_tasks(batch_size=5, concurrency=1, page_size=10)
+
+    assert report.succeeded == list(range(4, 101, 4))
+
+@pytest.mark.asyncio
+async def test_prune_task_history():
+    """Test pruning by age, state and label, with a dry run first."""
+    async with StandInServer(pending_tasks=0, completed_tasks=0) as server:
+        server.history = make_completed_tasks(60, failure_every=3)
+        for task in server.history[:10]:
+            task["task_label"] = task["task_label"].replace(".mkv", ".avi")
+        async with Unmanic(server.host, server.port) as unmanic:
+            plan = await unmanic.prune_task_history(older_than=datetime.timedelta(minutes=30), success=True, dry_run=True, page_size=25)
+            assert (plan.scanned, plan.matched, plan.deleted) == (60, 20, None)
+            assert len(server.history) == 60
+
+            pruned = await unmanic.prune_task_history(older_than=datetime.timedelta(minutes=30), success=True, batch_size=7, rate=100)
+            assert pruned.matched == 20
+            assert len(pruned.deleted.succeeded) == 20
+            assert pruned.deleted.batches == 3
+
+            pruned = await unmanic.prune_task_history(label_pattern="*.avi")
+            assert pruned.matched == 10
+
+    assert len(server.history) == 30
+    assert all(task["task_success"] is False or task["finish_time"] > server.history[0]["finish_time"] - 1800 for task in server.history)
+
+@pytest.mark.asyncio
+async def test_submit_batches_rate():
+    """Test the rate limit spaces out batch requests."""
+    async def submit(batch):
+        return True
+
+    report = await submit_batches(range(50), submit, batch_size=10, concurrency=5, rate=50)
+
+    assert report.batches == 5
+    assert report.elapsed >= 0.075
+
+@pytest.mark.asyncio
+async def test_enqueue_paths(tmp_path):
+    """Test a directory walk is enqueued, skipping queued and repeated paths."""
+    for directory in ("a", "a/b", "c"):
+        (tmp_path / directory).mkdir()
+        for index in range(3):
+            (tmp_path / directory / f"file_{index}.mkv").write_text("")
+        (tmp_path / directory / "notes.txt").write_text("")
+
+    paths = [path async for path in scan_paths(str(tmp_path), [".MKV"])]
+    assert len(paths) == 9
+    assert paths[0] == str(tmp_path / "a" / "file_0.mkv")
+
+    reports = []
+    async with StandInServer(pending_tasks=0) as server:
+        server._add_pending(paths[0])
+        async with Unmanic(server.host, server.port) as unmanic:
+            report = await unmanic.enqueue_paths(scan_paths(str(tmp_path), [".mkv"]), concurrency=3, progress=reports.append)
+            again = await unmanic.enqueue_paths(paths + paths[:2])
+
+    assert report.skipped == 1
+    assert sorted(report.succeeded) == sorted(paths[1:])
+    assert len(server.pending) == 9
+    assert reports[-1].succeeded == 8
+    assert (again.skipped, again.batches) == (11, 0)
+
+@pytest.mark.asyncio
+async def test_remove_pending_tasks_retries():
+    """Test removal by predicate in batches, retrying failed batches."""
+    async with StandInServer(pending_tasks=100) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            server.add_fault("status", route="v2/pending/tasks", count=2, status=500)
+            report = await unmanic.remove_pending_tasks(list(range(1, 11)), batch_size=5, concurrency=1, retries=2)
+            assert sorted(report.succeeded) == list(range(1, 11))
+
+            report = await unmanic.remove_pending_tasks(lambda task: task.id % 2 == 0, batch_size=20)
+            assert report.batches == 3
+            assert len(report.succeeded) == 45
+
+            server.add_fault("status", route="v2/pending/tasks", count=None, status=500)
+            report = await unmanic.remove_pending_tasks([11, 13], retries=1)
+            assert report.failed == [11, 13]
+
+    assert len(server.pending) == 45
+
+@pytest.mark.asyncio
+async def test_set_pending_priority():
+    """Test tasks are moved to either end of the queue in batches."""
+    async with StandInServer(pending_tasks=30) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            report = await unmanic.set_pending_priority(lambda task: task.id % 5 == 0, batch_size=2)
+            assert report.batches == 3
+            assert sorted(report.succeeded) == [5, 10, 15, 20, 25, 30]
+
+            await unmanic.set_pending_priority([25, 30], position="bottom")
+
+    assert sorted(server.queue_order()[:4]) == [5, 10, 15, 20]
+    assert sorted(server.queue_order()[-2:]) == [25, 30]
@@ -0,0 +1,78 @@
+"""Tests for Unmanic-API capability negotiation."""
+import pytest
+from unmanic_api import (
+    ClientRegistry,
+    Unmanic,
+    UnmanicUnsupportedOperationError,
+)
+from unmanic_api.capabilities import OPERATIONS, Endpoint, parse_version
+from unmanic_api.testing import StandInServer
+
+
+def test_parse_version():
+    """Test Unmanic version strings are parsed."""
+    assert parse_version("0.1.4~655b18b") == (0, 1, 4)
+    assert parse_version("v0.2.0") == (0, 2, 0)
+    assert parse_version("unknown") is None
+    assert parse_version(None) is None
+
+@pytest.mark.asyncio
+async def test_unsupported_by_version_fails_locally(monkeypatch):
+    """Test operations newer than the server fail without a round trip."""
+    monkeypatch.setitem(OPERATIONS, "create_pending_task", [Endpoint("POST", "v2/pending/create", (0, 2, 0))])
+    async with StandInServer(version="0.1.9") as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            assert await unmanic.reorder_pending_tasks([1])
+            with pytest.raises(UnmanicUnsupportedOperationError):
+                await unmanic.create_pending_task("/library/x.mkv")
+            capabilities = await unmanic.get_capabilities()
+            assert capabilities.version == "0.1.9"
+            assert not capabilities.supports("create_pending_task")
+
+    assert server.requests["v2/version/read"] == 1
+    assert "v2/pending/create" not in server.requests
+
+@pytest.mark.asyncio
+async def test_missing_endpoint_is_remembered():
+    """Test a 404 marks the endpoint unsupported for later calls."""
+    async with StandInServer(version="custom-build") as server:
+        server.add_fault("status", route="v2/pending/reorder", status=404)
+        async with Unmanic(server.host, server.port) as unmanic:
+            for _ in range(3):
+                with pytest.raises(UnmanicUnsupportedOperationError):
+                    await unmanic.reorder_pending_tasks([1])
+            assert await unmanic.delete_pending_tasks([1])
+
+    assert server.requests["v2/pending/reorder"] == 1
+    assert "v2/version/read" not in server.requests
+
+@pytest.mark.asyncio
+async def test_registry_shares_capabilities(monkeypatch):
+    """Test handles on one registry entry detect the version once."""
+    monkeypatch.setitem(OPERATIONS, "delete_pending_tasks", [Endpoint("DELETE", "v2/pending/tasks", (0, 1, 0))])
+    registry = ClientRegistry()
+    async with StandInServer() as server:
+        async with registry.client(server.host, server.port) as first:
+            async with registry.client(server.host, server.port) as second:
+                await first.delete_pending_tasks([1])
+                await second.delete_pending_tasks([2])
+
+    assert server.requests["v2/version/read"] == 1
+
+@pytest.mark.asyncio
+async def test_next_endpoint_after_404(monkeypatch):
+    """Test a 404 falls through to the next listed endpoint."""
+    monkeypatch.setitem(OPERATIONS, "delete_pending_tasks", [
+        Endpoint("DELETE", "v3/pending/tasks", (0, 3, 0)),
+        Endpoint("POST", "v2/pending/bulk-delete"),
+        Endpoint("DELETE", "v2/pending/tasks"),
+    ])
+    async with StandInServer(version="0.3.1") as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            assert await unmanic.delete_pending_tasks([1])
+            assert await unmanic.delete_pending_tasks([2])
+            assert (await unmanic.get_capabilities()).endpoint("delete_pending_tasks").uri == "v2/pending/tasks"
+
+    assert server.requests["v3/pending/tasks"] == 1
+    assert server.requests["v2/pending/bulk-delete"] == 1
+    assert server.requests["v2/pending/tasks"] == 2
@@ -0,0 +1,98 @@
+"""Tests for the Unmanic-API command line interface."""
+import io
+import json
+
+import pytest
+from unmanic_api import cli
+from unmanic_api.testing import StandInServer
+
+
+async def _run(argv):
+    out = io.StringIO()
+    code = await cli.run(cli.parse_args(argv), out=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_parse_host() -> None:
+    """Test host arguments with and without ports."""
+    assert cli.parse_host("node1", 8888) == ("node1", 8888)
+    assert cli.parse_host("node1:9000", 8888) == ("node1", 9000)
+    assert cli.parse_host("[::1]:9000", 8888) == ("::1", 9000)
+    assert cli.parse_host("[::1]", 8888) == ("::1", 8888)
+
+@pytest.mark.asyncio
+async def test_cli_many_hosts():
+    """Test a command runs against every host with one line per host."""
+    async with StandInServer() as first, StandInServer(version="0.1.4") as second:
+        code, records = await _run([
+            "--host", f"{first.host}:{first.port}",
+            "--host", f"{second.host}:{second.port}",
+            "version",
+        ])
+
+    assert code == 0
+    assert sorted(record["version"] for record in records) == ["0.1.4", first.version]
+
+@pytest.mark.asyncio
+async def test_cli_history_streams_tasks():
+    """Test history writes one line per task."""
+    async with StandInServer(completed_tasks=250) as server:
+        code, records = await _run(["--host", f"{server.host}:{server.port}", "history", "--length", "1000"])
+
+    assert code == 0
+    assert len(records) == 250
+    assert records[0]["host"] == f"{server.host}:{server.port}"
+    assert set(records[0]) == {"host", "id", "task_label", "task_success", "finish_time"}
+
+@pytest.mark.asyncio
+async def test_cli_mutations():
+    """Test pause and scale change the server state."""
+    async with StandInServer(workers=2) as server:
+        host = f"{server.host}:{server.port}"
+        code, records = await _run(["--host", host, "pause"])
+        assert code == 0
+        assert records == [{"host": host, "worker_id": None, "success": True}]
+        assert all(worker["paused"] for worker in server.workers)
+
+        code, records = await _run(["--host", host, "scale", "6"])
+        assert records[0]["success"] is True
+        assert server.settings["number_of_workers"] == 6
+
+@pytest.mark.asyncio
+async def test_cli_watch_reuses_connection():
+    """Test watch mode refreshes over the same session."""
+    async with StandInServer() as server:
+        code, records = await _run([
+            "--host", f"{server.host}:{server.port}",
+            "--watch", "0.01", "--iterations", "3",
+            "workers",
+        ])
+
+    assert code == 0
+    assert len(records) == 3 * 4
+    assert all("time" in record for record in records)
+    assert server.requests["v2/workers/status"] == 3
+
+@pytest.mark.asyncio
+async def test_cli_error():
+    """Test failures are reported as records and in the exit code."""
+    async with StandInServer(error_rate=1.0) as server:
+        code, records = await _run(["--host", f"{server.host}:{server.port}", "settings"])
+
+    assert code == 1
+    assert records[0]["error"] == "UnmanicInternalServerError"
+
+@pytest.mark.asyncio
+async def test_cli_host_failure_isolated():
+    """Test a host failing mid-stream gets an error record while the others finish."""
+    async with StandInServer(completed_tasks=200) as broken, StandInServer(completed_tasks=30) as healthy:
+        broken.add_fault("truncate", route="v2/history/tasks")
+        code, records = await _run([
+            "--host", f"{broken.host}:{broken.port}",
+            "--host", f"{healthy.host}:{healthy.port}",
+            "history", "--length", "1000",
+        ])
+
+    assert code == 1
+    errors = [record for record in records if "error" in record]
+    assert [(record["host"], record["error"]) for record in errors] == [(f"{broken.host}:{broken.port}", "UnmanicConnectionError")]
+    assert len([record for record in records if record["host"] == f"{healthy.host}:{healthy.port}"]) == 30
@@ -1,5 +1,7 @@
 """Tests for Unmanic-API Client."""
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from aiohttp import ClientSession, ClientError
@@ -197,4 +199,62 @@ async def test_request_port(aresponses):
             host=HOST, port=NON_STANDARD_PORT, session=session
         )
         response = await client._request("v2/version/read")
-        assert response["version"] == "0.1.4~655b18b"
\ No newline at end of file
+        assert response["version"] == "0.1.4~655b18b"
+
+@pytest.mark.asyncio
+async def test_large_response_decoded_in_executor(aresponses):
+    """Test JSON bodies above the threshold are decoded off the event loop."""
+    aresponses.add(
+        MATCH_HOST,
+        "/unmanic/api/v2/version/read",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"version": "0.1.4~655b18b"}',
+        ),
+    )
+
+    decode_threads = []
+
+    def parser(data):
+        decode_threads.append(threading.current_thread())
+        return data["version"]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        async with ClientSession() as session:
+            client = Client(
+                HOST, PORT, session=session, decode_threshold=0, decode_executor=executor
+            )
+            response = await client._request("v2/version/read", parser=parser)
+            assert response == "0.1.4~655b18b"
+
+    assert decode_threads
+    assert decode_threads[0] is not threading.current_thread()
+
+@pytest.mark.asyncio
+async def test_small_response_decoded_inline(aresponses):
+    """Test JSON bodies below the threshold are decoded on the event loop."""
+    aresponses.add(
+        MATCH_HOST,
+        "/unmanic/api/v2/version/read",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"version": "0.1.4~655b18b"}',
+        ),
+    )
+
+    decode_threads = []
+
+    def parser(data):
+        decode_threads.append(threading.current_thread())
+        return data["version"]
+
+    async with ClientSession() as session:
+        client = Client(HOST, PORT, session=session)
+        response = await client._request("v2/version/read", parser=parser)
+        assert response == "0.1.4~655b18b"
+
+    assert decode_threads == [threading.current_thread()]
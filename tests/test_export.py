@@ -0,0 +1,72 @@
+"""Tests for the Unmanic-API exporters."""
+import csv
+import io
+import json
+
+import pytest
+from unmanic_api import Unmanic, UnmanicError
+from unmanic_api.export import detect_format, export_pending_tasks, export_task_history
+from unmanic_api.testing import StandInServer
+
+
+@pytest.mark.asyncio
+async def test_iter_task_history():
+    """Test every task is yielded once, fetching one page at a time."""
+    async with StandInServer(completed_tasks=25) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            pages = unmanic.iter_task_history(page_size=10)
+            ids = [task.id async for task in pages]
+
+    assert sorted(ids) == list(range(1, 26))
+    assert pages.pages == 3
+    assert pages.recordsFiltered == 25
+
+@pytest.mark.asyncio
+async def test_export_task_history_csv(tmp_path):
+    """Test history exports to CSV in batches with progress."""
+    path = tmp_path / "history.csv"
+    reports = []
+    async with StandInServer(completed_tasks=25) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            rows = await export_task_history(unmanic, str(path), page_size=7, batch_size=10, progress=reports.append)
+
+    assert rows == 25
+    with open(path, newline="") as fptr:
+        records = list(csv.DictReader(fptr))
+    assert list(records[0]) == ["id", "task_label", "task_success", "finish_time"]
+    assert len(records) == 25
+    assert [report.rows for report in reports] == [10, 20, 25]
+    assert reports[-1].total == 25
+
+@pytest.mark.asyncio
+async def test_export_pending_tasks_jsonl():
+    """Test the queue exports to JSON Lines on an open file."""
+    out = io.StringIO()
+    async with StandInServer(pending_tasks=12) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            rows = await export_pending_tasks(unmanic, out, format="jsonl", page_size=5)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows == len(records) == 12
+    assert set(records[0]) == {"id", "abspath", "priority", "type", "status"}
+
+@pytest.mark.asyncio
+async def test_export_task_history_parquet(tmp_path):
+    """Test history exports to Parquet with one row group per batch."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "history.parquet"
+    async with StandInServer(completed_tasks=25) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            await export_task_history(unmanic, str(path), batch_size=10)
+
+    parquet = pq.ParquetFile(str(path))
+    assert parquet.metadata.num_rows == 25
+    assert parquet.metadata.num_row_groups == 3
+    assert str(parquet.schema_arrow.field("finish_time").type).startswith("timestamp")
+
+def test_detect_format():
+    """Test the format is taken from the file extension."""
+    assert detect_format("out.ndjson") == "jsonl"
+    assert detect_format("OUT.Parquet") == "parquet"
+    with pytest.raises(UnmanicError):
+        detect_format("out.xlsx")
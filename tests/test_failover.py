@@ -0,0 +1,72 @@
+"""Tests for the Unmanic-API failover transport."""
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from unmanic_api import FailoverTransport, Unmanic, UnmanicConnectionError
+from unmanic_api.testing import StandInServer
+
+
+@pytest.mark.asyncio
+async def test_failover_skips_unreachable_primary():
+    """Test a refused primary fails over at once and is marked unhealthy."""
+    async with StandInServer() as down:
+        primary = f"{down.host}:{down.port}"
+
+    async with StandInServer(pending_tasks=5) as server:
+        async with FailoverTransport([primary, f"http://{server.host}:{server.port}"], interval=None) as transport:
+            async with Unmanic("ignored", 1, transport=transport) as unmanic:
+                started = time.perf_counter()
+                queue = await unmanic.get_pending_tasks()
+                assert time.perf_counter() - started < 0.5
+                assert queue.recordsTotal == 5
+
+                assert transport.failovers == 1
+                assert not transport.health[0].healthy
+                assert transport.active.port == server.port
+
+                await unmanic.get_version()
+                assert transport.failovers == 1
+
+                await transport.check()
+                assert transport.health[0].error.startswith("ClientConnectorError")
+                assert transport.health[1].latency is not None
+
+@pytest.mark.asyncio
+async def test_failover_routes_to_fastest():
+    """Test health checks route to the fastest endpoint and fail back when it goes down."""
+    async with StandInServer(latency=0.05) as slow, StandInServer() as fast:
+        endpoints = [f"{slow.host}:{slow.port}", f"{fast.host}:{fast.port}"]
+        async with FailoverTransport(endpoints, interval=0.02) as transport:
+            async with Unmanic(transport=transport) as unmanic:
+                assert transport.active.port == slow.port
+                await unmanic.get_version()
+                while transport.health[0].latency is None:
+                    await transport.check()
+                assert transport.active.port == fast.port
+
+                await unmanic.get_version()
+                await fast.close()
+                assert await unmanic.get_version() == slow.version
+                assert transport.active.port == slow.port
+
+                await slow.close()
+                with pytest.raises(UnmanicConnectionError):
+                    await unmanic.get_version()
+
+    assert fast.requests["v2/version/read"] >= 2
+
+@pytest.mark.asyncio
+async def test_failover_saturated_pool():
+    """Test waiting for a pooled connection does not mark an endpoint unhealthy."""
+    async with StandInServer(latency=0.5) as server:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=2)) as session:
+            transport = FailoverTransport([f"{server.host}:{server.port}"], interval=None, connect_timeout=0.2, session=session)
+            async with Unmanic(transport=transport) as unmanic:
+                versions = await asyncio.gather(*(unmanic.get_version() for _ in range(4)))
+
+            assert versions == [server.version] * 4
+            assert transport.health[0].healthy
+            assert transport.failovers == 0
+            await transport.close()
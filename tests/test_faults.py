@@ -0,0 +1,103 @@
+"""Tests for Unmanic-API behaviour against a misbehaving server."""
+import time
+
+import pytest
+from aiohttp import ClientSession, TCPConnector
+from unmanic_api import (
+    MetricsRegistry,
+    Unmanic,
+    UnmanicBadRequestRequestedMethodNotAllowedError,
+    UnmanicConnectionError,
+    UnmanicError,
+    UnmanicInternalServerError,
+)
+from unmanic_api.testing import StandInServer
+
+TIMEOUT = 0.3
+
+FAULTS = [
+    ("slow_first_byte", {"delay": 1}, UnmanicConnectionError),
+    ("trickle", {"delay": 0.05, "chunk_size": 8}, UnmanicConnectionError),
+    ("reset", {}, UnmanicConnectionError),
+    ("status", {"status": 500}, UnmanicInternalServerError),
+    ("status", {"status": 405}, UnmanicBadRequestRequestedMethodNotAllowedError),
+    ("truncate", {}, UnmanicConnectionError),
+    ("invalid_json", {}, UnmanicError),
+    ("content_type", {}, UnmanicError),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind,options,error", FAULTS)
+async def test_fault_releases_connection(kind, options, error):
+    """Test each fault raises promptly and returns the connection to the pool."""
+    async with StandInServer(pending_tasks=50) as server:
+        connector = TCPConnector(limit=1)
+        async with ClientSession(connector=connector) as session:
+            unmanic = Unmanic(server.host, server.port, request_timeout=TIMEOUT, session=session)
+            fault = server.add_fault(kind, route="v2/pending/tasks", **options)
+
+            started = time.perf_counter()
+            with pytest.raises(error):
+                await unmanic.get_pending_tasks(length=50)
+            elapsed = time.perf_counter() - started
+
+            assert fault.applied == 1
+            assert elapsed < TIMEOUT * 2
+            assert len(connector._acquired) == 0
+
+            # With a pool of one, a leaked connection would make this time out.
+            assert len((await unmanic.get_pending_tasks(length=50)).results) == 50
+
+@pytest.mark.asyncio
+async def test_error_burst_tail_latency():
+    """Test a burst of 500s neither slows later calls nor exhausts the pool."""
+    async with StandInServer() as server:
+        connector = TCPConnector(limit=2)
+        async with ClientSession(connector=connector) as session:
+            unmanic = Unmanic(server.host, server.port, request_timeout=TIMEOUT, session=session)
+            server.add_fault("status", route="v2/version/read", count=20, status=500)
+
+            durations = []
+            for _ in range(40):
+                started = time.perf_counter()
+                try:
+                    await unmanic.get_version()
+                except UnmanicInternalServerError:
+                    pass
+                durations.append(time.perf_counter() - started)
+
+            assert server.requests["v2/version/read"] == 40
+            assert max(durations) < TIMEOUT
+            assert len(connector._acquired) == 0
+
+STREAM_FAULTS = [
+    ("trickle", {"delay": 0.05, "chunk_size": 8}, UnmanicConnectionError),
+    ("truncate", {}, UnmanicConnectionError),
+    ("invalid_json", {}, UnmanicError),
+    ("content_type", {}, UnmanicError),
+]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind,options,error", STREAM_FAULTS)
+async def test_stream_fault(kind, options, error):
+    """Test streamed calls honour the timeout and raise Unmanic errors on bad bodies."""
+    registry = MetricsRegistry()
+    async with StandInServer(completed_tasks=50) as server:
+        connector = TCPConnector(limit=1)
+        async with ClientSession(connector=connector) as session:
+            unmanic = Unmanic(server.host, server.port, request_timeout=TIMEOUT, session=session, metrics=registry)
+            server.add_fault(kind, route="v2/history/tasks", **options)
+
+            started = time.perf_counter()
+            with pytest.raises(error):
+                async with unmanic.stream_task_history(length=50) as history:
+                    [task async for task in history]
+            assert time.perf_counter() - started < TIMEOUT * 2
+            assert len(connector._acquired) == 0
+
+            async with unmanic.stream_task_history(length=50) as history:
+                assert len([task async for task in history]) == 50
+
+    assert registry.requests[("v2/history/tasks", "POST")] == 2
+    assert sum(registry.errors.values()) == 1
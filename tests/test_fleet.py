@@ -0,0 +1,80 @@
+"""Tests for Unmanic-API fleet placement."""
+import asyncio
+import math
+import time
+
+import pytest
+from unmanic_api import FleetScheduler, Unmanic
+from unmanic_api.fleet import LoadWeights, NodeLoad, load_score
+from unmanic_api.testing import StandInServer, make_completed_tasks
+
+
+def test_load_score():
+    """Test the weighted score and the nodes that cannot take work."""
+    load = NodeLoad("a", healthy=True, workers=4, available=4, busy=2, queued=20, throughput=10.0)
+
+    assert load_score(load) == pytest.approx(20 / 4 + 0.5 * 2 / 4 + 22 / 10)
+    assert load_score(load, LoadWeights(queue=0, busy=0, drain=1)) == pytest.approx(2.2)
+    assert load_score(NodeLoad("a", healthy=True, workers=2, available=2)) == 0
+    assert math.isinf(load_score(NodeLoad("a", healthy=True, workers=2, available=0)))
+    assert math.isinf(load_score(NodeLoad("a", workers=2, available=2)))
+
+@pytest.mark.asyncio
+async def test_fleet_places_on_least_loaded():
+    """Test placements follow the cached scores and skip unreachable nodes."""
+    async with StandInServer() as down:
+        port = down.port
+
+    async with StandInServer(pending_tasks=20, workers=4) as busy, StandInServer(pending_tasks=0, workers=2) as quiet:
+        async with Unmanic(busy.host, busy.port) as a, Unmanic(quiet.host, quiet.port) as b, Unmanic("127.0.0.1", port, request_timeout=1) as c:
+            fleet = FleetScheduler({"a": a, "b": b, "c": c})
+            loads = await fleet.refresh()
+            assert (loads["a"].available, loads["a"].busy, loads["a"].queued, loads["a"].throughput) == (4, 2, 20, 10.0)
+            assert loads["b"].score < loads["a"].score
+            assert not loads["c"].healthy and loads["c"].error.startswith("UnmanicConnectionError")
+
+            placed = [await fleet.enqueue(f"/library/new/file_{index}.mkv") for index in range(20)]
+            assert placed[:5] == ["b"] * 5
+            assert fleet.placements == {"a": placed.count("a"), "b": placed.count("b"), "c": 0}
+            assert 0 < placed.count("a") < placed.count("b")
+            assert fleet.imbalance() < 0.2
+
+            text = fleet.render()
+
+    assert len(quiet.pending) == placed.count("b")
+    assert len(busy.pending) == 20 + placed.count("a")
+    assert 'unmanic_api_fleet_node_healthy{node="c"} 0' in text
+    assert 'unmanic_api_fleet_node_score{node="c"} +Inf' in text
+    assert f'unmanic_api_fleet_placements_total{{node="b"}} {placed.count("b")}' in text
+
+@pytest.mark.asyncio
+async def test_fleet_enqueue_fails_over():
+    """Test a node failing on enqueue is marked unhealthy until refreshed."""
+    async with StandInServer(pending_tasks=10) as first, StandInServer(pending_tasks=0) as second:
+        async with Unmanic(first.host, first.port) as a, Unmanic(second.host, second.port) as b:
+            fleet = FleetScheduler({"a": a, "b": b}, refresh_interval=0.05)
+            await fleet.refresh()
+            second.add_fault("reset", route="v2/pending/create")
+
+            assert await fleet.enqueue("/library/new/file.mkv") == "a"
+            assert not fleet.loads["b"].healthy
+
+            fleet.start()
+            while fleet.refreshes < 3:
+                await asyncio.sleep(0.01)
+            await fleet.stop()
+            assert await fleet.enqueue("/library/new/other.mkv") == "b"
+
+    assert fleet.placements == {"a": 1, "b": 1}
+
+@pytest.mark.asyncio
+async def test_fleet_throughput_uses_server_clock():
+    """Test the throughput window follows the server's clock, not the client's."""
+    async with StandInServer(pending_tasks=0) as ahead, StandInServer(pending_tasks=0) as behind:
+        ahead.history = make_completed_tasks(30, now=time.time() + 5 * 3600)
+        behind.history = make_completed_tasks(30, now=time.time() - 5 * 3600)
+        async with Unmanic(ahead.host, ahead.port) as a, Unmanic(behind.host, behind.port) as b:
+            fleet = FleetScheduler({"a": a, "b": b}, history_window=600)
+            loads = await fleet.refresh()
+
+    assert loads["a"].throughput == loads["b"].throughput == 60.0
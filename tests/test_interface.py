@@ -1,4 +1,5 @@
 """Tests for Unmanic Interface."""
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
 
 import pytest
@@ -172,6 +173,32 @@ async def test_get_task_history(aresponses):
         assert response.results[0]
         assert isinstance(response.results[0], models.CompletedTask)
 
+@pytest.mark.asyncio
+async def test_get_task_history_process_pool(aresponses):
+    """Test get_task_history() can decode and parse in a process pool."""
+    aresponses.add(
+        MATCH_HOST,
+        "/unmanic/api/v2/history/tasks",
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("history.json"),
+        ),
+        match_querystring=True,
+    )
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        async with ClientSession() as session:
+            unmanic = Unmanic(
+                HOST, PORT, session=session, decode_threshold=0, decode_executor=executor
+            )
+            response = await unmanic.get_task_history()
+
+    assert isinstance(response, models.TaskHistory)
+    assert response.recordsTotal == 410
+    assert isinstance(response.results[0], models.CompletedTask)
+
 @pytest.mark.asyncio
 async def test_get_task_history_empty_json(aresponses):
     """Test get_task_history() method is handled correctly given empty json."""
@@ -0,0 +1,94 @@
+"""Tests for Unmanic-API Metrics."""
+import pytest
+from aiohttp import ClientSession
+from unmanic_api import ClientRegistry, MetricsRegistry, MetricsServer, Unmanic, UnmanicInternalServerError
+from unmanic_api.capabilities import OPERATIONS, Endpoint
+from unmanic_api.metrics import Histogram
+from unmanic_api.testing import StandInServer
+
+
+def test_histogram_quantile() -> None:
+    """Test quantiles are interpolated within buckets."""
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == 6.5
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.quantile(1.0) == 4.0
+    assert histogram.cumulative() == [("1.0", 1), ("2.0", 3), ("4.0", 4), ("+Inf", 4)]
+    assert Histogram().quantile(0.5) is None
+
+def test_cache_hit_rate() -> None:
+    """Test cache lookups are counted."""
+    registry = MetricsRegistry()
+    assert registry.cache_hit_rate("capabilities") is None
+
+    registry.record_cache("capabilities", hit=False)
+    registry.record_cache("capabilities", hit=True)
+    registry.record_cache("capabilities", hit=True)
+    assert registry.cache_hit_rate("capabilities") == 2 / 3
+    assert 'unmanic_api_cache_requests_total{cache="capabilities",result="hit"} 2' in registry.render()
+
+@pytest.mark.asyncio
+async def test_cache_lookups_recorded(monkeypatch):
+    """Test the version cache and shared session lookups report to the registry."""
+    monkeypatch.setitem(OPERATIONS, "delete_pending_tasks", [Endpoint("DELETE", "v2/pending/tasks", (0, 1, 0))])
+    registry = MetricsRegistry()
+    clients = ClientRegistry()
+    async with StandInServer() as server:
+        async with clients.client(server.host, server.port, metrics=registry) as first:
+            await first.delete_pending_tasks([1])
+            await first.delete_pending_tasks([2])
+            async with clients.client(server.host, server.port, metrics=registry) as second:
+                await second.delete_pending_tasks([3])
+
+    assert registry.cache == {
+        ("capabilities", "miss"): 1,
+        ("capabilities", "hit"): 2,
+        ("shared_session", "miss"): 1,
+        ("shared_session", "hit"): 1,
+    }
+    assert registry.cache_hit_rate("shared_session") == 0.5
+
+@pytest.mark.asyncio
+async def test_metrics_recorded():
+    """Test calls are counted per endpoint and errors per exception class."""
+    registry = MetricsRegistry()
+
+    async with StandInServer() as server:
+        async with Unmanic(server.host, server.port, metrics=registry) as unmanic:
+            await unmanic.get_version()
+            await unmanic.get_version()
+            await unmanic.get_task_history()
+            assert registry.pool_usage() == {f"{server.host}:{server.port}": (0, 100)}
+
+            server.error_rate = 1.0
+            with pytest.raises(UnmanicInternalServerError):
+                await unmanic.get_version()
+
+    assert registry.requests[("v2/version/read", "GET")] == 3
+    assert registry.requests[("v2/history/tasks", "POST")] == 1
+    assert registry.errors == {("v2/version/read", "GET", "UnmanicInternalServerError"): 1}
+    assert registry.bytes_out[("v2/history/tasks", "POST")] > 0
+    assert registry.latency_quantile("v2/version/read", 0.99) is not None
+
+    text = registry.render()
+    assert 'unmanic_api_requests_total{endpoint="v2/version/read",method="GET"} 3' in text
+    assert 'unmanic_api_request_duration_seconds_count{endpoint="v2/version/read",method="GET"} 3' in text
+    assert 'exception="UnmanicInternalServerError"} 1' in text
+
+@pytest.mark.asyncio
+async def test_metrics_server():
+    """Test the exporter serves the Prometheus text format."""
+    registry = MetricsRegistry()
+    registry.record_cache("capabilities", hit=True)
+
+    async with MetricsServer(registry, port=0) as metrics_server:
+        async with ClientSession() as session:
+            url = f"http://{metrics_server.host}:{metrics_server.port}/metrics"
+            async with session.get(url) as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert "# TYPE unmanic_api_requests_total counter" in await response.text()
@@ -0,0 +1,130 @@
+"""Tests for Unmanic-API scan and processing orchestration."""
+import asyncio
+
+import pytest
+from unmanic_api import Unmanic, UnmanicError
+from unmanic_api.testing import StandInServer
+
+
+@pytest.mark.asyncio
+async def test_scan_and_wait():
+    """Test the scan is awaited until the queue settles, and debounced."""
+    async with StandInServer(pending_tasks=10) as server:
+        server.scan_files = 15
+        async with Unmanic(server.host, server.port) as unmanic:
+            added = await asyncio.gather(
+                unmanic.scan_and_wait(stable_for=0.1, min_interval=0.01, max_interval=0.05),
+                unmanic.scan_and_wait(stable_for=0.1, min_interval=0.01, max_interval=0.05),
+            )
+
+    assert added == [15, 15]
+    assert server.scans == 1
+    assert len(server.pending) == 25
+
+@pytest.mark.asyncio
+async def test_scan_and_wait_timeout():
+    """Test a scan that never settles raises after the timeout."""
+    async with StandInServer() as server:
+        server.scan_files = 1000
+        async with Unmanic(server.host, server.port) as unmanic:
+            with pytest.raises(UnmanicError):
+                await unmanic.scan_and_wait(stable_for=0.2, timeout=0.3, min_interval=0.01)
+
+async def _process(server, paths, delay):
+    """Complete the given pending paths one by one, as workers would."""
+    for path in paths:
+        await asyncio.sleep(delay)
+        while not any(task["abspath"] == path for task in server.pending):
+            await asyncio.sleep(0.001)
+        server.complete_task(path, success=not path.endswith("bad.mkv"))
+
+@pytest.mark.asyncio
+async def test_process_and_wait():
+    """Test many waits resolve through one shared poll loop."""
+    async with StandInServer(pending_tasks=0, completed_tasks=0) as server:
+        server.history = []
+        paths = [f"/library/new/{index}.mkv" for index in range(50)] + ["/library/new/bad.mkv"]
+        async with Unmanic(server.host, server.port) as unmanic:
+            unmanic.watcher.interval = 0.02
+            worker = asyncio.ensure_future(_process(server, paths, 0.002))
+            results = await unmanic.process_many_and_wait(paths, timeout=5)
+            await worker
+
+            assert all(result is not None for result in results.values())
+            assert results["/library/new/7.mkv"].task_label == "7.mkv"
+            assert results["/library/new/bad.mkv"].task_success is False
+            assert unmanic.watcher.outstanding == 0
+            polls = unmanic.watcher.polls
+
+            worker = asyncio.ensure_future(_process(server, ["/library/new/single.mkv"], 0.05))
+            result = await unmanic.process_and_wait("/library/new/single.mkv", timeout=5)
+            await worker
+            assert result.task_label == "single.mkv"
+
+    assert polls < 100
+    assert server.requests["v2/pending/create"] == 52
+
+@pytest.mark.asyncio
+async def test_process_and_wait_timeout_and_cancel():
+    """Test waits time out or cancel without disturbing other waits."""
+    async with StandInServer(pending_tasks=0) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            unmanic.watcher.interval = 0.01
+            with pytest.raises(UnmanicError):
+                await unmanic.process_and_wait("/library/slow.mkv", timeout=0.1)
+
+            cancelled = asyncio.ensure_future(unmanic.process_and_wait("/library/a.mkv"))
+            kept = asyncio.ensure_future(unmanic.process_and_wait("/library/b.mkv", timeout=5))
+            await asyncio.sleep(0.05)
+            cancelled.cancel()
+            await asyncio.sleep(0.02)
+            assert unmanic.watcher.outstanding == 1
+            assert unmanic.watcher.status("/library/b.mkv") == "pending"
+
+            server.complete_task("/library/b.mkv")
+            assert (await kept).task_label == "b.mkv"
+            await unmanic.watcher.close()
+
+@pytest.mark.asyncio
+async def test_process_and_wait_clock_skew():
+    """Test waits are ordered by history id, not by client and server clocks."""
+    async with StandInServer(pending_tasks=0, completed_tasks=5) as server:
+        old_run = server.complete_task("/library/a/ep1.mkv")
+        old_run["finish_time"] += 7200
+        async with Unmanic(server.host, server.port) as unmanic:
+            unmanic.watcher.interval = 0.01
+            wait = asyncio.ensure_future(unmanic.process_and_wait("/library/a/ep1.mkv", timeout=5))
+            while "/library/a/ep1.mkv" not in [task["abspath"] for task in server.pending]:
+                await asyncio.sleep(0.005)
+
+            with pytest.raises(UnmanicError):
+                await unmanic.watcher.wait("/library/b/ep1.mkv", timeout=1)
+
+            await asyncio.sleep(0.05)
+            assert not wait.done()
+            new_run = server.complete_task("/library/a/ep1.mkv")
+            new_run["finish_time"] -= 7200
+            assert (await wait).id == new_run["id"]
+
+@pytest.mark.asyncio
+async def test_get_snapshot():
+    """Test sections are fetched concurrently, degrading per section."""
+    async with StandInServer(pending_tasks=30, completed_tasks=30, workers=3, latency=0.1) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            snapshot = await unmanic.get_snapshot(queue_length=5)
+            assert snapshot.complete
+            assert snapshot.version == server.version
+            assert len(snapshot.workers) == 3
+            assert len(snapshot.queue.results) == 5
+            assert snapshot.history.recordsTotal == 30
+            assert max(snapshot.timings.values()) < 0.3
+
+            server.add_fault("slow_first_byte", route="v2/history/tasks", delay=1)
+            server.add_fault("status", route="v2/settings/read", status=500)
+            snapshot = await unmanic.get_snapshot(section_timeouts={"history": 0.3})
+
+    assert snapshot.history is None and snapshot.settings is None
+    assert set(snapshot.errors) == {"history", "settings"}
+    assert snapshot.errors["settings"].startswith("UnmanicInternalServerError")
+    assert snapshot.queue is not None
+    assert snapshot.timings["history"] < 0.5
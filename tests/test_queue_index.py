@@ -0,0 +1,91 @@
+"""Tests for the Unmanic-API queue index."""
+import asyncio
+
+import pytest
+from unmanic_api import QueueIndex, Unmanic
+from unmanic_api.models import PendingTask
+from unmanic_api.testing import StandInServer
+
+
+def task(task_id, path, status="pending"):
+    return PendingTask(id=task_id, abspath=path, priority=1, type="local", status=status)
+
+def test_apply_diffs_snapshots():
+    """Test snapshots are applied as adds, removals and changes."""
+    index = QueueIndex()
+    diff = index.apply([task(1, "/tv/a/1.mkv"), task(2, "/tv/a/2.mkv"), task(3, "/movies/x.mkv")])
+    assert len(diff.added) == 3
+    assert index.count_under("/tv") == 2
+    assert index.count_under("/tv/a/") == 2
+    assert index.count_under("/t") == 0
+
+    diff = index.apply([task(2, "/tv/a/2.mkv", "in_progress"), task(3, "/movies/x.mkv"), task(4, "/tv/b/4.mkv")])
+    assert [t.id for t in diff.added] == [4]
+    assert [t.id for t in diff.removed] == [1]
+    assert [t.id for t in diff.changed] == [2]
+    assert "/tv/a/1.mkv" not in index
+    assert index.get("/tv/a/2.mkv").status == "in_progress"
+    assert index.count_under("/tv") == 2
+    assert [t.id for t in index.tasks_under("/tv/b")] == [4]
+
+    assert not index.apply([task(2, "/tv/a/2.mkv", "in_progress"), task(3, "/movies/x.mkv"), task(4, "/tv/b/4.mkv")])
+
+    index.apply([])
+    assert len(index) == 0
+    assert not index.has_under("/")
+
+def test_tasks_under_subtree():
+    """Test listing a directory returns its whole subtree and nothing beside it."""
+    index = QueueIndex()
+    index.apply([task(1, "/tv/b/1.mkv"), task(2, "/tv/b/s1/2.mkv"), task(3, "/tv/bb/3.mkv"), task(4, "/tv/b/s1/4.mkv")])
+    assert sorted(t.id for t in index.tasks_under("/tv/b/")) == [1, 2, 4]
+    assert sorted(t.id for t in index.tasks_under("/")) == [1, 2, 3, 4]
+    assert index.tasks_under("/tv/c") == []
+
+    index.apply([task(1, "/tv/b/1.mkv"), task(4, "/tv/b/s1/4.mkv", "in_progress")])
+    assert sorted(t.id for t in index.tasks_under("/tv/b")) == [1, 4]
+    assert index.tasks_under("/tv/b/s1")[0].status == "in_progress"
+    assert index.tasks_under("/tv/bb") == []
+
+@pytest.mark.asyncio
+async def test_refresh_from_server():
+    """Test the index follows the server queue."""
+    async with StandInServer(pending_tasks=120) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            index = QueueIndex(unmanic, page_size=50)
+            await index.refresh()
+            assert len(index) == 120
+            assert "/library/Show 5/Episode_5.mkv" in index
+            assert index.count_under("/library/Show 5") == 2
+
+            del server.pending[:10]
+            index.start(0.01)
+            await asyncio.sleep(0.1)
+            await index.stop()
+
+    assert len(index) == 110
+    assert index.refreshes > 1
+
+@pytest.mark.asyncio
+async def test_refresh_queue_changes_between_reads():
+    """Test a task leaving the queue head mid-refresh does not shift the snapshot."""
+    async with StandInServer(pending_tasks=6) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            index = QueueIndex(unmanic, page_size=2)
+            await index.refresh()
+            assert len(index) == 6
+
+            read = unmanic.get_pending_tasks
+
+            async def read_then_finish_head(*args, **kwargs):
+                queue = await read(*args, **kwargs)
+                server.pending = [task for task in server.pending if task["id"] != 1]
+                return queue
+
+            unmanic.get_pending_tasks = read_then_finish_head
+            diff = await index.refresh()
+
+    assert [t.id for t in diff.removed] == [1]
+    assert sorted(t.id for t in diff.removed + diff.added) == [1]
+    assert index.get_by_id(1) is None
+    assert sorted(index.get_by_id(task_id).id for task_id in range(2, 7)) == [2, 3, 4, 5, 6]
@@ -0,0 +1,111 @@
+"""Tests for Unmanic-API Registry."""
+import asyncio
+import gc
+import weakref
+
+import pytest
+from unmanic_api import ClientRegistry, Tracer, shared_client
+from unmanic_api.registry import default_registry
+from unmanic_api.testing import StandInServer
+
+
+@pytest.mark.asyncio
+async def test_handles_share_session():
+    """Test handles for one installation share a session until the last is released."""
+    registry = ClientRegistry()
+
+    async with StandInServer() as server:
+        first = await registry.acquire(server.host, server.port)
+        second = await registry.acquire(server.host, server.port, base_path="/unmanic/api")
+        other = await registry.acquire(server.host, server.port, base_path="/other/")
+
+        assert first._session is second._session
+        assert first._session is not other._session
+        assert registry.session_count() == 2
+        assert registry.references(server.host, server.port) == 2
+
+        assert await first.get_version() == server.version
+        assert await second.get_version() == server.version
+
+        session = first._session
+        await first.close_session()
+        await first.close_session()
+        assert registry.references(server.host, server.port) == 1
+        assert not session.closed
+
+        async with second:
+            pass
+        assert session.closed
+        assert registry.references(server.host, server.port) == 0
+
+        await other.close_session()
+        assert registry.session_count() == 0
+
+@pytest.mark.asyncio
+async def test_client_context():
+    """Test the context manager acquires and releases a handle."""
+    registry = ClientRegistry(limit=4)
+
+    async with StandInServer() as server:
+        async with registry.client(server.host, server.port) as unmanic:
+            async with registry.client(server.host, server.port) as again:
+                assert unmanic._session is again._session
+                assert unmanic._session.connector.limit == 4
+                assert registry.references(server.host, server.port) == 2
+            assert await unmanic.get_workers_count() == 4
+        assert registry.session_count() == 0
+
+        async with shared_client(server.host, server.port) as unmanic:
+            assert await unmanic.get_version() == server.version
+        assert default_registry.session_count() == 0
+
+@pytest.mark.asyncio
+async def test_stale_handle_release_ignored():
+    """Test handles on a replaced session cannot close its replacement."""
+    registry = ClientRegistry()
+    async with StandInServer() as server:
+        stale = await registry.acquire(server.host, server.port)
+        await stale._session.close()
+
+        live = await registry.acquire(server.host, server.port)
+        await stale.close_session()
+        assert not live._session.closed
+        assert registry.references(server.host, server.port) == 1
+        assert await live.get_version() == server.version
+
+        await live.close_session()
+        assert live._session.closed
+
+@pytest.mark.asyncio
+async def test_tracer_gets_traced_session():
+    """Test handles with a tracer share a session carrying its TraceConfig."""
+    registry = ClientRegistry()
+    collected = []
+    tracer = Tracer(callbacks=[collected.append])
+    async with StandInServer() as server:
+        async with registry.client(server.host, server.port) as plain:
+            async with registry.client(server.host, server.port, tracer=tracer) as traced:
+                assert plain._session is not traced._session
+                assert registry.session_count() == 2
+                assert registry.references(server.host, server.port) == 2
+                await traced.get_version()
+
+    assert collected[0].connect is not None
+
+def test_closed_loops_are_dropped():
+    """Test entries do not keep finished event loops alive."""
+    registry = ClientRegistry()
+
+    async def hold():
+        return await registry.acquire("localhost", 8888)
+
+    loop = asyncio.new_event_loop()
+    handle = loop.run_until_complete(hold())
+    loop.run_until_complete(handle._session.close())
+    loop.close()
+    loop_ref = weakref.ref(loop)
+    del loop, handle
+
+    assert registry.session_count() == 0
+    gc.collect()
+    assert loop_ref() is None
@@ -0,0 +1,81 @@
+"""Tests for Unmanic-API queue scheduling."""
+import pytest
+from unmanic_api import Unmanic
+from unmanic_api.models import PendingTask
+from unmanic_api.scheduling import extension_cost, file_size_cost, history_extension_costs, plan_reorder
+from unmanic_api.testing import StandInServer
+
+
+def test_plan_reorder_minimal_moves():
+    """Test only tasks before the longest ordered tail are moved."""
+    assert plan_reorder([1, 2, 3], [1, 2, 3]).moved == 0
+
+    plan = plan_reorder([1, 2, 3, 4, 5], [9, 1, 2, 3, 4])
+    assert plan.order == [2, 3, 4, 5, 1]
+    assert plan.top == [2, 3, 4, 5]
+
+    plan = plan_reorder([1, 2, 3, 4, 5], [3, 4, 1, 5, 0])
+    assert plan.order == [5, 3, 1, 2, 4]
+    assert plan.top == [5, 3]
+
+    # Tasks sharing a priority run in no set order, so one of them moves.
+    assert plan_reorder([1, 2, 3], [1, 2, 3], [5, 5, 1]).top == [1]
+
+def test_cost_functions(tmp_path):
+    """Test file size and extension costs."""
+    (tmp_path / "small.mkv").write_bytes(b"x" * 10)
+    (tmp_path / "large.mkv").write_bytes(b"x" * 1000)
+    cost = file_size_cost({"/library": str(tmp_path)})
+
+    def task(path):
+        return PendingTask(id=1, abspath=path, priority=1, type="local", status="pending")
+
+    assert cost(task("/library/small.mkv")) == 10
+    assert cost(task("/library/large.mkv")) == 1000
+    assert cost(task("/library/gone.mkv")) == float("inf")
+
+    cost = extension_cost({".MKV": 40, ".mp3": 0.5}, default=5)
+    assert [cost(task(path)) for path in ("/a/b.mkv", "/a/b.MP3", "/a/b.avi")] == [40, 0.5, 5]
+
+@pytest.mark.asyncio
+async def test_optimize_pending_queue():
+    """Test the queue ends up shortest job first in few requests."""
+    async with StandInServer(pending_tasks=40) as server:
+        for task in server.pending[:5]:
+            task["abspath"] = task["abspath"].replace(".mkv", ".mp3")
+        for task in server.pending[-3:]:
+            task["abspath"] = task["abspath"].replace(".mkv", ".flac")
+        cost = extension_cost({".mkv": 40, ".flac": 2, ".mp3": 1})
+
+        async with Unmanic(server.host, server.port) as unmanic:
+            plan = await unmanic.optimize_pending_queue(cost, dry_run=True, page_size=15)
+            assert plan.batches == 0
+            assert server.requests["v2/pending/tasks"] == 2
+            assert server.requests.get("v2/pending/reorder") is None
+
+            plan = await unmanic.optimize_pending_queue(cost)
+
+    assert plan.top == [5, 4, 3, 2, 1]
+    assert plan.batches == 5
+    assert server.queue_order() == plan.order
+
+@pytest.mark.asyncio
+async def test_extension_costs_from_history():
+    """Test per-extension costs are estimated from gaps between finished tasks."""
+    now = 1700000000
+    history, finish = [], now
+    for index in range(12):
+        extension = ".mp3" if index % 2 else ".mkv"
+        history.append({"id": 100 - index, "task_label": f"file_{index}{extension}", "task_success": True, "finish_time": finish})
+        finish -= 10 if extension == ".mp3" else 100
+    # An idle night before the oldest task.
+    history.append({"id": 1, "task_label": "old.avi", "task_success": True, "finish_time": finish - 86400})
+
+    async with StandInServer(workers=2) as server:
+        server.history = history
+        async with Unmanic(server.host, server.port) as unmanic:
+            costs = await unmanic.get_extension_costs()
+
+    assert costs == {".mkv": 200.0, ".mp3": 20.0}
+    assert history_extension_costs([]) == {}
+    assert extension_cost(costs)(PendingTask(id=1, abspath="/a/b.MP3", priority=1, type="local", status="pending")) == 20.0
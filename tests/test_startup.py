@@ -0,0 +1,69 @@
+"""Tests for Unmanic-API lazy imports and startup cost."""
+import ast
+import subprocess
+import sys
+
+import pytest
+import unmanic_api
+
+from benchmarks import startup
+
+
+def _loaded_modules(statement: str) -> set:
+    output = subprocess.run(
+        [sys.executable, "-c", f"{statement}\nimport sys\nprint(' '.join(sys.modules))"],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout
+    return set(output.split())
+
+@pytest.mark.parametrize("statement", [
+    "import unmanic_api",
+    "from unmanic_api import UnmanicError",
+    "import unmanic_api.models",
+])
+def test_light_imports_skip_http_stack(statement) -> None:
+    """Test importing the package, exceptions or models does not import aiohttp."""
+    modules = _loaded_modules(statement)
+
+    assert "unmanic_api" in modules
+    for module in startup.HTTP_STACK:
+        assert module not in modules
+
+def test_client_import_skips_web_server() -> None:
+    """Test importing the client does not import the aiohttp server side."""
+    modules = _loaded_modules("from unmanic_api import Unmanic")
+
+    assert "aiohttp" in modules
+    assert not {module for module in modules if module.startswith("aiohttp.web")}
+
+def test_lazy_attributes() -> None:
+    """Test lazily exported names resolve on access."""
+    from unmanic_api.unmanic import Unmanic
+
+    assert unmanic_api.Unmanic is Unmanic
+    assert "SyncUnmanic" in dir(unmanic_api)
+    assert set(unmanic_api.__all__) >= {"Unmanic", "Client", "UnmanicError"}
+    with pytest.raises(AttributeError):
+        unmanic_api.DoesNotExist
+
+def test_lazy_names_visible_to_type_checkers() -> None:
+    """Test every lazily exported name is also imported under TYPE_CHECKING."""
+    with open(unmanic_api.__file__) as fptr:
+        tree = ast.parse(fptr.read())
+    block = next(node for node in tree.body if isinstance(node, ast.If) and getattr(node.test, "id", None) == "TYPE_CHECKING")
+    imported = {
+        (f".{statement.module}", alias.name)
+        for statement in block.body
+        for alias in statement.names
+    }
+
+    assert imported == {(module, name) for name, module in unmanic_api._LAZY.items()}
+
+def test_startup_budget() -> None:
+    """Test import cost stays within the budgets of the startup benchmark."""
+    results = [startup.measure(statement, repeat=3) for statement in startup.STATEMENTS]
+
+    assert startup.check(results) == []
+    assert results[0].microseconds > 0
@@ -0,0 +1,133 @@
+"""Tests for Unmanic-API Streaming."""
+import json
+
+import pytest
+import unmanic_api.models as models
+from aiohttp import ClientSession
+from unmanic_api import Unmanic, UnmanicError
+from unmanic_api.streaming import ResultsStreamParser
+
+from . import load_fixture
+
+HOST = "192.168.1.99"
+PORT = 8888
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+QUEUE = load_fixture("queue.json").encode("utf8")
+
+
+def test_parser_single_chunk() -> None:
+    """Test the parser handles a whole body in one chunk."""
+    parser = ResultsStreamParser()
+    items = parser.feed(QUEUE, final=True)
+
+    assert items == json.loads(QUEUE)["results"]
+    assert parser.fields == {"recordsTotal": 654, "recordsFiltered": 650}
+
+def test_parser_byte_by_byte() -> None:
+    """Test the parser handles a body split at every byte."""
+    parser = ResultsStreamParser()
+    items = []
+    for i in range(len(QUEUE)):
+        items.extend(parser.feed(QUEUE[i:i + 1]))
+    items.extend(parser.feed(b"", final=True))
+
+    assert items == json.loads(QUEUE)["results"]
+    assert parser.fields["recordsTotal"] == 654
+
+def test_parser_split_number() -> None:
+    """Test numbers split across chunks are not truncated."""
+    parser = ResultsStreamParser()
+    assert parser.feed(b'{"recordsTotal": 12') == []
+    assert "recordsTotal" not in parser.fields
+    assert parser.feed(b'34, "results": [1') == []
+    assert parser.feed(b'5, 16]}', final=True) == [15, 16]
+    assert parser.fields["recordsTotal"] == 1234
+
+def test_parser_totals_before_results() -> None:
+    """Test totals are exposed before the results array has been read."""
+    parser = ResultsStreamParser()
+    parser.feed(b'{"recordsTotal": 3, "recordsFiltered": 2, "results": [{"id"')
+    assert parser.fields == {"recordsTotal": 3, "recordsFiltered": 2}
+
+def test_parser_truncated() -> None:
+    """Test a truncated body raises UnmanicError."""
+    parser = ResultsStreamParser()
+    with pytest.raises(UnmanicError):
+        parser.feed(QUEUE[:-10], final=True)
+
+def test_parser_not_an_object() -> None:
+    """Test a body that is not an object raises UnmanicError."""
+    parser = ResultsStreamParser()
+    with pytest.raises(UnmanicError):
+        parser.feed(b'[1, 2]', final=True)
+
+@pytest.mark.asyncio
+async def test_stream_pending_tasks(aresponses):
+    """Test stream_pending_tasks() yields PendingTask models."""
+    aresponses.add(
+        MATCH_HOST,
+        "/unmanic/api/v2/pending/tasks",
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("queue.json"),
+        ),
+        match_querystring=True,
+    )
+
+    async with ClientSession() as session:
+        unmanic = Unmanic(HOST, PORT, session=session)
+        async with unmanic.stream_pending_tasks(length=10) as queue:
+            tasks = [task async for task in queue]
+
+    assert len(tasks) == 10
+    assert isinstance(tasks[0], models.PendingTask)
+    assert tasks[0].abspath == "/library/Test_File1.mkv"
+    assert queue.recordsTotal == 654
+    assert queue.recordsFiltered == 650
+
+@pytest.mark.asyncio
+async def test_stream_task_history(aresponses):
+    """Test stream_task_history() yields CompletedTask models."""
+    aresponses.add(
+        MATCH_HOST,
+        "/unmanic/api/v2/history/tasks",
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("history.json"),
+        ),
+        match_querystring=True,
+    )
+
+    async with ClientSession() as session:
+        unmanic = Unmanic(HOST, PORT, session=session)
+        async with unmanic.stream_task_history() as history:
+            async for task in history:
+                assert isinstance(task, models.CompletedTask)
+                assert history.recordsTotal == 410
+
+@pytest.mark.asyncio
+async def test_stream_task_history_empty_string(aresponses):
+    """Test stream_task_history() raises UnmanicError given an empty string."""
+    aresponses.add(
+        MATCH_HOST,
+        "/unmanic/api/v2/history/tasks",
+        "POST",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text="",
+        ),
+        match_querystring=True,
+    )
+
+    async with ClientSession() as session:
+        unmanic = Unmanic(HOST, PORT, session=session)
+        with pytest.raises(UnmanicError):
+            async with unmanic.stream_task_history() as history:
+                [task async for task in history]
@@ -0,0 +1,74 @@
+"""Tests for Unmanic-API Sync."""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import unmanic_api.models as models
+from unmanic_api import SyncUnmanic, UnmanicInternalServerError
+from unmanic_api.testing import StandInServer
+
+
+@pytest.fixture
+def server():
+    """Run a stand-in server on its own loop thread."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    stand_in = asyncio.run_coroutine_threadsafe(StandInServer(workers=2).start(), loop).result()
+    yield stand_in
+    asyncio.run_coroutine_threadsafe(stand_in.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+def test_sync_calls(server):
+    """Test Unmanic methods are proxied as blocking calls."""
+    with SyncUnmanic(server.host, server.port) as unmanic:
+        assert unmanic.get_version() == server.version
+        assert unmanic.pause_worker("W0") is True
+        assert isinstance(unmanic.get_task_history(), models.TaskHistory)
+
+        server.error_rate = 1.0
+        with pytest.raises(UnmanicInternalServerError):
+            unmanic.get_settings()
+
+def test_sync_concurrent_callers(server):
+    """Test concurrent threads share one session."""
+    with SyncUnmanic(server.host, server.port) as unmanic:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: unmanic.get_workers_count(), range(40)))
+        session = unmanic._unmanic._session
+
+    assert results == [2] * 40
+    assert session.closed
+
+def test_sync_attributes(server):
+    """Test only coroutine methods are proxied and closed facades refuse calls."""
+    unmanic = SyncUnmanic(server.host, server.port)
+    with pytest.raises(AttributeError):
+        unmanic.stream_task_history
+    with pytest.raises(AttributeError):
+        unmanic._request
+
+    unmanic.close()
+    unmanic.close()
+    with pytest.raises(RuntimeError):
+        unmanic.get_version()
+
+def test_sync_close_failure(server):
+    """Test the loop thread stops even when closing the session fails."""
+    unmanic = SyncUnmanic(server.host, server.port)
+
+    async def fail() -> None:
+        raise OSError("close failed")
+
+    unmanic._unmanic.close_session = fail
+    with pytest.raises(OSError):
+        unmanic.close()
+
+    assert not unmanic._thread.is_alive()
+    assert unmanic._loop.is_closed()
+    unmanic.close()
+    with pytest.raises(RuntimeError):
+        unmanic.get_version()
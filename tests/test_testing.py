@@ -0,0 +1,68 @@
+"""Tests for the Unmanic-API stand-in server."""
+import pytest
+import unmanic_api.models as models
+from unmanic_api import Unmanic, UnmanicInternalServerError
+from unmanic_api.testing import StandInServer, make_completed_tasks
+
+from benchmarks import e2e
+
+
+def test_make_completed_tasks() -> None:
+    """Test synthetic history is newest first with the requested failures."""
+    tasks = make_completed_tasks(10, failure_every=5)
+
+    assert [task["id"] for task in tasks] == list(range(10, 0, -1))
+    assert [task["id"] for task in tasks if not task["task_success"]] == [10, 5]
+    for task in tasks:
+        assert isinstance(models.CompletedTask.from_dict(task), models.CompletedTask)
+
+@pytest.mark.asyncio
+async def test_stand_in_server():
+    """Test the stand-in serves the routes used by Unmanic."""
+    async with StandInServer(pending_tasks=25, completed_tasks=5, workers=2) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            assert await unmanic.get_version() == server.version
+            assert await unmanic.get_workers_count() == 2
+
+            queue = await unmanic.get_pending_tasks(start=20, length=10)
+            assert queue.recordsTotal == 25
+            assert len(queue.results) == 5
+
+            queue = await unmanic.get_pending_tasks(search_value="Episode_7.")
+            assert queue.recordsFiltered == 1
+
+            assert await unmanic.pause_worker("W0")
+            workers = await unmanic.get_workers_status()
+            assert workers[0].paused
+
+    assert server.requests["v2/settings/read"] == 1
+
+@pytest.mark.asyncio
+async def test_stand_in_server_error_rate():
+    """Test injected errors surface as UnmanicInternalServerError."""
+    async with StandInServer(error_rate=1.0) as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            with pytest.raises(UnmanicInternalServerError):
+                await unmanic.get_version()
+
+@pytest.mark.asyncio
+async def test_e2e_benchmark_run():
+    """Test the end-to-end benchmark produces a result per scenario."""
+    report = await e2e.run(tasks=50, requests=10, concurrency=4, page_size=20)
+
+    assert [result["name"] for result in report["results"]] == list(e2e.SCENARIOS)
+    for result in report["results"]:
+        assert result["requests"] > 0
+        assert result["errors"] == 0
+        assert result["p99"] >= result["p50"]
+    assert e2e.compare(report, report)
+
+def test_e2e_percentile() -> None:
+    """Test percentiles use the nearest rank."""
+    values = [float(value) for value in range(1, 11)]
+
+    assert e2e.percentile(values, 50) == 5.0
+    assert e2e.percentile(values, 99) == 10.0
+    assert e2e.percentile(values, 10) == 1.0
+    assert e2e.percentile(values, 0) == 1.0
+    assert e2e.percentile([], 50) == 0.0
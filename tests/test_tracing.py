@@ -0,0 +1,103 @@
+"""Tests for Unmanic-API Tracing."""
+import logging
+
+import pytest
+from unmanic_api import (
+    RequestStats,
+    Tracer,
+    Unmanic,
+    UnmanicInternalServerError,
+    last_request_stats,
+)
+from unmanic_api.testing import StandInServer
+
+
+@pytest.mark.asyncio
+async def test_tracer_callbacks():
+    """Test callbacks receive per-phase timings."""
+    collected = []
+    tracer = Tracer(callbacks=[collected.append])
+
+    async with StandInServer(completed_tasks=50) as server:
+        async with Unmanic(server.host, server.port, tracer=tracer) as unmanic:
+            await unmanic.get_task_history(length=50)
+            await unmanic.pause_worker("W0")
+
+    first, second = collected
+    assert first.method == "POST"
+    assert first.endpoint == "v2/history/tasks"
+    assert first.status == 200
+    assert first.error is None
+    assert first.bytes_in > 0
+    assert first.bytes_out > 0
+    assert first.connect is not None
+    assert not first.connection_reused
+    for phase in (first.ttfb, first.body_read, first.decode, first.parse):
+        assert 0 <= phase <= first.total
+
+    assert second.endpoint == "v2/workers/worker/pause"
+    assert second.connection_reused
+    assert second.connect is None
+
+@pytest.mark.asyncio
+async def test_tracer_attach_stats():
+    """Test stats are attached to results and available per task."""
+    tracer = Tracer(attach_stats=True)
+
+    async with StandInServer() as server:
+        async with Unmanic(server.host, server.port, tracer=tracer) as unmanic:
+            history = await unmanic.get_task_history()
+            assert isinstance(history.stats, RequestStats)
+            assert last_request_stats() is history.stats
+
+            await unmanic.get_version()
+            assert last_request_stats().endpoint == "v2/version/read"
+
+@pytest.mark.asyncio
+async def test_tracer_error():
+    """Test failed calls are traced with the exception name."""
+    collected = []
+    tracer = Tracer(callbacks=[collected.append])
+
+    async with StandInServer(error_rate=1.0) as server:
+        async with Unmanic(server.host, server.port, tracer=tracer) as unmanic:
+            with pytest.raises(UnmanicInternalServerError):
+                await unmanic.get_version()
+
+    assert collected[0].status == 500
+    assert collected[0].error == "UnmanicInternalServerError"
+
+@pytest.mark.asyncio
+async def test_tracer_slow_call_logged(caplog):
+    """Test calls above the threshold are logged."""
+    tracer = Tracer(slow_threshold=0.05)
+
+    async with StandInServer(latency=0.1) as server:
+        async with Unmanic(server.host, server.port, tracer=tracer) as unmanic:
+            with caplog.at_level(logging.WARNING, logger="unmanic_api.tracing"):
+                await unmanic.get_version()
+
+    assert "Slow Unmanic call GET v2/version/read" in caplog.text
+
+@pytest.mark.asyncio
+async def test_no_tracer():
+    """Test untraced calls leave no stats behind."""
+    async with StandInServer() as server:
+        async with Unmanic(server.host, server.port) as unmanic:
+            history = await unmanic.get_task_history()
+
+    assert history.stats is None
+    assert last_request_stats() is None
+
+@pytest.mark.asyncio
+async def test_tracer_type_error_not_masked():
+    """Test a TypeError outside model parsing is not reported as empty results."""
+    def broken(stats):
+        raise TypeError("callback bug")
+
+    async with StandInServer() as server:
+        async with Unmanic(server.host, server.port, tracer=Tracer(callbacks=[broken])) as unmanic:
+            with pytest.raises(TypeError, match="callback bug"):
+                await unmanic.get_pending_tasks()
+            with pytest.raises(TypeError, match="callback bug"):
+                await unmanic.get_task_history()
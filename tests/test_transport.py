@@ -0,0 +1,80 @@
+"""Tests for the Unmanic-API record and replay transports."""
+import time
+
+import pytest
+from unmanic_api import (
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+    Unmanic,
+    UnmanicError,
+    UnmanicInternalServerError,
+)
+from unmanic_api.testing import StandInServer
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay(tmp_path):
+    """Test recorded traffic replays offline with the same results."""
+    path = str(tmp_path / "traffic.jsonl.gz")
+    async with StandInServer(pending_tasks=30, workers=3) as server:
+        async with RecordingTransport(path) as recorder:
+            async with Unmanic(server.host, server.port, transport=recorder) as unmanic:
+                version = await unmanic.get_version()
+                queue = await unmanic.get_pending_tasks(length=20)
+                async with unmanic.stream_task_history(length=5) as stream:
+                    history = [task async for task in stream]
+        assert recorder.records == 3
+
+    async with ReplayTransport(path, latency_scale=0) as replayer:
+        async with Unmanic("offline", 1, transport=replayer) as unmanic:
+            assert await unmanic.get_version() == version
+            assert await unmanic.get_pending_tasks(length=20) == queue
+            async with unmanic.stream_task_history(length=5) as stream:
+                assert [task async for task in stream] == history
+
+            with pytest.raises(UnmanicError):
+                await unmanic.get_pending_tasks(length=21)
+
+    assert len(replayer) == 3
+    assert replayer.requests == 3
+
+@pytest.mark.asyncio
+async def test_replay_latency_and_order(tmp_path):
+    """Test repeated requests replay in order, with scaled latency and errors."""
+    path = str(tmp_path / "traffic.jsonl")
+    async with StandInServer(latency=0.05, error_rate=0.5, seed=3) as server:
+        async with RecordingTransport(path) as recorder:
+            async with Unmanic(server.host, server.port, transport=recorder) as unmanic:
+                outcomes = []
+                for _ in range(6):
+                    try:
+                        outcomes.append(await unmanic.get_version())
+                    except UnmanicInternalServerError:
+                        outcomes.append(None)
+    assert None in outcomes
+
+    async with ReplayTransport(path, latency_scale=0.5, loop=False) as replayer:
+        async with Unmanic(transport=replayer) as unmanic:
+            started = time.perf_counter()
+            replayed = []
+            for _ in range(6):
+                try:
+                    replayed.append(await unmanic.get_version())
+                except UnmanicInternalServerError:
+                    replayed.append(None)
+            elapsed = time.perf_counter() - started
+
+            with pytest.raises(UnmanicError):
+                await unmanic.get_version()
+
+    assert replayed == outcomes
+    assert 0.14 < elapsed < 1.0
+
+def test_transport_requires_request() -> None:
+    """Test a transport without request() cannot be created."""
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
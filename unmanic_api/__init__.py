@@ -1,4 +1,7 @@
 """Asynchronous Python client for Unmanic."""
+import importlib
+from typing import TYPE_CHECKING
+
 from .exceptions import (
     UnmanicBadRequestRequestedEndpointNotFoundError,
     UnmanicBadRequestRequestedMethodNotAllowedError,
@@ -6,5 +9,73 @@ from .exceptions import (
     UnmanicConnectionError,
     UnmanicError,
     UnmanicInternalServerError,
+    UnmanicUnsupportedOperationError,
 )
-from .unmanic import Client, Unmanic
+
+# Names imported on first access (PEP 562), so that importing the package,
+# its exceptions or its models does not pull in aiohttp.
+_LAZY = {
+    "BulkProgress": ".bulk",
+    "BulkReport": ".bulk",
+    "PruneReport": ".bulk",
+    "TaskOutcome": ".bulk",
+    "Capabilities": ".capabilities",
+    "FailoverTransport": ".failover",
+    "FleetScheduler": ".fleet",
+    "Client": ".unmanic",
+    "Unmanic": ".unmanic",
+    "ClientRegistry": ".registry",
+    "shared_client": ".registry",
+    "MetricsRegistry": ".metrics",
+    "MetricsServer": ".metrics",
+    "SyncUnmanic": ".sync",
+    "RequestStats": ".tracing",
+    "TaskWatcher": ".watcher",
+    "Tracer": ".tracing",
+    "last_request_stats": ".tracing",
+    "QueueIndex": ".queue_index",
+    "ReorderPlan": ".scheduling",
+    "RecordingTransport": ".transport",
+    "ReplayTransport": ".transport",
+    "Transport": ".transport",
+}
+
+if TYPE_CHECKING:
+    # Seen by type checkers, IDEs and pylint; at runtime _LAZY applies.
+    from .bulk import BulkProgress, BulkReport, PruneReport, TaskOutcome
+    from .capabilities import Capabilities
+    from .failover import FailoverTransport
+    from .fleet import FleetScheduler
+    from .metrics import MetricsRegistry, MetricsServer
+    from .queue_index import QueueIndex
+    from .registry import ClientRegistry, shared_client
+    from .scheduling import ReorderPlan
+    from .sync import SyncUnmanic
+    from .tracing import RequestStats, Tracer, last_request_stats
+    from .transport import RecordingTransport, ReplayTransport, Transport
+    from .unmanic import Client, Unmanic
+    from .watcher import TaskWatcher
+
+__all__ = [
+    "UnmanicBadRequestRequestedEndpointNotFoundError",
+    "UnmanicBadRequestRequestedMethodNotAllowedError",
+    "UnmanicBadRequestValidationError",
+    "UnmanicConnectionError",
+    "UnmanicError",
+    "UnmanicInternalServerError",
+    "UnmanicUnsupportedOperationError",
+    *_LAZY,
+]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
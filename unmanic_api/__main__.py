@@ -0,0 +1,6 @@
+"""Command line interface for Unmanic."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
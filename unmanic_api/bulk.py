@@ -0,0 +1,311 @@
+"""Batched bulk operations against Unmanic with bounded concurrency."""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+from .exceptions import UnmanicConnectionError, UnmanicError, UnmanicInternalServerError
+
+# Failures worth retrying: the request may not have reached the server, or
+# the server failed transiently. Validation errors would fail again.
+RETRYABLE = (UnmanicConnectionError, UnmanicInternalServerError)
+
+Items = Union[Iterable[Any], AsyncIterable[Any]]
+
+
+@dataclass(frozen=True)
+class TaskOutcome:
+    """
+    Object holding the outcome of one item of a bulk operation.
+
+    Attributes:
+
+    id: The task id, or path, the outcome is for.
+
+    success: Whether the server accepted the item.
+
+    error: The reason for a failure, None on success.
+    """
+
+    id: Any
+    success: bool
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class BulkReport:
+    """
+    Object holding the outcome of a bulk operation.
+
+    Attributes:
+
+    outcomes: The outcome of every item, in completion order.
+
+    batches: The number of batch requests sent.
+
+    elapsed: Seconds the operation took.
+
+    skipped: The number of items left out before submitting, e.g. already queued.
+    """
+
+    outcomes: List[TaskOutcome]
+    batches: int
+    elapsed: float
+    skipped: int = 0
+
+    @property
+    def succeeded(self) -> List[Any]:
+        """The ids of the items that succeeded."""
+        return [outcome.id for outcome in self.outcomes if outcome.success]
+
+    @property
+    def failed(self) -> List[Any]:
+        """The ids of the items that failed."""
+        return [outcome.id for outcome in self.outcomes if not outcome.success]
+
+
+@dataclass(frozen=True)
+class BulkProgress:
+    """
+    Object holding the progress of a bulk operation.
+
+    Attributes:
+
+    succeeded: The number of items accepted so far.
+
+    failed: The number of items failed so far.
+
+    elapsed: Seconds since the operation started.
+
+    items_per_second: The average rate of completed items.
+    """
+
+    succeeded: int
+    failed: int
+    elapsed: float
+    items_per_second: float
+
+
+@dataclass(frozen=True)
+class PruneReport:
+    """
+    Object holding the outcome of a history prune.
+
+    Attributes:
+
+    scanned: The number of history tasks read.
+
+    matched: The number of tasks matching the prune criteria.
+
+    dry_run: Whether deletion was skipped.
+
+    deleted: The outcome of the deletion, None for a dry run.
+    """
+
+    scanned: int
+    matched: int
+    dry_run: bool
+    deleted: Optional[BulkReport] = None
+
+
+class RateLimiter:
+    """
+    Spaces out calls to at most rate per second.
+
+    Args:
+
+    rate: The maximum calls per second, None for no limit.
+    """
+
+    def __init__(self, rate: Optional[float] = None) -> None:
+        """Initialize the limiter."""
+        if rate is not None and rate <= 0:
+            raise UnmanicError("rate must be positive.")
+        self._interval = 1 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait until the next call is allowed."""
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self._interval
+
+
+async def iterate(items: Items) -> AsyncIterator[Any]:
+    """Iterate a sync or async iterable asynchronously."""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def batches(items: Items, size: int) -> AsyncIterator[List[Any]]:
+    """
+    Group items from a sync or async iterable into lists of up to size.
+
+    Args:
+
+    items: The items.
+
+    size: The maximum batch size.
+
+    Returns:
+        AsyncIterator: The batches, produced as items arrive.
+    """
+    if size < 1:
+        raise UnmanicError("batch_size must be at least 1.")
+
+    batch: List[Any] = []
+    async for item in iterate(items):
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def submit_batches(
+    items: Items,
+    submit: Callable[[List[Any]], Awaitable[bool]],
+    batch_size: int = 100,
+    concurrency: int = 4,
+    rate: Optional[float] = None,
+    progress: Optional[Callable[[BulkProgress], None]] = None,
+    retries: int = 0,
+    backoff: float = 0.5,
+) -> BulkReport:
+    """
+    Submit items in batches, with at most concurrency batches in flight.
+
+    Items are consumed as batches are started, so a streamed source is
+    never read into memory in full. A batch whose submit returns False or
+    raises UnmanicError marks all of its items as failed; other batches
+    carry on.
+
+    Args:
+
+    items: The ids (or paths) to submit, sync or async iterable.
+
+    submit: Coroutine function sending one batch, returning True on success.
+
+    batch_size: The maximum items per request.
+
+    concurrency: The maximum number of requests in flight.
+
+    rate: The maximum requests started per second, None for no limit.
+
+    progress: Called with a BulkProgress after every batch.
+
+    retries: Extra attempts for a batch failing with a connection or
+        internal server error.
+
+    backoff: Seconds before the first retry, doubling for each further one.
+
+    Returns:
+        BulkReport: The outcome of every item.
+    """
+    if concurrency < 1:
+        raise UnmanicError("concurrency must be at least 1.")
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    outcomes: List[TaskOutcome] = []
+    pending = set()
+    sent = 0
+    failed = 0
+
+    async def run(batch: List[Any]) -> None:
+        nonlocal failed
+        try:
+            try:
+                for attempt in range(retries + 1):
+                    try:
+                        success = bool(await submit(batch))
+                        break
+                    except RETRYABLE:
+                        if attempt == retries:
+                            raise
+                        await asyncio.sleep(backoff * 2 ** attempt)
+                error = None if success else "rejected by server"
+            except UnmanicError as exception:
+                success = False
+                error = f"{type(exception).__name__}: {exception.args[0] if exception.args else ''}"
+            outcomes.extend(TaskOutcome(item, success, error) for item in batch)
+            if not success:
+                failed += len(batch)
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                progress(BulkProgress(
+                    succeeded=len(outcomes) - failed,
+                    failed=failed,
+                    elapsed=elapsed,
+                    items_per_second=len(outcomes) / elapsed if elapsed > 0 else 0.0,
+                ))
+        finally:
+            semaphore.release()
+
+    async for batch in batches(items, batch_size):
+        await semaphore.acquire()
+        await limiter.wait()
+        sent += 1
+        task = asyncio.ensure_future(run(batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+    return BulkReport(outcomes=outcomes, batches=sent, elapsed=time.perf_counter() - started)
+
+
+async def scan_paths(root: str, extensions: Optional[Iterable[str]] = None) -> AsyncIterator[str]:
+    """
+    Walk a directory tree, yielding file paths as each directory is listed.
+
+    Directories are listed with os.scandir in the default executor, one at
+    a time, so the walk neither blocks the event loop nor builds the whole
+    file list in memory.
+
+    Args:
+
+    root: The directory to walk.
+
+    extensions: Only yield files with these extensions, e.g. [".mkv"]; case is ignored.
+
+    Returns:
+        AsyncIterator: The file paths.
+    """
+    wanted = {extension.lower() for extension in extensions} if extensions else None
+    loop = asyncio.get_event_loop()
+
+    def listing(directory: str) -> tuple:
+        files, directories = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.path)
+        except OSError:
+            pass
+        return sorted(files), sorted(directories)
+
+    stack = [root]
+    while stack:
+        files, directories = await loop.run_in_executor(None, listing, stack.pop())
+        for path in files:
+            if wanted is None or os.path.splitext(path)[1].lower() in wanted:
+                yield path
+        stack.extend(reversed(directories))
@@ -0,0 +1,167 @@
+"""Server version detection and endpoint selection."""
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .exceptions import (
+    UnmanicConnectionError,
+    UnmanicError,
+    UnmanicUnsupportedOperationError,
+)
+
+Version = Tuple[int, ...]
+
+_VERSION = re.compile(r"^\s*v?(\d+(?:\.\d+)*)")
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """
+    Object holding one way of performing an operation.
+
+    Attributes:
+
+    method: The HTTP method.
+
+    uri: The URI relative to the API base path.
+
+    min_version: The first Unmanic version serving it.
+    """
+
+    method: str
+    uri: str
+    min_version: Version = (0,)
+
+
+# The task endpoints that older or customised Unmanic builds may not serve,
+# each with the one endpoint known for it. The release that introduced them
+# is not recorded, so no min_version is set and support is learned from 404
+# and 405 answers. Entries giving a min_version, or several endpoints best
+# first, are also checked against the detected version. Reads and library
+# scans use their fixed endpoints and are not negotiated.
+OPERATIONS: Dict[str, List[Endpoint]] = {
+    "reprocess_history_tasks": [Endpoint("POST", "v2/history/reprocess")],
+    "delete_history_tasks": [Endpoint("DELETE", "v2/history/tasks")],
+    "delete_pending_tasks": [Endpoint("DELETE", "v2/pending/tasks")],
+    "reorder_pending_tasks": [Endpoint("POST", "v2/pending/reorder")],
+    "create_pending_task": [Endpoint("POST", "v2/pending/create")],
+}
+
+
+def parse_version(version: Optional[str]) -> Optional[Version]:
+    """
+    Parse an Unmanic version such as "0.1.4~655b18b".
+
+    Args:
+
+    version: The version reported by the server.
+
+    Returns:
+        Tuple: The numeric parts, None if the version cannot be parsed.
+    """
+    match = _VERSION.match(version or "")
+    if match is None:
+        return None
+    return tuple(int(part) for part in match.group(1).split("."))
+
+
+class Capabilities:
+    """
+    What an Unmanic server supports, detected once and cached.
+
+    The version is read with the first negotiated operation that has a
+    version-gated endpoint; until one does, it is not read at all. Endpoints
+    answering 404 or 405 are remembered, so later calls fail locally with
+    UnmanicUnsupportedOperationError instead of another round trip.
+    Endpoints declaring a min_version are skipped on older servers; when
+    the version cannot be read or parsed, every endpoint is assumed to be
+    available and only the answers narrow it down.
+
+    Attributes:
+
+    version: The version reported by the server, None until detected.
+    """
+
+    def __init__(self) -> None:
+        """Initialize unknown capabilities."""
+        self.version: Optional[str] = None
+        self._parsed: Optional[Version] = None
+        self._detected = False
+        self._unsupported: Set[Tuple[str, str]] = set()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def detected(self) -> bool:
+        """Whether detection has run."""
+        return self._detected
+
+    async def detect(self, unmanic) -> "Capabilities":
+        """
+        Read the server version, once.
+
+        Args:
+
+        unmanic: The client to read it with.
+
+        Returns:
+            Capabilities: self.
+        """
+        metrics = getattr(unmanic, "_metrics", None)
+        if self._detected:
+            if metrics is not None:
+                metrics.record_cache("capabilities", hit=True)
+            return self
+        if metrics is not None:
+            metrics.record_cache("capabilities", hit=False)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._detected:
+                try:
+                    self.version = await unmanic.get_version()
+                except UnmanicConnectionError:
+                    # Try again with the next call rather than cache an outage.
+                    raise
+                except UnmanicError:
+                    self.version = None
+                self._parsed = parse_version(self.version)
+                self._detected = True
+        return self
+
+    @staticmethod
+    def version_gated(operation: str) -> bool:
+        """Whether choosing an operation's endpoint depends on the server version."""
+        return any(endpoint.min_version > (0,) for endpoint in OPERATIONS[operation])
+
+    def endpoint(self, operation: str) -> Endpoint:
+        """
+        Choose the best endpoint for an operation.
+
+        Args:
+
+        operation: A key of OPERATIONS.
+
+        Returns:
+            Endpoint: The endpoint to call.
+        """
+        for endpoint in OPERATIONS[operation]:
+            if (endpoint.method, endpoint.uri) in self._unsupported:
+                continue
+            if self._parsed is None or self._parsed >= endpoint.min_version:
+                return endpoint
+        raise UnmanicUnsupportedOperationError(
+            f"Unable to {operation.replace('_', ' ')}, not supported by Unmanic {self.version or 'on this server'}"
+        )
+
+    def supports(self, operation: str) -> bool:
+        """Whether an operation is available, as far as is known."""
+        try:
+            self.endpoint(operation)
+        except UnmanicUnsupportedOperationError:
+            return False
+        return True
+
+    def mark_unsupported(self, endpoint: Endpoint) -> None:
+        """Remember that the server does not serve an endpoint."""
+        self._unsupported.add((endpoint.method, endpoint.uri))
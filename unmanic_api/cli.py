@@ -0,0 +1,231 @@
+"""Command line interface for Unmanic."""
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+import aiohttp
+
+from .exceptions import UnmanicError
+from .unmanic import Unmanic
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _record(value: Any) -> Any:
+    if is_dataclass(value):
+        return {key: item for key, item in asdict(value).items() if key != "stats"}
+    return value
+
+
+def parse_host(value: str, default_port: int) -> Tuple[str, int]:
+    """
+    Split a host argument into host and port.
+
+    Args:
+
+    value: host, host:port or [ipv6]:port.
+
+    default_port: The port used when none is given.
+
+    Returns:
+        Tuple: The host and port.
+    """
+    if value.startswith("["):
+        host, _, rest = value[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else default_port
+    if value.count(":") == 1:
+        host, port = value.split(":")
+        return host, int(port)
+    return value, default_port
+
+
+class JsonLinesWriter:
+    """
+    Writes one JSON object per line.
+
+    Args:
+
+    out: The text stream to write to.
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        """Initialize the writer."""
+        self.out = out
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Write a record.
+
+        Args:
+
+        record: The record.
+        """
+        self.out.write(json.dumps(record, default=_default, separators=(",", ":")) + "\n")
+
+    def flush(self) -> None:
+        """Flush the stream."""
+        self.out.flush()
+
+
+async def run_command(unmanic: Unmanic, args: argparse.Namespace, writer: JsonLinesWriter, base: Dict[str, Any]) -> None:
+    """
+    Run a command against one installation, writing records as they arrive.
+
+    Args:
+
+    unmanic: The client.
+
+    args: The parsed arguments.
+
+    writer: The output writer.
+
+    base: Fields added to every record, e.g. the host.
+    """
+    command = args.command
+
+    if command == "version":
+        writer.write({**base, "version": await unmanic.get_version()})
+    elif command == "settings":
+        writer.write({**base, **_record(await unmanic.get_settings())})
+    elif command == "workers":
+        for worker in await unmanic.get_workers_status():
+            writer.write({**base, **_record(worker)})
+    elif command in ("queue", "history"):
+        stream = unmanic.stream_pending_tasks if command == "queue" else unmanic.stream_task_history
+        async with stream(start=args.start, length=args.length, search_value=args.search) as tasks:
+            async for task in tasks:
+                writer.write({**base, **_record(task)})
+    elif command in ("pause", "resume"):
+        if args.worker_id:
+            call = unmanic.pause_worker if command == "pause" else unmanic.resume_worker
+            success = await call(args.worker_id)
+        else:
+            call = unmanic.pause_all_workers if command == "pause" else unmanic.resume_all_workers
+            success = await call()
+        writer.write({**base, "worker_id": args.worker_id, "success": success})
+    elif command == "scale":
+        writer.write({**base, "number_of_workers": args.count, "success": await unmanic.set_workers_count(args.count)})
+
+
+async def run(args: argparse.Namespace, out: TextIO = sys.stdout) -> int:
+    """
+    Run the parsed command against every host.
+
+    Hosts are handled concurrently over one shared connection pool, and in
+    watch mode the same session, and so the same connections, is reused
+    for every refresh.
+
+    Args:
+
+    args: The parsed arguments.
+
+    out: The text stream for JSON Lines output.
+
+    Returns:
+        int: The exit code, 1 if any host failed.
+    """
+    writer = JsonLinesWriter(out)
+    hosts = [parse_host(value, args.port) for value in (args.host or ["localhost"])]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failed = False
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        clients = [
+            (f"{host}:{port}", Unmanic(
+                host,
+                port,
+                base_path=args.base_path,
+                request_timeout=args.timeout,
+                session=session,
+                tls=args.tls,
+                verify_ssl=args.verify_ssl,
+            ))
+            for host, port in hosts
+        ]
+
+        async def one(unmanic: Unmanic, base: Dict[str, Any]) -> None:
+            nonlocal failed
+            async with semaphore:
+                try:
+                    await run_command(unmanic, args, writer, base)
+                except (UnmanicError, aiohttp.ClientError, asyncio.TimeoutError) as exception:
+                    # Report the host and let the others finish.
+                    failed = True
+                    writer.write({**base, "error": type(exception).__name__, "message": str(exception.args[0]) if exception.args else ""})
+
+        refresh = 0
+        while True:
+            started = time.monotonic()
+            extra = {"time": time.time()} if args.watch else {}
+            await asyncio.gather(*(one(unmanic, {"host": name, **extra}) for name, unmanic in clients))
+            writer.flush()
+
+            refresh += 1
+            if not args.watch or (args.iterations and refresh >= args.iterations):
+                break
+            await asyncio.sleep(max(0.0, args.watch - (time.monotonic() - started)))
+
+    return 1 if failed else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+
+    argv: The arguments, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="unmanic-api",
+        description="Query and control Unmanic installations, writing JSON Lines.",
+    )
+    parser.add_argument("--host", action="append", help="host, host:port or [ipv6]:port; repeatable. Defaults to localhost.")
+    parser.add_argument("--port", type=int, default=8888, help="Port for hosts given without one.")
+    parser.add_argument("--base-path", default="/unmanic/api/")
+    parser.add_argument("--tls", action="store_true", help="Connect with HTTPS.")
+    parser.add_argument("--no-verify-ssl", dest="verify_ssl", action="store_false", help="Skip certificate verification.")
+    parser.add_argument("--timeout", type=float, default=8, help="Request timeout in seconds.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Hosts queried at once.")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Repeat every SECONDS over the same connections.")
+    parser.add_argument("--iterations", type=int, help="Stop watch mode after this many refreshes.")
+
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    commands.add_parser("version", help="Server version.")
+    commands.add_parser("settings", help="Server settings.")
+    commands.add_parser("workers", help="Worker status, one line per worker.")
+    for name, help_text in (("queue", "Pending tasks, one line per task."), ("history", "Completed tasks, one line per task.")):
+        list_parser = commands.add_parser(name, help=help_text)
+        list_parser.add_argument("--start", type=int, default=0)
+        list_parser.add_argument("--length", type=int, default=10, help="Number of tasks; streamed, so large values are fine.")
+        list_parser.add_argument("--search", default="")
+    for name in ("pause", "resume"):
+        worker_parser = commands.add_parser(name, help=f"{name.capitalize()} one worker, or all workers.")
+        worker_parser.add_argument("worker_id", nargs="?", help="Defaults to all workers.")
+    scale_parser = commands.add_parser("scale", help="Set the number of workers.")
+    scale_parser.add_argument("count", type=int)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Console entry point."""
+    args = parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
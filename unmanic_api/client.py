@@ -1,11 +1,14 @@
 """Internal client for connecting to an Unmanic installation."""
 import asyncio
+import dataclasses
 import json
+import time
 import aiohttp
 import async_timeout
+from concurrent.futures import Executor
 from socket import gaierror as SocketGIAError
 from yarl import URL
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from .__version__ import __version__
 from .exceptions import (
@@ -16,6 +19,47 @@ from .exceptions import (
     UnmanicError,
     UnmanicInternalServerError,
 )
+from .metrics import MetricsRegistry
+from .tracing import RequestStats, Tracer
+from .transport import Transport
+
+DEFAULT_DECODE_THRESHOLD = 256 * 1024
+
+
+def _decode_json(content: bytes, parser: Optional[Callable[[Any], Any]] = None) -> Any:
+    """
+    Decode a JSON body and optionally parse it into a model.
+
+    Kept at module level so it can be shipped to a process pool.
+
+    Args:
+
+    content: The raw response body.
+
+    parser: A callable applied to the decoded data, e.g. TaskHistory.from_dict.
+
+    Returns:
+        The decoded (and parsed) data.
+    """
+    data = json.loads(content) if content.strip() else None
+    if parser is not None:
+        return parser(data)
+    return data
+
+
+def _decode_json_timed(content: bytes, parser: Optional[Callable[[Any], Any]] = None) -> tuple:
+    """
+    Decode a JSON body like _decode_json, also timing both steps.
+
+    Returns:
+        tuple: The decoded (and parsed) data, decode seconds, parse seconds.
+    """
+    started = time.perf_counter()
+    data = json.loads(content) if content.strip() else None
+    decoded = time.perf_counter()
+    if parser is not None:
+        data = parser(data)
+    return data, decoded - started, time.perf_counter() - decoded
 
 
 class Client:
@@ -29,10 +73,18 @@ class Client:
         tls: bool = False,
         verify_ssl: bool = True,
         user_agent: str = None,
+        decode_threshold: Optional[int] = DEFAULT_DECODE_THRESHOLD,
+        decode_executor: Optional[Executor] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        transport: Optional[Transport] = None,
     ) -> None:
         """Initialize connection to Unmanic."""
         self._session = session
         self._close_session = False
+        self._tracer = tracer
+        self._metrics = metrics
+        self._transport = transport
 
         self.base_path = base_path
         self.host = host
@@ -41,6 +93,8 @@ class Client:
         self.tls = tls
         self.verify_ssl = verify_ssl
         self.user_agent = user_agent
+        self.decode_threshold = decode_threshold
+        self.decode_executor = decode_executor
 
         if user_agent is None:
             self.user_agent = f"Unmanic-API/{__version__}"
@@ -54,6 +108,7 @@ class Client:
         method: str = 'GET',
         data: Optional[Any] = None,
         headers: Optional[Dict[str, str]] = None,
+        parser: Optional[Callable[[Any], Any]] = None,
     ) -> Any:
         """
         Handles a request to the API.
@@ -68,9 +123,142 @@ class Client:
 
         headers: The headers to send.
 
+        parser: A callable applied to the decoded response, e.g. a model's from_dict.
+            Large JSON bodies are decoded and parsed in the decode executor.
+
+        Returns:
+            The response.
+        """
+        if self._tracer is None and self._metrics is None:
+            return await self._fetch(uri, method, data, headers, parser)
+
+        stats = RequestStats(method=method, endpoint=uri)
+        try:
+            result = await self._fetch(uri, method, data, headers, parser, stats)
+        except Exception as exception:
+            stats.error = type(exception).__name__
+            raise
+        finally:
+            self._observe(stats)
+
+        if self._tracer is not None and self._tracer.attach_stats and hasattr(result, "stats"):
+            result = dataclasses.replace(result, stats=stats)
+        return result
+
+    def _observe(self, stats: RequestStats) -> None:
+        """
+        Complete a call's stats and pass them to the tracer and metrics.
+
+        Args:
+
+        stats: The stats of the finished call.
+        """
+        if self._tracer is not None:
+            self._tracer.finish(stats)
+        else:
+            stats.total = time.perf_counter() - stats.started
+        if self._metrics is not None:
+            self._metrics.observe(stats)
+
+    async def _fetch(
+        self,
+        uri: str = '',
+        method: str = 'GET',
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        parser: Optional[Callable[[Any], Any]] = None,
+        stats: Optional[RequestStats] = None,
+    ) -> Any:
+        """
+        Sends a request and reads, decodes and parses the response.
+
+        Args:
+
+        uri: The URI to request.
+
+        method: The HTTP method to use.
+
+        data: The data to send.
+
+        headers: The headers to send.
+
+        parser: A callable applied to the decoded response.
+
+        stats: The RequestStats to record timings in, None when not tracing.
+
         Returns:
             The response.
         """
+        loop = asyncio.get_event_loop()
+        deadline = None if self.request_timeout is None else loop.time() + self.request_timeout
+
+        response = await self._send(uri, method, data, headers, stats)
+        content_type = response.headers.get("Content-Type", "")
+
+        if stats is not None:
+            started = time.perf_counter()
+
+        # The timeout covers the whole exchange, so a server trickling the
+        # body cannot hold the call, or its pooled connection, for longer.
+        try:
+            async with async_timeout.timeout_at(deadline):
+                content = await response.read()
+        except asyncio.TimeoutError as exception:
+            raise UnmanicConnectionError(
+                "Timeout occurred while reading response from API"
+            ) from exception
+        except aiohttp.ClientError as exception:
+            raise UnmanicConnectionError(
+                "Error occurred while reading response from API"
+            ) from exception
+        finally:
+            response.release()
+
+        if stats is not None:
+            stats.body_read = time.perf_counter() - started
+            stats.bytes_in = len(content)
+
+        try:
+            if "application/json" in content_type:
+                return await self._decode(content, parser, stats)
+
+            text = await response.text()
+        except ValueError as exception:
+            raise UnmanicError("Unable to decode response from API") from exception
+
+        if parser is not None:
+            return parser(text)
+        return text
+
+    async def _send(
+        self,
+        uri: str = '',
+        method: str = 'GET',
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stats: Optional[RequestStats] = None,
+    ) -> aiohttp.ClientResponse:
+        """
+        Sends a request to the API and checks the response status.
+
+        The body is left unread so callers can either read it whole or
+        consume it as a stream.
+
+        Args:
+
+        uri: The URI to request.
+
+        method: The HTTP method to use.
+
+        data: The data to send.
+
+        headers: The headers to send.
+
+        stats: The RequestStats to record timings in, None when not tracing.
+
+        Returns:
+            The response, with a successful status.
+        """
         scheme = "https" if self.tls else "http"
 
         url = URL.build(
@@ -82,18 +270,23 @@ class Client:
             "Accept": "application/json, text/plain, */*",
         }
 
-        if self._session is None:
-            self._session = aiohttp.ClientSession()
-            self._close_session = True
+        if self._transport is not None:
+            send = self._transport.request
+        else:
+            send = self._http_session().request
+
+        if stats is not None and data is not None:
+            stats.bytes_out = len(data.encode("utf8") if isinstance(data, str) else data)
 
         try:
             async with async_timeout.timeout(self.request_timeout):
-                response = await self._session.request(
+                response = await send(
                     method,
                     url,
                     data=data,
                     headers=headers,
                     ssl=self.verify_ssl,
+                    trace_request_ctx=stats,
                 )
         except asyncio.TimeoutError as exception:
             raise UnmanicConnectionError(
@@ -104,6 +297,13 @@ class Client:
                 "Error occurred while communicating with API"
             ) from exception
 
+        if stats is not None:
+            stats.ttfb = time.perf_counter() - stats.started
+            stats.status = response.status
+
+        if response.status in (400, 404, 405, 500):
+            response.release()
+
         if response.status == 400:
             raise UnmanicBadRequestValidationError(
                 "Bad request; Check your request for any formatting or validation errors", {}
@@ -141,11 +341,62 @@ class Client:
                 },
             )
 
-        if "application/json" in content_type:
-            data = await response.json()
-            return data
+        return response
+
+    def _http_session(self) -> aiohttp.ClientSession:
+        """Get the aiohttp session, creating one on first use."""
+        if self._session is None:
+            trace_configs = None
+            if self._tracer is not None:
+                trace_configs = [self._tracer.trace_config()]
+            self._session = aiohttp.ClientSession(trace_configs=trace_configs)
+            self._close_session = True
+
+        if self._metrics is not None:
+            self._metrics.track_connector(f"{self.host}:{self.port}", self._session.connector)
+
+        return self._session
+
+    async def _decode(
+        self,
+        content: bytes,
+        parser: Optional[Callable[[Any], Any]] = None,
+        stats: Optional[RequestStats] = None,
+    ) -> Any:
+        """
+        Decode a JSON body, offloading large bodies from the event loop.
+
+        Bodies larger than decode_threshold bytes are decoded and parsed in
+        decode_executor (the loop's default thread pool when None). Smaller
+        bodies are decoded inline, where the executor hop would cost more
+        than it saves.
+
+        Args:
+
+        content: The raw response body.
+
+        parser: A callable applied to the decoded data.
+
+        stats: The RequestStats to record timings in, None when not tracing.
+
+        Returns:
+            The decoded (and parsed) data.
+        """
+        decode = _decode_json if stats is None else _decode_json_timed
+
+        if self.decode_threshold is None or len(content) <= self.decode_threshold:
+            result = decode(content, parser)
+        else:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                self.decode_executor, decode, content, parser
+            )
+
+        if stats is None:
+            return result
 
-        return await response.text()
+        result, stats.decode, stats.parse = result
+        return result
 
     async def close_session(self) -> None:
         """Close open client session."""
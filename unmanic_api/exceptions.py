@@ -35,3 +35,9 @@ class UnmanicInternalServerError(UnmanicError):
     """Unmanic internal server error exception."""
 
     pass
+
+
+class UnmanicUnsupportedOperationError(UnmanicError):
+    """Unmanic operation not supported by the server version exception."""
+
+    pass
@@ -0,0 +1,302 @@
+"""Streaming export of Unmanic task lists to CSV, JSON Lines and Parquet."""
+import csv
+import datetime
+import json
+import os
+import time
+from dataclasses import dataclass, fields
+from typing import Any, AsyncIterable, Callable, Dict, IO, List, Optional, Union
+
+from .exceptions import UnmanicError
+from .models import CompletedTask, PendingTask
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+
+
+@dataclass(frozen=True)
+class ExportProgress:
+    """
+    Object holding the progress of an export.
+
+    Attributes:
+
+    rows: The number of rows written so far.
+
+    total: The number of rows expected, None if unknown.
+
+    elapsed: Seconds since the export started.
+
+    rows_per_second: The average write rate so far.
+    """
+
+    rows: int
+    total: Optional[int]
+    elapsed: float
+    rows_per_second: float
+
+
+def _columns(model: type) -> List[str]:
+    """The exported columns of a model, leaving out per-call fields such as stats."""
+    return [item.name for item in fields(model) if item.name != "stats"]
+
+
+def _row(task: Any, columns: List[str]) -> Dict[str, Any]:
+    return {column: getattr(task, column) for column in columns}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _CsvWriter:
+    def __init__(self, fptr: IO, columns: List[str]) -> None:
+        self._writer = csv.writer(fptr)
+        self._writer.writerow(columns)
+        self._columns = columns
+
+    def write_batch(self, rows: List[Any]) -> None:
+        columns = self._columns
+        self._writer.writerows(
+            [value.isoformat() if isinstance(value, datetime.datetime) else value for value in (getattr(row, column) for column in columns)]
+            for row in rows
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class _JsonLinesWriter:
+    def __init__(self, fptr: IO, columns: List[str]) -> None:
+        self._fptr = fptr
+        self._columns = columns
+        self._encoder = json.JSONEncoder(default=_default, separators=(",", ":"))
+
+    def write_batch(self, rows: List[Any]) -> None:
+        encode = self._encoder.encode
+        columns = self._columns
+        self._fptr.write("".join(encode(_row(row, columns)) + "\n" for row in rows))
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetWriter:
+    """Writes every batch as one Parquet row group."""
+
+    def __init__(self, fptr: Union[str, IO], model: type) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise UnmanicError("Parquet export requires pyarrow, install unmanic_api[parquet].")
+
+        types = {int: pa.int64(), str: pa.string(), bool: pa.bool_(), datetime: pa.timestamp("s")}
+        self._pa = pa
+        self._columns = _columns(model)
+        self._schema = pa.schema([
+            (item.name, types.get(item.type, pa.string()))
+            for item in fields(model)
+            if item.name != "stats"
+        ])
+        self._writer = pq.ParquetWriter(fptr, self._schema)
+
+    def write_batch(self, rows: List[Any]) -> None:
+        arrays = [
+            self._pa.array([getattr(row, column) for row in rows], type=self._schema.field(column).type)
+            for column in self._columns
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def detect_format(path: str) -> str:
+    """
+    Guess the export format from a file name.
+
+    Args:
+
+    path: The file name.
+
+    Returns:
+        str: One of csv, jsonl or parquet.
+    """
+    _, extension = os.path.splitext(str(path))
+    try:
+        return _EXTENSIONS[extension.lower()]
+    except KeyError:
+        raise UnmanicError(f"Unable to detect export format of {path}, pass format explicitly.")
+
+
+async def export_rows(
+    rows: AsyncIterable[Any],
+    path: Union[str, IO],
+    model: type,
+    format: Optional[str] = None,
+    batch_size: int = 10000,
+    progress: Optional[Callable[[ExportProgress], None]] = None,
+    total: Optional[Callable[[], Optional[int]]] = None,
+) -> int:
+    """
+    Write models from an async iterable to a file, one batch at a time.
+
+    At most batch_size rows are held in memory; each batch is written and
+    dropped before the next one is collected, so memory does not grow with
+    the number of rows.
+
+    Args:
+
+    rows: The models to write, e.g. unmanic.iter_task_history().
+
+    path: A file name, or an open file (text for csv and jsonl, binary for parquet).
+
+    model: The model class of the rows, which gives the columns.
+
+    format: csv, jsonl or parquet. Detected from the file name if not given.
+
+    batch_size: Rows per batch, and per row group for parquet.
+
+    progress: Called with an ExportProgress after every batch.
+
+    total: Called for the expected number of rows when reporting progress.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if format is None:
+        format = detect_format(path)
+    if format not in FORMATS:
+        raise UnmanicError(f"Unknown export format {format}, expected one of {', '.join(FORMATS)}.")
+    if batch_size < 1:
+        raise UnmanicError("batch_size must be at least 1.")
+
+    opened = isinstance(path, (str, os.PathLike))
+    if format == "parquet":
+        fptr = path
+    elif opened:
+        fptr = open(path, "w", newline="", encoding="utf-8")
+    else:
+        fptr = path
+
+    columns = _columns(model)
+    started = time.perf_counter()
+    written = 0
+
+    try:
+        if format == "csv":
+            writer = _CsvWriter(fptr, columns)
+        elif format == "jsonl":
+            writer = _JsonLinesWriter(fptr, columns)
+        else:
+            writer = _ParquetWriter(str(fptr) if opened else fptr, model)
+
+        def report() -> None:
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                progress(ExportProgress(
+                    rows=written,
+                    total=total() if total is not None else None,
+                    elapsed=elapsed,
+                    rows_per_second=written / elapsed if elapsed > 0 else 0.0,
+                ))
+
+        try:
+            batch: List[Any] = []
+            async for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    writer.write_batch(batch)
+                    written += len(batch)
+                    batch = []
+                    report()
+            if batch:
+                writer.write_batch(batch)
+                written += len(batch)
+                report()
+        finally:
+            writer.close()
+    finally:
+        if opened and format != "parquet":
+            fptr.close()
+
+    return written
+
+
+async def export_task_history(
+    unmanic,
+    path: Union[str, IO],
+    format: Optional[str] = None,
+    page_size: int = 1000,
+    batch_size: int = 10000,
+    search_value: str = "",
+    progress: Optional[Callable[[ExportProgress], None]] = None,
+) -> int:
+    """
+    Export the whole task history, streaming it page by page.
+
+    Args:
+
+    unmanic: The Unmanic client.
+
+    path: A file name or an open file.
+
+    format: csv, jsonl or parquet. Detected from the file name if not given.
+
+    page_size: Tasks requested per page.
+
+    batch_size: Rows written per batch.
+
+    search_value: Only export tasks matching this search.
+
+    progress: Called with an ExportProgress after every batch.
+
+    Returns:
+        int: The number of rows written.
+    """
+    pages = unmanic.iter_task_history(page_size=page_size, search_value=search_value)
+    return await export_rows(pages, path, CompletedTask, format, batch_size, progress, lambda: pages.recordsFiltered)
+
+
+async def export_pending_tasks(
+    unmanic,
+    path: Union[str, IO],
+    format: Optional[str] = None,
+    page_size: int = 1000,
+    batch_size: int = 10000,
+    search_value: str = "",
+    progress: Optional[Callable[[ExportProgress], None]] = None,
+) -> int:
+    """
+    Export the whole pending task queue, streaming it page by page.
+
+    Args:
+
+    unmanic: The Unmanic client.
+
+    path: A file name or an open file.
+
+    format: csv, jsonl or parquet. Detected from the file name if not given.
+
+    page_size: Tasks requested per page.
+
+    batch_size: Rows written per batch.
+
+    search_value: Only export tasks matching this search.
+
+    progress: Called with an ExportProgress after every batch.
+
+    Returns:
+        int: The number of rows written.
+    """
+    pages = unmanic.iter_pending_tasks(page_size=page_size, search_value=search_value)
+    return await export_rows(pages, path, PendingTask, format, batch_size, progress, lambda: pages.recordsFiltered)
@@ -0,0 +1,233 @@
+"""Transport failing over between several endpoints of one Unmanic installation."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiohttp
+from yarl import URL
+
+from .exceptions import UnmanicError
+from .transport import Transport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EndpointHealth:
+    """
+    Object holding the last known health of an endpoint.
+
+    Attributes:
+
+    url: The endpoint, e.g. URL("http://proxy-a:8888").
+
+    healthy: Whether the last check or request succeeded.
+
+    latency: Smoothed seconds taken by the health check, None until checked.
+
+    checked: When the endpoint was last checked, as a time.time() timestamp.
+
+    error: Why it was last marked unhealthy, None if it is healthy.
+    """
+
+    url: URL
+    healthy: bool = True
+    latency: Optional[float] = None
+    checked: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _endpoint_url(endpoint: str) -> URL:
+    url = URL(endpoint if "://" in endpoint else f"http://{endpoint}")
+    if not url.host:
+        raise UnmanicError(f"Invalid Unmanic endpoint: {endpoint}")
+    return url.with_path("")
+
+
+class FailoverTransport(Transport):
+    """
+    Transport routing each request to the fastest healthy of several endpoints.
+
+    Endpoints are checked in the background every interval seconds with
+    v2/version/read, timing each check. Requests go to the healthy endpoint
+    with the lowest smoothed latency, in the order listed until the first
+    checks complete. An endpoint that refuses or does not accept a
+    connection within connect_timeout is marked unhealthy at once and the
+    request is sent to the next one; no request body has been sent at that
+    point, so this is safe for every method. Unhealthy endpoints are still
+    tried last, in case every check is stale. Errors after a connection is
+    made are not retried, only the endpoint is marked unhealthy.
+
+    The scheme, host and port of each request come from the endpoint; the
+    client's base path and request path are kept, so its host and tls
+    settings are ignored.
+
+    Usage:
+        async with FailoverTransport(["proxy-a:8888", "https://proxy-b"]) as transport:
+            async with Unmanic(transport=transport) as unmanic:
+                ...
+
+    Args:
+
+    endpoints: The endpoints in order of preference, as "host:port" or
+        "scheme://host:port".
+
+    interval: Seconds between health checks, None to check only on request
+        failures and explicit check() calls.
+
+    connect_timeout: Seconds to wait for a socket to connect before failing
+        over; time spent waiting for a free connection in the pool is not
+        limited.
+
+    check_timeout: Seconds a health check may take.
+
+    base_path: The base path of the API, used by health checks.
+
+    session: The aiohttp.ClientSession to use, one is created when None.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[str],
+        interval: Optional[float] = 5.0,
+        connect_timeout: float = 1.0,
+        check_timeout: float = 2.0,
+        base_path: str = "/unmanic/api/",
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        """Initialize the transport."""
+        if not endpoints:
+            raise UnmanicError("FailoverTransport needs at least one endpoint.")
+        self.interval = interval
+        self.connect_timeout = connect_timeout
+        self.check_timeout = check_timeout
+        self.base_path = base_path if base_path.endswith("/") else base_path + "/"
+        self.failovers = 0
+        self._health: List[EndpointHealth] = [EndpointHealth(_endpoint_url(endpoint)) for endpoint in endpoints]
+        self._session = session
+        self._close_session = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def health(self) -> List[EndpointHealth]:
+        """The last known health of every endpoint, in the order given."""
+        return list(self._health)
+
+    @property
+    def active(self) -> URL:
+        """The endpoint the next request will be sent to."""
+        return self._health[self._order()[0]].url
+
+    def _order(self) -> List[int]:
+        def key(index: int):
+            health = self._health[index]
+            latency = health.latency if health.latency is not None else float("inf")
+            return (not health.healthy, latency, index)
+
+        return sorted(range(len(self._health)), key=key)
+
+    def _http_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+            self._close_session = True
+        return self._session
+
+    def _mark(self, index: int, error: Optional[str], latency: Optional[float] = None) -> None:
+        health = self._health[index]
+        if error is None and health.latency is not None and latency is not None:
+            # Smooth out jitter so routing does not flap between similar endpoints.
+            latency = 0.7 * health.latency + 0.3 * latency
+        self._health[index] = EndpointHealth(
+            health.url,
+            healthy=error is None,
+            latency=latency if error is None else None,
+            checked=time.time(),
+            error=error,
+        )
+
+    async def check(self) -> List[EndpointHealth]:
+        """
+        Check every endpoint once, concurrently.
+
+        Returns:
+            List: The EndpointHealth of every endpoint, in the order given.
+        """
+        await asyncio.gather(*(self._check(index) for index in range(len(self._health))))
+        return self.health
+
+    async def _check(self, index: int) -> None:
+        url = self._health[index].url.with_path(self.base_path + "v2/version/read")
+        started = time.perf_counter()
+        try:
+            response = await self._http_session().get(url, timeout=aiohttp.ClientTimeout(total=self.check_timeout))
+            try:
+                await response.read()
+            finally:
+                response.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exception:
+            self._mark(index, f"{type(exception).__name__}: {exception}")
+            return
+        if response.status != 200:
+            self._mark(index, f"HTTP {response.status}")
+            return
+        self._mark(index, None, time.perf_counter() - started)
+
+    def start(self) -> None:
+        """Run health checks in the background every interval seconds."""
+        if self.interval is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    async def request(
+        self,
+        method: str,
+        url: Any,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        ssl: bool = True,
+        trace_request_ctx: Optional[Any] = None,
+    ) -> aiohttp.ClientResponse:
+        """Send a request to the fastest healthy endpoint, failing over on connection errors."""
+        self.start()
+        session = self._http_session()
+        # sock_connect, not connect: waiting for a free pooled connection is
+        # not a sign that the endpoint is down.
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout)
+
+        order = self._order()
+        for attempt, index in enumerate(order):
+            endpoint = self._health[index].url
+            target = url.with_scheme(endpoint.scheme).with_host(endpoint.host).with_port(endpoint.port)
+            try:
+                return await session.request(
+                    method, target, data=data, headers=headers, ssl=ssl, timeout=timeout, trace_request_ctx=trace_request_ctx
+                )
+            except (aiohttp.ClientConnectorError, aiohttp.ServerTimeoutError) as exception:
+                # Nothing was sent, so the next endpoint can take the request.
+                self._mark(index, f"{type(exception).__name__}: {exception}")
+                if attempt == len(order) - 1:
+                    raise
+                self.failovers += 1
+                _LOGGER.warning("Unmanic endpoint %s is unreachable, failing over: %s", endpoint, exception)
+            except aiohttp.ClientError as exception:
+                self._mark(index, f"{type(exception).__name__}: {exception}")
+                raise
+
+    async def close(self) -> None:
+        """Stop health checks and close the session, if it was created here."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None and self._close_session:
+            await self._session.close()
+            self._session = None
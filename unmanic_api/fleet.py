@@ -0,0 +1,332 @@
+"""Least-loaded placement of new tasks across several Unmanic installations."""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+from .exceptions import UnmanicConnectionError, UnmanicError
+from .metrics import family, format_labels
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LoadWeights:
+    """
+    Object holding the weights of each load signal in a node's score.
+
+    Attributes:
+
+    queue: Weight of the pending tasks per available worker.
+
+    busy: Weight of the fraction of available workers already busy.
+
+    drain: Weight of the hours needed to clear the queue at the recent
+        throughput, ignored until the node has finished a task in the window.
+    """
+
+    queue: float = 1.0
+    busy: float = 0.5
+    drain: float = 1.0
+
+
+@dataclass(frozen=True)
+class NodeLoad:
+    """
+    Object holding the cached load of one node.
+
+    Attributes:
+
+    name: The node name.
+
+    healthy: Whether the last refresh succeeded.
+
+    workers: The number of workers configured.
+
+    available: The number of workers not paused.
+
+    busy: The number of available workers processing a task.
+
+    queued: The pending tasks, including those placed since the last refresh.
+
+    throughput: Tasks finished per hour over the history window, which
+        ends at the node's newest finished task.
+
+    score: The weighted load, lower is better; infinite when the node
+        cannot take work.
+
+    refreshed: When the load was last read, as a time.time() timestamp.
+
+    error: Why the last refresh failed, None if it succeeded.
+    """
+
+    name: str
+    healthy: bool = False
+    workers: int = 0
+    available: int = 0
+    busy: int = 0
+    queued: int = 0
+    throughput: float = 0.0
+    score: float = math.inf
+    refreshed: Optional[float] = None
+    error: Optional[str] = None
+
+
+def load_score(load: NodeLoad, weights: LoadWeights = LoadWeights()) -> float:
+    """
+    Score a node's load.
+
+    Args:
+
+    load: The node's load.
+
+    weights: The weight of each signal.
+
+    Returns:
+        float: The score, lower is better; infinite for unhealthy nodes and
+        nodes without an available worker.
+    """
+    if not load.healthy or load.available <= 0:
+        return math.inf
+    score = weights.queue * load.queued / load.available
+    score += weights.busy * min(load.busy, load.available) / load.available
+    if load.throughput > 0:
+        score += weights.drain * (load.queued + load.busy) / load.throughput
+    return score
+
+
+class FleetScheduler:
+    """
+    Routes new tasks to the least-loaded healthy node of a fleet.
+
+    Each refresh reads, from every node concurrently, the worker status,
+    number_of_workers, the pending queue depth and the tasks finished within
+    history_window, and caches a NodeLoad scored with load_score. Placements
+    then run against the cache: each one counts towards its node's queue, so
+    a burst of enqueues spreads out between refreshes. A node whose refresh
+    or enqueue fails with a connection error is skipped until a later refresh
+    succeeds.
+
+    Usage:
+        fleet = FleetScheduler({"a": Unmanic("a"), "b": Unmanic("b")})
+        await fleet.refresh()
+        fleet.start()
+        node = await fleet.enqueue("/library/new/episode.mkv")
+
+    Args:
+
+    nodes: The clients of the nodes, by name.
+
+    weights: The weight of each load signal.
+
+    refresh_interval: Seconds between background refreshes.
+
+    history_window: Seconds of history, up to the newest finished task,
+        used to measure throughput.
+
+    Attributes:
+
+    placements: The tasks placed on each node.
+
+    refreshes: The number of refreshes run.
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, object],
+        weights: LoadWeights = LoadWeights(),
+        refresh_interval: float = 30.0,
+        history_window: float = 3600.0,
+    ) -> None:
+        """Initialize the scheduler."""
+        if not nodes:
+            raise UnmanicError("FleetScheduler needs at least one node.")
+        self.nodes = dict(nodes)
+        self.weights = weights
+        self.refresh_interval = refresh_interval
+        self.history_window = history_window
+        self.placements: Dict[str, int] = {name: 0 for name in self.nodes}
+        self.refreshes = 0
+        self._loads: Dict[str, NodeLoad] = {name: NodeLoad(name) for name in self.nodes}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def loads(self) -> Dict[str, NodeLoad]:
+        """The cached load of every node, by name."""
+        return dict(self._loads)
+
+    async def refresh(self) -> Dict[str, NodeLoad]:
+        """
+        Read the load of every node.
+
+        Returns:
+            Dict: The new NodeLoads, by name.
+        """
+        names = list(self.nodes)
+        loads = await asyncio.gather(*(self._read(name) for name in names))
+        self._loads = dict(zip(names, loads))
+        self.refreshes += 1
+        return self.loads
+
+    async def _read(self, name: str) -> NodeLoad:
+        unmanic = self.nodes[name]
+        try:
+            workers, settings, queue, throughput = await asyncio.gather(
+                unmanic.get_workers_status(),
+                unmanic.get_settings(),
+                unmanic.get_pending_tasks(length=1),
+                self._throughput(unmanic),
+            )
+        except UnmanicError as exception:
+            _LOGGER.warning("Unable to read the load of Unmanic node %s: %s", name, exception)
+            return NodeLoad(name, error=f"{type(exception).__name__}: {exception}", refreshed=time.time())
+
+        configured = settings.number_of_workers or 0
+        paused = sum(1 for worker in workers if worker.paused)
+        load = NodeLoad(
+            name,
+            healthy=True,
+            workers=configured,
+            available=max(configured - paused, 0),
+            busy=sum(1 for worker in workers if not worker.idle and not worker.paused),
+            queued=queue.recordsTotal or 0,
+            throughput=throughput,
+            refreshed=time.time(),
+        )
+        return replace(load, score=load_score(load, self.weights))
+
+    async def _throughput(self, unmanic) -> float:
+        # The window ends at the newest finish_time, so only the server's
+        # clock is involved.
+        since = None
+        finished = 0
+        history = unmanic.iter_task_history(page_size=100, order_by="finish_time", order_direction="desc")
+        async for task in history:
+            if since is None:
+                since = task.finish_time.timestamp() - self.history_window
+            elif task.finish_time.timestamp() <= since:
+                break
+            finished += 1
+        return finished * 3600.0 / self.history_window
+
+    def choose(self) -> NodeLoad:
+        """
+        Choose the node to place the next task on, from the cached loads.
+
+        Ties go to the node with fewer placements, then the first listed.
+
+        Returns:
+            NodeLoad: The least-loaded node.
+        """
+        order = {name: index for index, name in enumerate(self.nodes)}
+        load = min(self._loads.values(), key=lambda load: (load.score, self.placements[load.name], order[load.name]))
+        if math.isinf(load.score):
+            raise UnmanicConnectionError("No healthy Unmanic node with an available worker")
+        return load
+
+    async def enqueue(self, path: str, library_id: Optional[int] = None, priority_score: int = 0) -> str:
+        """
+        Add a file to the pending queue of the least-loaded node.
+
+        A node answering with a connection error is marked unhealthy and the
+        next least-loaded node is tried.
+
+        Args:
+
+        path: The absolute path of the file, the same on every node.
+
+        library_id: The library to add it to, the default library if None.
+
+        priority_score: Added to the task's priority.
+
+        Returns:
+            str: The name of the node the task was placed on.
+        """
+        while True:
+            load = self.choose()
+            try:
+                success = await self.nodes[load.name].create_pending_task(path, library_id, priority_score)
+            except UnmanicConnectionError as exception:
+                self._loads[load.name] = replace(load, healthy=False, score=math.inf, error=f"{type(exception).__name__}: {exception}")
+                continue
+            if not success:
+                raise UnmanicError(f"Unable to add {path} to the pending queue of {load.name}")
+            self._place(load)
+            return load.name
+
+    def _place(self, load: NodeLoad) -> None:
+        placed = replace(load, queued=load.queued + 1)
+        self._loads[load.name] = replace(placed, score=load_score(placed, self.weights))
+        self.placements[load.name] += 1
+
+    def imbalance(self) -> float:
+        """
+        How unevenly loaded the healthy nodes are.
+
+        Returns:
+            float: The coefficient of variation of their scores, 0 when
+            perfectly balanced or with fewer than two healthy nodes.
+        """
+        scores = [load.score for load in self._loads.values() if not math.isinf(load.score)]
+        if len(scores) < 2:
+            return 0.0
+        mean = sum(scores) / len(scores)
+        if mean == 0:
+            return 0.0
+        variance = sum((score - mean) ** 2 for score in scores) / len(scores)
+        return math.sqrt(variance) / mean
+
+    def start(self) -> None:
+        """Refresh in the background every refresh_interval seconds."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop background refreshes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def render(self) -> str:
+        """
+        Render the fleet metrics in the Prometheus text format.
+
+        The scheduler can be served like a MetricsRegistry, e.g. with
+        metrics_handler(fleet).
+
+        Returns:
+            str: The exposition text.
+        """
+        lines: List[str] = []
+
+        loads = sorted(self._loads.values(), key=lambda load: load.name)
+        family(lines, "unmanic_api_fleet_node_healthy", "gauge", "Whether the last load refresh of the node succeeded.")
+        for load in loads:
+            lines.append(f"unmanic_api_fleet_node_healthy{format_labels(node=load.name)} {int(load.healthy)}")
+        family(lines, "unmanic_api_fleet_node_score", "gauge", "Cached load score of the node, lower is better.")
+        for load in loads:
+            lines.append(f"unmanic_api_fleet_node_score{format_labels(node=load.name)} {'+Inf' if math.isinf(load.score) else repr(load.score)}")
+        family(lines, "unmanic_api_fleet_node_queued", "gauge", "Pending tasks of the node, including placements since the last refresh.")
+        for load in loads:
+            lines.append(f"unmanic_api_fleet_node_queued{format_labels(node=load.name)} {load.queued}")
+        family(lines, "unmanic_api_fleet_node_throughput", "gauge", "Tasks finished per hour over the history window.")
+        for load in loads:
+            lines.append(f"unmanic_api_fleet_node_throughput{format_labels(node=load.name)} {load.throughput!r}")
+        family(lines, "unmanic_api_fleet_placements_total", "counter", "Tasks placed on the node.")
+        for name, count in sorted(self.placements.items()):
+            lines.append(f"unmanic_api_fleet_placements_total{format_labels(node=name)} {count}")
+        family(lines, "unmanic_api_fleet_imbalance", "gauge", "Coefficient of variation of the healthy node scores.")
+        lines.append(f"unmanic_api_fleet_imbalance {self.imbalance()!r}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,363 @@
+"""In-process client metrics for Unmanic, with a Prometheus text exporter."""
+import bisect
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .tracing import RequestStats
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Observations cost a binary search and an increment, and memory does not
+    grow with the number of observations.
+
+    Args:
+
+    buckets: Ascending upper bounds; an implicit +Inf bucket is added.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observation.
+
+        Args:
+
+        value: The observed value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by interpolating within its bucket.
+
+        Args:
+
+        q: The quantile, 0-1.
+
+        Returns:
+            float: The estimate, None without observations. Values in the +Inf
+            bucket are reported as the largest finite bound.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Cumulative bucket counts, as exported to Prometheus.
+
+        Returns:
+            List: (upper bound, count) pairs ending with +Inf.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class MetricsRegistry:
+    """
+    Client-side metrics for one or more Unmanic clients.
+
+    Pass an instance to Unmanic(metrics=...) and every call records its
+    count, errors by exception class, latency and bytes per endpoint.
+    Connection pool usage is read from the session connectors at export
+    time. Caches report hits and misses through record_cache: the server
+    version cache as "capabilities" and ClientRegistry session lookups as
+    "shared_session".
+
+    Args:
+
+    buckets: Latency histogram bucket bounds in seconds.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize the registry."""
+        self.buckets = tuple(buckets)
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.bytes_in: Dict[Tuple[str, str], int] = {}
+        self.bytes_out: Dict[Tuple[str, str], int] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self._connectors: Dict[str, Any] = {}
+
+    def observe(self, stats: RequestStats) -> None:
+        """
+        Record a completed call.
+
+        Args:
+
+        stats: The call's RequestStats.
+        """
+        key = (stats.endpoint, stats.method)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.bytes_in[key] = self.bytes_in.get(key, 0) + stats.bytes_in
+        self.bytes_out[key] = self.bytes_out.get(key, 0) + stats.bytes_out
+
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(stats.total or 0.0)
+
+        if stats.error is not None:
+            error_key = (stats.endpoint, stats.method, stats.error)
+            self.errors[error_key] = self.errors.get(error_key, 0) + 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """
+        Record a cache lookup.
+
+        Args:
+
+        cache: The cache name.
+
+        hit: Whether the lookup was a hit.
+        """
+        key = (cache, "hit" if hit else "miss")
+        self.cache[key] = self.cache.get(key, 0) + 1
+
+    def cache_hit_rate(self, cache: str) -> Optional[float]:
+        """
+        Get the hit rate of a cache.
+
+        Args:
+
+        cache: The cache name.
+
+        Returns:
+            float: Hits over lookups, None without lookups.
+        """
+        hits = self.cache.get((cache, "hit"), 0)
+        total = hits + self.cache.get((cache, "miss"), 0)
+        return hits / total if total else None
+
+    def track_connector(self, pool: str, connector: Any) -> None:
+        """
+        Report the usage of a connection pool.
+
+        Args:
+
+        pool: The pool name, e.g. host:port.
+
+        connector: The aiohttp connector.
+        """
+        self._connectors[pool] = connector
+
+    def pool_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Get the usage of the tracked connection pools.
+
+        Returns:
+            Dict: (connections in use, limit) per pool; a limit of 0 is unlimited.
+        """
+        usage = {}
+        for pool, connector in self._connectors.items():
+            if connector is None or connector.closed:
+                continue
+            # aiohttp has no public accessor for the acquired connections.
+            usage[pool] = (len(getattr(connector, "_acquired", ())), connector.limit)
+        return usage
+
+    def latency_quantile(self, endpoint: str, q: float, method: Optional[str] = None) -> Optional[float]:
+        """
+        Estimate a latency quantile for an endpoint.
+
+        Args:
+
+        endpoint: The endpoint, e.g. v2/history/tasks.
+
+        q: The quantile, 0-1.
+
+        method: The HTTP method, defaults to any.
+
+        Returns:
+            float: The estimate in seconds, None without observations.
+        """
+        merged = Histogram(self.buckets)
+        for (key_endpoint, key_method), histogram in self.latency.items():
+            if key_endpoint == endpoint and method in (None, key_method):
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+        return merged.quantile(q)
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines: List[str] = []
+
+        family(lines, "unmanic_api_requests_total", "counter", "API calls made.")
+        for (endpoint, method), value in sorted(self.requests.items()):
+            lines.append(f"unmanic_api_requests_total{format_labels(endpoint=endpoint, method=method)} {value}")
+
+        family(lines, "unmanic_api_errors_total", "counter", "API calls that raised, by exception class.")
+        for (endpoint, method, error), value in sorted(self.errors.items()):
+            lines.append(f"unmanic_api_errors_total{format_labels(endpoint=endpoint, method=method, exception=error)} {value}")
+
+        family(lines, "unmanic_api_request_duration_seconds", "histogram", "API call latency.")
+        for (endpoint, method), histogram in sorted(self.latency.items()):
+            for bound, value in histogram.cumulative():
+                labels = format_labels(endpoint=endpoint, method=method, le=bound)
+                lines.append(f"unmanic_api_request_duration_seconds_bucket{labels} {value}")
+            labels = format_labels(endpoint=endpoint, method=method)
+            lines.append(f"unmanic_api_request_duration_seconds_sum{labels} {histogram.sum!r}")
+            lines.append(f"unmanic_api_request_duration_seconds_count{labels} {histogram.count}")
+
+        family(lines, "unmanic_api_received_bytes_total", "counter", "Response body bytes received.")
+        for (endpoint, method), value in sorted(self.bytes_in.items()):
+            lines.append(f"unmanic_api_received_bytes_total{format_labels(endpoint=endpoint, method=method)} {value}")
+
+        family(lines, "unmanic_api_sent_bytes_total", "counter", "Request body bytes sent.")
+        for (endpoint, method), value in sorted(self.bytes_out.items()):
+            lines.append(f"unmanic_api_sent_bytes_total{format_labels(endpoint=endpoint, method=method)} {value}")
+
+        usage = self.pool_usage()
+        family(lines, "unmanic_api_pool_connections_in_use", "gauge", "Connections currently acquired from the pool.")
+        for pool, (in_use, _) in sorted(usage.items()):
+            lines.append(f"unmanic_api_pool_connections_in_use{format_labels(pool=pool)} {in_use}")
+        family(lines, "unmanic_api_pool_connections_limit", "gauge", "Connection pool limit, 0 for unlimited.")
+        for pool, (_, limit) in sorted(usage.items()):
+            lines.append(f"unmanic_api_pool_connections_limit{format_labels(pool=pool)} {limit}")
+
+        family(lines, "unmanic_api_cache_requests_total", "counter", "Cache lookups by result.")
+        for (cache, result), value in sorted(self.cache.items()):
+            lines.append(f"unmanic_api_cache_requests_total{format_labels(cache=cache, result=result)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(**labels: str) -> str:
+    """
+    Format a Prometheus label set, escaping the values.
+
+    Returns:
+        str: The labels, e.g. {node="a"}.
+    """
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def family(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    """
+    Start a metric family in Prometheus text output.
+
+    Args:
+
+    lines: The output lines to append the HELP and TYPE lines to.
+
+    name: The metric name.
+
+    kind: The metric type, e.g. counter or gauge.
+
+    help_text: The description.
+    """
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def metrics_handler(registry: MetricsRegistry):
+    """
+    Create an aiohttp handler serving a registry, to mount in an existing app.
+
+    Args:
+
+    registry: The registry to serve.
+
+    Returns:
+        The aiohttp request handler.
+    """
+    # Imported here so clients not serving metrics never load aiohttp.web.
+    from aiohttp import web
+
+    async def handler(request: "web.Request") -> "web.Response":
+        return web.Response(
+            body=registry.render().encode("utf8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    return handler
+
+
+class MetricsServer:
+    """
+    Tiny local HTTP server exposing a registry at /metrics.
+
+    Args:
+
+    registry: The registry to serve.
+
+    host: The interface to listen on.
+
+    port: The port to listen on, 0 picks a free port.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464) -> None:
+        """Initialize the server."""
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional["web.AppRunner"] = None
+
+    async def start(self) -> "MetricsServer":
+        """Start listening; port is updated with the bound port."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics_handler(self.registry))
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MetricsServer":
+        """Async enter."""
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self.close()
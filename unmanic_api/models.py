@@ -1,8 +1,8 @@
 """Models for Unmanic."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from .exceptions import UnmanicError
 
@@ -62,11 +62,14 @@ class TaskQueue:
     recordsFiltered: The number of records after filtering.
 
     results: The list of PendingTasks.
+
+    stats: The RequestStats of the call, when traced with attach_stats.
     """
 
     recordsTotal: int
     recordsFiltered: int
     results: List
+    stats: Optional[Any] = field(default=None, compare=False, repr=False)
 
     @staticmethod
     def from_dict(data: dict):
@@ -125,11 +128,14 @@ class TaskHistory:
     recordsFiltered: The number of records after filtering.
 
     results: The list of CompletedTasks.
+
+    stats: The RequestStats of the call, when traced with attach_stats.
     """
 
     recordsTotal: int
     recordsFiltered: int
     results: List
+    stats: Optional[Any] = field(default=None, compare=False, repr=False)
 
     @staticmethod
     def from_dict(data: dict):
@@ -260,3 +266,41 @@ class Settings:
             distributed_worker_count_target=data.get(
                 "distributed_worker_count_target"),
         )
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Object holding a dashboard view of Unmanic, fetched concurrently.
+
+    Sections that failed or ran out of time are None, with the reason in
+    errors.
+
+    Attributes:
+
+    version: The Unmanic version.
+
+    settings: The Settings.
+
+    workers: The list of Workers.
+
+    queue: The TaskQueue head.
+
+    history: The TaskHistory head.
+
+    timings: Seconds each section took, including failed ones.
+
+    errors: The error of each failed section.
+    """
+
+    version: Optional[str]
+    settings: Optional[Settings]
+    workers: Optional[List[Worker]]
+    queue: Optional[TaskQueue]
+    history: Optional[TaskHistory]
+    timings: Dict[str, float]
+    errors: Dict[str, str]
+
+    @property
+    def complete(self) -> bool:
+        """Whether every section was fetched."""
+        return not self.errors
@@ -0,0 +1,261 @@
+"""Locally indexed mirror of the Unmanic pending queue."""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .exceptions import UnmanicError
+from .models import PendingTask
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QueueDiff:
+    """
+    Object holding the changes between two queue snapshots.
+
+    Attributes:
+
+    added: Tasks new in the latest snapshot.
+
+    removed: Tasks gone from the latest snapshot.
+
+    changed: Tasks whose fields changed, as in the latest snapshot.
+    """
+
+    added: List[PendingTask]
+    removed: List[PendingTask]
+    changed: List[PendingTask]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class _Node:
+    """A path component in the prefix trie, holding the tasks whose path ends at it."""
+
+    __slots__ = ("children", "count", "tasks")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.count = 0
+        self.tasks: Dict[int, PendingTask] = {}
+
+
+def _parts(path: str) -> List[str]:
+    return [part for part in path.split("/") if part]
+
+
+class QueueIndex:
+    """
+    Pending queue mirrored locally, with abspath and directory indexes.
+
+    Each refresh reads one snapshot of the whole queue in a single request,
+    so tasks leaving the queue meanwhile cannot shift offset pages, and
+    applies only the difference from the previous one, by task id, to a
+    hash index on abspath and a trie of path components. Lookups then run locally in
+    constant time for a path, time proportional to the path depth to count
+    a directory, or to the size of its subtree to list it, instead of one
+    server side search each.
+
+    Usage:
+        index = QueueIndex(unmanic)
+        await index.refresh()
+        if "/library/x.mkv" in index: ...
+        index.start(30)
+
+    Args:
+
+    unmanic: The Unmanic client to read the queue with.
+
+    page_size: Tasks requested by the first read of each refresh; a larger
+        queue is then read whole.
+
+    Attributes:
+
+    refreshes: The number of snapshots applied.
+    """
+
+    def __init__(self, unmanic=None, page_size: int = 500) -> None:
+        """Initialize an empty index."""
+        self._unmanic = unmanic
+        self._page_size = page_size
+        self._by_id: Dict[int, PendingTask] = {}
+        self._by_path: Dict[str, PendingTask] = {}
+        self._root = _Node()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+    def get(self, path: str) -> Optional[PendingTask]:
+        """
+        Get the pending task for a file.
+
+        Args:
+
+        path: The absolute path of the file.
+
+        Returns:
+            PendingTask: The task, None if the file is not queued.
+        """
+        return self._by_path.get(path)
+
+    def get_by_id(self, task_id: int) -> Optional[PendingTask]:
+        """Get a pending task by id, None if it is not queued."""
+        return self._by_id.get(task_id)
+
+    def count_under(self, directory: str) -> int:
+        """
+        Count the tasks queued anywhere under a directory.
+
+        Args:
+
+        directory: The directory, with or without a trailing slash.
+
+        Returns:
+            int: The number of queued files under it.
+        """
+        node = self._root
+        for part in _parts(directory):
+            node = node.children.get(part)
+            if node is None:
+                return 0
+        return node.count
+
+    def has_under(self, directory: str) -> bool:
+        """Whether anything is queued under a directory."""
+        return self.count_under(directory) > 0
+
+    def tasks_under(self, directory: str) -> List[PendingTask]:
+        """
+        List the tasks queued under a directory.
+
+        Only the directory's subtree of the trie is visited.
+
+        Args:
+
+        directory: The directory, with or without a trailing slash.
+
+        Returns:
+            List: The PendingTasks under it.
+        """
+        node = self._root
+        for part in _parts(directory):
+            node = node.children.get(part)
+            if node is None:
+                return []
+
+        tasks: List[PendingTask] = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            tasks.extend(node.tasks.values())
+            stack.extend(node.children.values())
+        return tasks
+
+    def apply(self, snapshot: Iterable[PendingTask]) -> QueueDiff:
+        """
+        Bring the index in line with a full queue snapshot.
+
+        Args:
+
+        snapshot: Every pending task, e.g. TaskQueue.results of an unfiltered read.
+
+        Returns:
+            QueueDiff: What changed since the previous snapshot.
+        """
+        latest = {task.id: task for task in snapshot}
+        added, changed = [], []
+
+        for task_id, task in latest.items():
+            known = self._by_id.get(task_id)
+            if known is None:
+                added.append(task)
+                self._add(task)
+            elif known != task:
+                changed.append(task)
+                self._remove(known)
+                self._add(task)
+
+        removed = [task for task_id, task in self._by_id.items() if task_id not in latest]
+        for task in removed:
+            self._remove(task)
+
+        self.refreshes += 1
+        return QueueDiff(added=added, removed=removed, changed=changed)
+
+    async def refresh(self) -> QueueDiff:
+        """
+        Read one queue snapshot and apply it.
+
+        Returns:
+            QueueDiff: What changed since the previous snapshot.
+        """
+        if self._unmanic is None:
+            raise UnmanicError("QueueIndex needs a client to refresh.")
+        queue = await self._unmanic.get_all_pending_tasks(length=self._page_size, order_by="id", order_direction="asc")
+        return self.apply(queue.results)
+
+    def start(self, interval: float) -> None:
+        """
+        Refresh in the background every interval seconds.
+
+        Args:
+
+        interval: Seconds between snapshots.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run(interval))
+
+    async def stop(self) -> None:
+        """Stop background refreshes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except UnmanicError as exception:
+                _LOGGER.warning("Unable to refresh Unmanic queue index: %s", exception)
+            await asyncio.sleep(interval)
+
+    def _add(self, task: PendingTask) -> None:
+        self._by_id[task.id] = task
+        path = task.abspath or ""
+        self._by_path[path] = task
+
+        node = self._root
+        node.count += 1
+        for part in _parts(path):
+            node = node.children.setdefault(part, _Node())
+            node.count += 1
+        node.tasks[task.id] = task
+
+    def _remove(self, task: PendingTask) -> None:
+        del self._by_id[task.id]
+        path = task.abspath or ""
+        if self._by_path.get(path) is task:
+            del self._by_path[path]
+
+        node = self._root
+        node.count -= 1
+        for part in _parts(path):
+            child = node.children[part]
+            child.count -= 1
+            if child.count == 0:
+                del node.children[part]
+                return
+            node = child
+        del node.tasks[task.id]
@@ -0,0 +1,253 @@
+"""Process-wide registry sharing one session per Unmanic installation."""
+import asyncio
+import itertools
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from .capabilities import Capabilities
+from .unmanic import Unmanic
+
+RegistryKey = Tuple[str, str, int, str]
+EntryKey = Tuple[RegistryKey, Any]
+
+
+class SharedUnmanic(Unmanic):
+    """
+    Unmanic handle using a session owned by a ClientRegistry.
+
+    Closing the handle, or leaving its async with block, releases it; the
+    shared session is closed once the last handle for its key is released.
+    """
+
+    def __init__(self, registry: "ClientRegistry", key: EntryKey, generation: int, **kwargs) -> None:
+        """Initialize the handle."""
+        super().__init__(**kwargs)
+        self._registry = registry
+        self._registry_key = key
+        self._generation = generation
+        self._released = False
+
+    async def close_session(self) -> None:
+        """Release this handle's reference to the shared session."""
+        if not self._released:
+            self._released = True
+            await self._registry.release(self._registry_key, self._generation)
+
+
+class _Entry:
+    """A shared session, the detected server capabilities and the number of handles using it."""
+
+    def __init__(self, session: aiohttp.ClientSession, generation: int) -> None:
+        self.session = session
+        self.generation = generation
+        self.capabilities = Capabilities()
+        self.refs = 0
+
+
+class ClientRegistry:
+    """
+    Reference counted sessions keyed by (scheme, host, port, base_path).
+
+    Every component asking for the same installation gets a lightweight
+    SharedUnmanic handle on one aiohttp session and connection pool, so the
+    number of pools and sockets no longer grows with the number of
+    components. Sessions are bound to the event loop they were created on,
+    so each loop gets its own entries, dropped once the loop is closed. Handles with
+    a tracer share a session created with its TraceConfig, one per tracer.
+
+    A session closed from outside is replaced on the next acquire; handles
+    still holding the closed one then release it without touching the
+    replacement's count.
+
+    Usage:
+        async with registry.client('nodeX') as unmanic:
+            await unmanic.get_version()
+
+    Args:
+
+    limit: Total connection limit of each shared pool, 0 for no limit.
+
+    limit_per_host: Per host connection limit of each shared pool, 0 for no limit.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 0) -> None:
+        """Initialize the registry."""
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._entries: "weakref.WeakKeyDictionary[Any, Dict[EntryKey, _Entry]]" = weakref.WeakKeyDictionary()
+        self._generations = itertools.count(1)
+
+    def _prune(self) -> None:
+        # Sessions refer to their loop, so entries of a closed loop would
+        # keep it alive in the weak dictionary; drop them explicitly.
+        for loop in [loop for loop in self._entries if loop.is_closed()]:
+            del self._entries[loop]
+
+    def _loop_entries(self) -> Dict[EntryKey, _Entry]:
+        self._prune()
+        return self._entries.setdefault(asyncio.get_event_loop(), {})
+
+    @staticmethod
+    def key(host: str = 'localhost', port: int = 8888, base_path: str = "/unmanic/api/", tls: bool = False) -> RegistryKey:
+        """
+        Build the registry key of an installation.
+
+        Returns:
+            Tuple: (scheme, host, port, base_path) with base_path ending in '/'.
+        """
+        if base_path[-1] != "/":
+            base_path += "/"
+        return ("https" if tls else "http", host.lower(), port, base_path)
+
+    async def acquire(
+        self,
+        host: str = 'localhost',
+        port: int = 8888,
+        base_path: str = "/unmanic/api/",
+        tls: bool = False,
+        **kwargs,
+    ) -> SharedUnmanic:
+        """
+        Get a handle on the shared session for an installation.
+
+        Args:
+
+        host: The hostname or IP address of the Unmanic server.
+
+        port: The port number of the Unmanic server.
+
+        base_path: The base path of the API on the Unmanic server.
+
+        tls: Whether to use TLS.
+
+        kwargs: Further arguments for Unmanic, except session. Handles with
+            different tracers get separate sessions, each traced.
+
+        Returns:
+            SharedUnmanic: The handle; close it to release the session.
+        """
+        tracer = kwargs.get("tracer")
+        entry_key = (self.key(host, port, base_path, tls), tracer)
+        entries = self._loop_entries()
+
+        entry = entries.get(entry_key)
+        metrics = kwargs.get("metrics")
+        if metrics is not None:
+            metrics.record_cache("shared_session", hit=entry is not None and not entry.session.closed)
+        if entry is None or entry.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            trace_configs = [tracer.trace_config()] if tracer is not None else None
+            session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+            entry = entries[entry_key] = _Entry(session, next(self._generations))
+        entry.refs += 1
+
+        handle = SharedUnmanic(
+            self,
+            entry_key,
+            entry.generation,
+            host=host,
+            port=port,
+            base_path=base_path,
+            tls=tls,
+            session=entry.session,
+            **kwargs,
+        )
+        # The server version is detected once for all handles.
+        handle._capabilities = entry.capabilities
+        return handle
+
+    async def release(self, key: EntryKey, generation: int) -> None:
+        """
+        Drop a reference, closing the session when it was the last one.
+
+        Releases for a session that has since been replaced are ignored.
+
+        Args:
+
+        key: The registry entry key of the handle being released.
+
+        generation: The generation of the entry the handle was acquired from.
+        """
+        entries = self._loop_entries()
+        entry = entries.get(key)
+        if entry is None or entry.generation != generation:
+            return
+
+        entry.refs -= 1
+        if entry.refs <= 0:
+            del entries[key]
+            await entry.session.close()
+
+    def client(self, host: str = 'localhost', port: int = 8888, **kwargs) -> "_ClientContext":
+        """
+        Async context manager acquiring and releasing a handle.
+
+        Args:
+
+        host: The hostname or IP address of the Unmanic server.
+
+        port: The port number of the Unmanic server.
+
+        kwargs: Further arguments for acquire.
+
+        Returns:
+            An async context manager yielding a SharedUnmanic.
+        """
+        return _ClientContext(self, host, port, kwargs)
+
+    def session_count(self) -> int:
+        """Number of open shared sessions."""
+        self._prune()
+        return sum(len(entries) for entries in self._entries.values())
+
+    def references(self, host: str = 'localhost', port: int = 8888, base_path: str = "/unmanic/api/", tls: bool = False) -> int:
+        """Number of handles held for an installation on the current loop, across tracers."""
+        key = self.key(host, port, base_path, tls)
+        return sum(entry.refs for (entry_key, _), entry in self._loop_entries().items() if entry_key == key)
+
+
+class _ClientContext:
+    """Async context manager returned by ClientRegistry.client."""
+
+    def __init__(self, registry: ClientRegistry, host: str, port: int, kwargs: Dict[str, Any]) -> None:
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._kwargs = kwargs
+        self._handle: Optional[SharedUnmanic] = None
+
+    async def __aenter__(self) -> SharedUnmanic:
+        """Async enter."""
+        self._handle = await self._registry.acquire(self._host, self._port, **self._kwargs)
+        return self._handle
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self._handle.close_session()
+
+
+default_registry = ClientRegistry()
+
+
+def shared_client(host: str = 'localhost', port: int = 8888, **kwargs) -> _ClientContext:
+    """
+    Get a handle from the process-wide default registry.
+
+    Usage:
+        async with shared_client('nodeX') as unmanic:
+            await unmanic.get_version()
+
+    Args:
+
+    host: The hostname or IP address of the Unmanic server.
+
+    port: The port number of the Unmanic server.
+
+    kwargs: Further arguments for ClientRegistry.acquire.
+
+    Returns:
+        An async context manager yielding a SharedUnmanic.
+    """
+    return default_registry.client(host, port, **kwargs)
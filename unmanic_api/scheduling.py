@@ -0,0 +1,165 @@
+"""Pending queue ordering, e.g. shortest job first."""
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .models import CompletedTask, PendingTask
+
+Cost = Callable[[PendingTask], float]
+
+
+@dataclass(frozen=True)
+class ReorderPlan:
+    """
+    Object holding the moves that turn the current queue order into the desired one.
+
+    Unmanic moves tasks to the top by raising their priority above every
+    other task, so the order is set by moving one task per request, the
+    last of the desired order first. The tasks at the end of the desired
+    order that are already in place, with strictly decreasing priorities,
+    are left alone.
+
+    Attributes:
+
+    order: The desired order of task ids.
+
+    top: The ids to move to the top of the queue, in desired order.
+
+    batches: The number of reorder requests sent, 0 for a dry run.
+    """
+
+    order: List[int]
+    top: List[int]
+    batches: int = 0
+
+    @property
+    def moved(self) -> int:
+        """The number of tasks that change position."""
+        return len(self.top)
+
+
+def plan_reorder(current: Sequence[int], costs: Sequence[float], priorities: Optional[Sequence[int]] = None) -> ReorderPlan:
+    """
+    Plan the fewest top moves giving the queue in ascending cost.
+
+    Ties keep their current relative order.
+
+    Args:
+
+    current: The task ids in current queue order.
+
+    costs: The cost of each task, aligned with current.
+
+    priorities: The priority of each task, aligned with current; tasks
+        sharing a priority run in no set order, so they are not left in
+        place next to each other. None if all differ.
+
+    Returns:
+        ReorderPlan: The desired order and the moves.
+    """
+    desired = sorted(range(len(current)), key=lambda index: (costs[index], index))
+
+    # The longest tail of the desired order already in increasing queue
+    # position, with strictly decreasing priorities, can stay where it is.
+    start = len(desired)
+    while start > 0 and (
+        start == len(desired)
+        or (desired[start - 1] < desired[start] and (priorities is None or priorities[desired[start - 1]] > priorities[desired[start]]))
+    ):
+        start -= 1
+
+    order = [current[index] for index in desired]
+    return ReorderPlan(order=order, top=order[:start])
+
+
+def file_size_cost(path_map: Optional[Dict[str, str]] = None, missing: float = float("inf")) -> Cost:
+    """
+    Cost function scoring tasks by file size.
+
+    Args:
+
+    path_map: Prefixes of Unmanic paths mapped to where the same files are
+        mounted locally, e.g. {"/library": "/mnt/media"}.
+
+    missing: The cost of files that cannot be read, by default last.
+
+    Returns:
+        Callable: The cost function.
+    """
+    prefixes = sorted((path_map or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def cost(task: PendingTask) -> float:
+        path = task.abspath or ""
+        for prefix, local in prefixes:
+            if path.startswith(prefix):
+                path = local + path[len(prefix):]
+                break
+        try:
+            return float(os.stat(path).st_size)
+        except OSError:
+            return missing
+
+    return cost
+
+
+def extension_cost(costs: Dict[str, float], default: float = 0.0) -> Cost:
+    """
+    Cost function scoring tasks by file extension.
+
+    Args:
+
+    costs: The cost of each extension, e.g. average minutes per file from
+        past runs: {".mkv": 40, ".mp3": 0.5}. Matching ignores case.
+
+    default: The cost of other extensions.
+
+    Returns:
+        Callable: The cost function.
+    """
+    lowered = {extension.lower(): value for extension, value in costs.items()}
+
+    def cost(task: PendingTask) -> float:
+        _, extension = os.path.splitext(task.abspath or "")
+        return lowered.get(extension.lower(), default)
+
+    return cost
+
+
+def history_extension_costs(history: Iterable[CompletedTask], workers: int = 1, max_gap: Optional[float] = 3600.0) -> Dict[str, float]:
+    """
+    Estimate the average seconds per file of each extension from the history.
+
+    Unmanic history records only when each task finished, so a task's run
+    time is estimated as the time since the previous task finished, times
+    the number of workers sharing the load. Gaps longer than max_gap are
+    taken as idle time and skipped. The estimates are rough per task but
+    average out over many tasks, which is enough to rank extensions.
+
+    Args:
+
+    history: Completed tasks, in any order.
+
+    workers: The number of workers that processed them.
+
+    max_gap: The longest gap in seconds counted as processing, None for no limit.
+
+    Returns:
+        Dict: Seconds per file by lower case extension, for extension_cost.
+    """
+    tasks = sorted(history, key=lambda task: task.finish_time)
+    totals: Dict[str, List[float]] = {}
+    for previous, task in zip(tasks, tasks[1:]):
+        gap = (task.finish_time - previous.finish_time).total_seconds()
+        if max_gap is not None and gap > max_gap:
+            continue
+        _, extension = os.path.splitext(task.task_label or "")
+        if extension:
+            total = totals.setdefault(extension.lower(), [0.0, 0])
+            total[0] += gap * workers
+            total[1] += 1
+    return {extension: seconds / count for extension, (seconds, count) in totals.items()}
+
+
+def chunks(items: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into lists of up to size items."""
+    return [items[offset:offset + size] for offset in range(0, len(items), size)]
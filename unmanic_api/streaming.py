@@ -0,0 +1,343 @@
+"""Incremental parsing of large list responses from Unmanic."""
+import asyncio
+import codecs
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+import async_timeout
+
+from .exceptions import UnmanicConnectionError, UnmanicError
+from .tracing import RequestStats
+
+_WHITESPACE = " \t\n\r"
+
+
+class ResultsStreamParser:
+    """
+    Incremental parser for Unmanic list responses.
+
+    Unmanic list endpoints answer with a single JSON object such as
+    {"recordsTotal": 654, "recordsFiltered": 650, "results": [...]}. Bytes are
+    fed in as they arrive from the network; every entry of the results array
+    is returned as soon as it is complete, and every other top-level key is
+    collected in fields. Only the unparsed tail of the body is buffered, so
+    memory does not grow with the number of results.
+
+    Attributes:
+
+    fields: The top-level keys seen so far, other than results.
+    """
+
+    def __init__(self, results_key: str = "results") -> None:
+        """Initialize the parser."""
+        self.fields: Dict[str, Any] = {}
+        self._results_key = results_key
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        """
+        Feed the next chunk of the body.
+
+        Args:
+
+        chunk: The next bytes of the body.
+
+        final: Whether this is the last chunk.
+
+        Returns:
+            List: The results entries completed by this chunk.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk, final)
+        self._pos = 0
+
+        items: List[Any] = []
+        while self._step(items, final):
+            pass
+
+        if final and self._state != "done":
+            raise UnmanicError("Unable to parse streamed results, response ended early.")
+
+        return items
+
+    def _skip_whitespace(self) -> bool:
+        """Skip whitespace, returning whether any input is left."""
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _value(self, final: bool) -> tuple:
+        """Decode the next complete JSON value, or return (False, None) if more input is needed."""
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise UnmanicError("Unable to parse streamed results, invalid JSON.")
+            return False, None
+
+        # A value ending exactly at the end of the buffer may be a number
+        # that the next chunk continues, e.g. "12" followed by "34".
+        if end == len(self._buffer) and not final:
+            return False, None
+
+        self._pos = end
+        return True, value
+
+    def _step(self, items: List[Any], final: bool) -> bool:
+        """Advance the state machine by one token, returning whether progress was made."""
+        if not self._skip_whitespace():
+            return False
+
+        char = self._buffer[self._pos]
+
+        if self._state == "start":
+            if char != "{":
+                raise UnmanicError("Unable to parse streamed results, expected an object.")
+            self._pos += 1
+            self._state = "key"
+            return True
+
+        if self._state == "key":
+            if char == "}":
+                self._pos += 1
+                self._state = "done"
+                return True
+            if char == ",":
+                self._pos += 1
+                return True
+            if char != '"':
+                raise UnmanicError("Unable to parse streamed results, expected a key.")
+            complete, key = self._value(final)
+            if not complete:
+                return False
+            self._key = key
+            self._state = "colon"
+            return True
+
+        if self._state == "colon":
+            if char != ":":
+                raise UnmanicError("Unable to parse streamed results, expected ':'.")
+            self._pos += 1
+            self._state = "value"
+            return True
+
+        if self._state == "value":
+            if self._key == self._results_key and char == "[":
+                self._pos += 1
+                self._state = "item"
+                return True
+            complete, value = self._value(final)
+            if not complete:
+                return False
+            self.fields[self._key] = value
+            self._state = "key"
+            return True
+
+        if self._state == "item":
+            if char == "]":
+                self._pos += 1
+                self._state = "key"
+                return True
+            if char == ",":
+                self._pos += 1
+                return True
+            complete, value = self._value(final)
+            if not complete:
+                return False
+            items.append(value)
+            return True
+
+        raise UnmanicError("Unable to parse streamed results, trailing data.")
+
+
+class TaskStream:
+    """
+    Async iterator over the tasks of a list response, parsed as it streams in.
+
+    Use as an async context manager and iterate it; each task is built with
+    the model's from_dict as soon as its JSON is complete. recordsTotal and
+    recordsFiltered are filled in as soon as they are seen in the body, which
+    for Unmanic is before the first task.
+
+    Attributes:
+
+    recordsTotal: The total number of records, None until seen.
+
+    recordsFiltered: The number of records after filtering, None until seen.
+    """
+
+    def __init__(
+        self,
+        client,
+        uri: str,
+        data: Optional[Any],
+        from_dict: Callable[[dict], Any],
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """Initialize the stream."""
+        self._client = client
+        self._uri = uri
+        self._data = data
+        self._from_dict = from_dict
+        self._chunk_size = chunk_size
+        self._parser = ResultsStreamParser()
+        self._response = None
+        self._stats: Optional[RequestStats] = None
+        self._deadline: Optional[float] = None
+        self._finished = False
+
+    @property
+    def recordsTotal(self) -> Optional[int]:
+        return self._parser.fields.get("recordsTotal")
+
+    @property
+    def recordsFiltered(self) -> Optional[int]:
+        return self._parser.fields.get("recordsFiltered")
+
+    async def __aenter__(self) -> "TaskStream":
+        """Async enter."""
+        client = self._client
+        if client._tracer is not None or client._metrics is not None:
+            self._stats = RequestStats(method='POST', endpoint=self._uri)
+
+        # The timeout covers the whole exchange, as for other calls.
+        loop = asyncio.get_event_loop()
+        if client.request_timeout is not None:
+            self._deadline = loop.time() + client.request_timeout
+
+        try:
+            self._response = await client._send(self._uri, method='POST', data=self._data, stats=self._stats)
+            content_type = self._response.headers.get("Content-Type", "")
+            if "application/json" not in content_type:
+                self._response.release()
+                self._response = None
+                raise UnmanicError(f"Unable to stream results, unexpected content type {content_type!r}")
+        except Exception as exception:
+            self._finish(exception)
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        if self._response is not None:
+            self._response.release()
+        self._finish(exc_info[1])
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        if self._response is None:
+            raise UnmanicError("TaskStream must be entered with 'async with' before iterating.")
+        return self._iterate()
+
+    def _finish(self, exception: Optional[BaseException] = None) -> None:
+        """Publish the stats of the call, once."""
+        if self._stats is None or self._finished:
+            return
+        self._finished = True
+        if exception is not None:
+            self._stats.error = type(exception).__name__
+        self._client._observe(self._stats)
+
+    async def _read(self) -> bytes:
+        """Read the next chunk of the body, within the call's deadline."""
+        started = time.perf_counter()
+        try:
+            async with async_timeout.timeout_at(self._deadline):
+                chunk = await self._response.content.read(self._chunk_size)
+        except asyncio.TimeoutError as exception:
+            raise UnmanicConnectionError(
+                "Timeout occurred while reading response from API"
+            ) from exception
+        except aiohttp.ClientError as exception:
+            raise UnmanicConnectionError(
+                "Error occurred while reading response from API"
+            ) from exception
+
+        if self._stats is not None:
+            self._stats.body_read = (self._stats.body_read or 0.0) + time.perf_counter() - started
+            self._stats.bytes_in += len(chunk)
+        return chunk
+
+    def _feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        try:
+            return self._parser.feed(chunk, final)
+        except ValueError as exception:
+            raise UnmanicError("Unable to decode response from API") from exception
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        # Reads are timed one chunk at a time: a timeout around the whole
+        # loop would also cancel the caller's work between items.
+        from_dict = self._from_dict
+        try:
+            while True:
+                chunk = await self._read()
+                if not chunk:
+                    break
+                for item in self._feed(chunk):
+                    yield from_dict(item)
+            for item in self._feed(b"", final=True):
+                yield from_dict(item)
+        except Exception as exception:
+            self._finish(exception)
+            raise
+        self._finish()
+
+
+class PagedTasks:
+    """
+    Async iterator over every task of a list endpoint, one page at a time.
+
+    Pages are requested as iteration reaches them, so only one page of
+    models is held at a time. recordsTotal and recordsFiltered are updated
+    from each page. The listing is not a snapshot: tasks added or removed
+    while iterating can shift later pages.
+
+    Attributes:
+
+    recordsTotal: The total number of records, None until the first page.
+
+    recordsFiltered: The number of records after filtering, None until the first page.
+
+    pages: The number of pages fetched.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[Any]],
+        page_size: int = 500,
+        start: int = 0,
+    ) -> None:
+        """Initialize the iterator."""
+        if page_size < 1:
+            raise UnmanicError("page_size must be at least 1.")
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._start = start
+        self.recordsTotal: Optional[int] = None
+        self.recordsFiltered: Optional[int] = None
+        self.pages = 0
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        start = self._start
+        while True:
+            page = await self._fetch_page(start, self._page_size)
+            self.pages += 1
+            self.recordsTotal = page.recordsTotal
+            self.recordsFiltered = page.recordsFiltered
+
+            for task in page.results:
+                yield task
+
+            start += len(page.results)
+            if len(page.results) < self._page_size:
+                break
+            if self.recordsFiltered is not None and start >= self.recordsFiltered:
+                break
@@ -0,0 +1,102 @@
+"""Synchronous facade for Unmanic."""
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Coroutine, Optional
+
+from .unmanic import Unmanic
+
+
+class SyncUnmanic:
+    """
+    Blocking interface to Unmanic for synchronous code.
+
+    One background thread runs an event loop holding a single Unmanic and
+    its pooled session, and every coroutine method of Unmanic is exposed
+    here as a blocking call, e.g. SyncUnmanic().get_version(). Calls may be
+    made from any number of threads at once; they share the connection pool
+    instead of each paying for a new loop, session and connection.
+
+    Usage:
+        with SyncUnmanic('localhost') as unmanic:
+            print(unmanic.get_version())
+
+    Args:
+
+    host: The hostname or IP address of the Unmanic server.
+
+    port: The port number of the Unmanic server.
+
+    timeout: Seconds a blocking call waits for its result, None for no limit.
+        The request_timeout of each API call still applies.
+
+    kwargs: Further arguments for Unmanic, e.g. tls or tracer.
+    """
+
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 8888,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> None:
+        """Start the event loop thread."""
+        self.timeout = timeout
+        self._closed = False
+        self._unmanic = Unmanic(host, port, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name=f"unmanic-api-{host}:{port}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _call(self, coroutine: Coroutine) -> Any:
+        """Run a coroutine on the loop thread and wait for its result."""
+        if self._closed:
+            coroutine.close()
+            raise RuntimeError("SyncUnmanic is closed")
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(self.timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = None if name.startswith("_") else getattr(self._unmanic, name, None)
+        if not inspect.iscoroutinefunction(attribute):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        @functools.wraps(attribute)
+        def blocking(*args, **kwargs):
+            return self._call(attribute(*args, **kwargs))
+
+        # Cache the wrapper so later lookups skip __getattr__.
+        setattr(self, name, blocking)
+        return blocking
+
+    def close(self) -> None:
+        """Close the session and stop the loop thread."""
+        if self._closed:
+            return
+        try:
+            self._call(self._unmanic.close_session())
+        finally:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self) -> "SyncUnmanic":
+        """Enter."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Exit."""
+        self.close()
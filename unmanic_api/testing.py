@@ -0,0 +1,566 @@
+"""Local stand-in for an Unmanic installation, for tests and benchmarks."""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from aiohttp import web
+
+Latency = Union[float, Callable[[], float]]
+
+FAULTS = (
+    "slow_first_byte",
+    "trickle",
+    "reset",
+    "status",
+    "truncate",
+    "invalid_json",
+    "content_type",
+)
+
+
+@dataclass
+class Fault:
+    """
+    A misbehaviour injected by StandInServer.
+
+    Attributes:
+
+    kind: One of FAULTS:
+        slow_first_byte waits delay seconds before answering;
+        trickle sends the body chunk_size bytes at a time, delay seconds apart;
+        reset closes the connection without answering;
+        status answers with status, e.g. a burst of 500 or 405;
+        truncate announces the full Content-Length but sends half the body;
+        invalid_json sends a complete response whose JSON is cut short;
+        content_type sends the body labelled as content_type.
+
+    route: The route to affect, e.g. "v2/version/read", None for every route.
+
+    count: The number of requests to affect, None for every request.
+
+    delay: Seconds for slow_first_byte and trickle.
+
+    status: The HTTP status for status faults.
+
+    chunk_size: Bytes per write for trickle.
+
+    content_type: The Content-Type for content_type faults.
+
+    applied: The number of requests affected so far.
+    """
+
+    kind: str
+    route: Optional[str] = None
+    count: Optional[int] = 1
+    delay: float = 0.0
+    status: int = 500
+    chunk_size: int = 16
+    content_type: str = "text/html"
+    applied: int = 0
+
+    @property
+    def active(self) -> bool:
+        return self.count is None or self.applied < self.count
+
+
+def make_pending_tasks(count: int, start_id: int = 1) -> List[dict]:
+    """
+    Generate synthetic pending task payloads.
+
+    Args:
+
+    count: The number of tasks.
+
+    start_id: The id of the first task.
+
+    Returns:
+        List: Pending task dicts as returned by v2/pending/tasks.
+    """
+    return [
+        {
+            "id": task_id,
+            "abspath": f"/library/Show {task_id % 97}/Episode_{task_id}.mkv",
+            "priority": task_id,
+            "type": "local",
+            "status": "pending",
+        }
+        for task_id in range(start_id, start_id + count)
+    ]
+
+
+def make_completed_tasks(count: int, start_id: int = 1, failure_every: int = 0, now: Optional[float] = None) -> List[dict]:
+    """
+    Generate synthetic completed task payloads, newest first.
+
+    Args:
+
+    count: The number of tasks.
+
+    start_id: The id of the oldest task.
+
+    failure_every: Mark every nth task as failed, 0 for none.
+
+    now: The finish time of the newest task, defaults to the current time.
+
+    Returns:
+        List: Completed task dicts as returned by v2/history/tasks.
+    """
+    now = time.time() if now is None else now
+    tasks = []
+    for offset in range(count):
+        task_id = start_id + count - 1 - offset
+        tasks.append({
+            "id": task_id,
+            "task_label": f"Episode_{task_id}.mkv",
+            "task_success": not (failure_every and task_id % failure_every == 0),
+            "finish_time": int(now) - offset * 60,
+        })
+    return tasks
+
+
+def make_workers(count: int) -> List[dict]:
+    """
+    Generate synthetic worker status payloads.
+
+    Args:
+
+    count: The number of workers.
+
+    Returns:
+        List: Worker dicts as returned by v2/workers/status.
+    """
+    now = time.time()
+    return [
+        {
+            "id": f"W{index}",
+            "name": f"Worker-W{index}",
+            "idle": index % 2 == 1,
+            "paused": False,
+            "start_time": str(now - index * 30),
+            "current_file": "" if index % 2 else f"Episode_{index}.mkv",
+            "current_task": None if index % 2 else index,
+        }
+        for index in range(count)
+    ]
+
+
+def make_settings(**overrides) -> dict:
+    """
+    Generate a settings payload.
+
+    Args:
+
+    overrides: Settings to override.
+
+    Returns:
+        Dict: Settings as returned under "settings" by v2/settings/read.
+    """
+    settings = {
+        "ui_port": 8888,
+        "config_path": "/config/.unmanic/config",
+        "log_path": "/config/.unmanic/logs",
+        "plugins_path": "/config/.unmanic/plugins",
+        "userdata_path": "/config/.unmanic/userdata",
+        "debugging": False,
+        "library_path": "/library",
+        "enable_library_scanner": False,
+        "schedule_full_scan_minutes": 1440,
+        "follow_symlinks": True,
+        "concurrent_file_testers": 2,
+        "run_full_scan_on_start": False,
+        "enable_inotify": False,
+        "clear_pending_tasks_on_restart": False,
+        "number_of_workers": 4,
+        "cache_path": "/tmp/unmanic",
+        "installation_name": "Unmanic",
+        "distributed_worker_count_target": 0,
+    }
+    settings.update(overrides)
+    return settings
+
+
+class StandInServer:
+    """
+    Local aiohttp server emulating the Unmanic API routes used by Unmanic.
+
+    State (pending queue, history, workers, settings) is held in memory, so
+    mutations such as pausing a worker are visible to later reads. The
+    queue is served by priority, which reorders change as Unmanic does. A rescan
+    adds scan_files pending tasks, one every scan_interval seconds.
+
+    Args:
+
+    pending_tasks: The number of synthetic pending tasks.
+
+    completed_tasks: The number of synthetic completed tasks.
+
+    workers: The number of synthetic workers.
+
+    latency: Seconds to delay each response, or a callable returning them.
+
+    error_rate: Fraction of requests answered with HTTP 500.
+
+    version: The version reported by v2/version/read.
+
+    seed: Seed for the error injection random generator.
+
+    host: The interface to listen on.
+
+    port: The port to listen on, 0 picks a free port.
+
+    base_path: The base path of the API.
+    """
+
+    def __init__(
+        self,
+        pending_tasks: int = 10,
+        completed_tasks: int = 10,
+        workers: int = 4,
+        latency: Latency = 0.0,
+        error_rate: float = 0.0,
+        version: str = "0.2.0~standin",
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        base_path: str = "/unmanic/api/",
+    ) -> None:
+        """Initialize the server state."""
+        self.pending = make_pending_tasks(pending_tasks)
+        self.history = make_completed_tasks(completed_tasks)
+        self.workers = make_workers(workers)
+        self.settings = make_settings(number_of_workers=workers)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.version = version
+        self.host = host
+        self.port = port
+        self.base_path = base_path if base_path.endswith("/") else base_path + "/"
+        self.requests: Dict[str, int] = {}
+
+        self.faults: List[Fault] = []
+        self.scans = 0
+        self.scan_files = 0
+        self.scan_interval = 0.01
+        self._scanning: Optional[asyncio.Task] = None
+
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_fault(self, kind: str, route: Optional[str] = None, count: Optional[int] = 1, **options) -> Fault:
+        """
+        Inject a fault into upcoming requests.
+
+        Faults apply in the order they were added; a request gets the first
+        active fault matching its route.
+
+        Args:
+
+        kind: One of FAULTS.
+
+        route: The route to affect, None for every route.
+
+        count: The number of requests to affect, None for every request.
+
+        options: delay, status, chunk_size or content_type, see Fault.
+
+        Returns:
+            Fault: The fault, whose applied count can be checked later.
+        """
+        if kind not in FAULTS:
+            raise ValueError(f"Unknown fault {kind}, expected one of {', '.join(FAULTS)}")
+        fault = Fault(kind, route, count, **options)
+        self.faults.append(fault)
+        return fault
+
+    def clear_faults(self) -> None:
+        """Remove every injected fault."""
+        self.faults = []
+
+    def queue_order(self) -> List[int]:
+        """The pending task ids in the order the queue is served."""
+        return [task["id"] for task in sorted(self.pending, key=lambda task: task["priority"], reverse=True)]
+
+    def complete_task(self, abspath: str, success: bool = True) -> dict:
+        """
+        Move a pending task to the history, as if a worker had processed it.
+
+        Args:
+
+        abspath: The path of the pending task.
+
+        success: Whether processing succeeded.
+
+        Returns:
+            Dict: The new history entry.
+        """
+        self.pending = [task for task in self.pending if task["abspath"] != abspath]
+        task = {
+            "id": max((task["id"] for task in self.history), default=0) + 1,
+            "task_label": abspath.rsplit("/", 1)[-1],
+            "task_success": success,
+            "finish_time": int(time.time()),
+        }
+        self.history.insert(0, task)
+        return task
+
+    def make_app(self) -> web.Application:
+        """
+        Build the aiohttp application.
+
+        Returns:
+            web.Application: The application serving the stand-in routes.
+        """
+        app = web.Application(middlewares=[self._middleware])
+        base = self.base_path
+        app.router.add_get(base + "v2/version/read", self._version)
+        app.router.add_get(base + "v2/settings/read", self._settings_read)
+        app.router.add_post(base + "v2/settings/write", self._settings_write)
+        app.router.add_get(base + "v2/workers/status", self._workers_status)
+        app.router.add_post(base + "v2/workers/worker/pause", self._worker_pause)
+        app.router.add_post(base + "v2/workers/worker/pause/all", self._worker_pause_all)
+        app.router.add_post(base + "v2/workers/worker/resume", self._worker_resume)
+        app.router.add_post(base + "v2/workers/worker/resume/all", self._worker_resume_all)
+        app.router.add_post(base + "v2/workers/worker/terminate", self._worker_terminate)
+        app.router.add_post(base + "v2/pending/tasks", self._pending_tasks)
+        app.router.add_delete(base + "v2/pending/tasks", self._pending_delete)
+        app.router.add_post(base + "v2/pending/reorder", self._pending_reorder)
+        app.router.add_post(base + "v2/pending/create", self._pending_create)
+        app.router.add_post(base + "v2/history/tasks", self._history_tasks)
+        app.router.add_delete(base + "v2/history/tasks", self._history_delete)
+        app.router.add_post(base + "v2/history/reprocess", self._history_reprocess)
+        app.router.add_get(base + "v1/pending/rescan", self._rescan)
+        return app
+
+    async def start(self) -> "StandInServer":
+        """Start listening; port is updated with the bound port."""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._scanning is not None:
+            self._scanning.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StandInServer":
+        """Async enter."""
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self.close()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        route = request.path[len(self.base_path):]
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=500, text="Injected error")
+
+        for fault in self.faults:
+            if fault.active and fault.route in (None, route):
+                fault.applied += 1
+                return await self._apply_fault(fault, request, handler)
+
+        return await handler(request)
+
+    async def _apply_fault(self, fault: Fault, request: web.Request, handler) -> web.StreamResponse:
+        if fault.kind == "slow_first_byte":
+            # Read the request first, as the client may hang up while we wait.
+            await request.read()
+            await asyncio.sleep(fault.delay)
+            return await handler(request)
+
+        if fault.kind == "status":
+            return web.Response(status=fault.status, text="Injected fault")
+
+        if fault.kind == "reset":
+            request.transport.abort()
+            return web.Response(status=500, text="Injected fault")
+
+        response = await handler(request)
+        body = response.body
+
+        if fault.kind == "invalid_json":
+            return web.Response(body=body[:len(body) // 2], content_type="application/json")
+
+        if fault.kind == "content_type":
+            return web.Response(body=body, content_type=fault.content_type)
+
+        stream = web.StreamResponse(headers={"Content-Type": "application/json"})
+        if fault.kind == "truncate":
+            stream.content_length = len(body)
+            await stream.prepare(request)
+            await stream.write(body[:len(body) // 2])
+            request.transport.abort()
+            return stream
+
+        await stream.prepare(request)
+        for offset in range(0, len(body), fault.chunk_size):
+            await stream.write(body[offset:offset + fault.chunk_size])
+            await asyncio.sleep(fault.delay)
+        await stream.write_eof()
+        return stream
+
+    @staticmethod
+    def _json(data: Any) -> web.Response:
+        return web.Response(text=json.dumps(data), content_type="application/json")
+
+    @staticmethod
+    async def _body(request: web.Request) -> dict:
+        text = await request.text()
+        return json.loads(text) if text else {}
+
+    def _set_paused(self, paused: bool, worker_id: Optional[str] = None) -> bool:
+        found = False
+        for worker in self.workers:
+            if worker_id is None or worker["id"] == worker_id:
+                worker["paused"] = paused
+                found = True
+        return found
+
+    @staticmethod
+    def _page(tasks: List[dict], body: dict, search_field: str) -> dict:
+        search_value = body.get("search_value") or ""
+        filtered = tasks
+        if search_value:
+            filtered = [task for task in tasks if search_value in task[search_field]]
+        # Lists are served in their default order, newest history first and
+        # the queue by priority, ties in list order; ordering by id or
+        # priority is honoured as well.
+        if body.get("order_by") in ("id", "priority"):
+            field = body["order_by"]
+            filtered = sorted(filtered, key=lambda task: task[field], reverse=body.get("order_direction") == "desc")
+        start = int(body.get("start", 0))
+        length = int(body.get("length", 10))
+        return {
+            "recordsTotal": len(tasks),
+            "recordsFiltered": len(filtered),
+            "results": filtered[start:start + length],
+        }
+
+    async def _version(self, request: web.Request) -> web.Response:
+        return self._json({"version": self.version})
+
+    async def _settings_read(self, request: web.Request) -> web.Response:
+        return self._json({"settings": self.settings})
+
+    async def _settings_write(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        self.settings.update(body.get("settings", {}))
+        return self._json({"success": True})
+
+    async def _workers_status(self, request: web.Request) -> web.Response:
+        return self._json({"workers_status": self.workers})
+
+    async def _worker_pause(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        return self._json({"success": self._set_paused(True, body.get("worker_id"))})
+
+    async def _worker_pause_all(self, request: web.Request) -> web.Response:
+        return self._json({"success": self._set_paused(True)})
+
+    async def _worker_resume(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        return self._json({"success": self._set_paused(False, body.get("worker_id"))})
+
+    async def _worker_resume_all(self, request: web.Request) -> web.Response:
+        return self._json({"success": self._set_paused(False)})
+
+    async def _worker_terminate(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        before = len(self.workers)
+        self.workers = [worker for worker in self.workers if worker["id"] != body.get("worker_id")]
+        return self._json({"success": len(self.workers) != before})
+
+    async def _pending_tasks(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        return self._json(self._page(self.pending, body, "abspath"))
+
+    async def _pending_delete(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        id_list = set(body.get("id_list") or [])
+        self.pending = [task for task in self.pending if task["id"] not in id_list]
+        return self._json({"success": True})
+
+    async def _pending_create(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        path = body.get("path")
+        if not path or any(task["abspath"] == path for task in self.pending):
+            return self._json({"success": False})
+        self._add_pending(path)
+        return self._json({"success": True})
+
+    async def _pending_reorder(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        id_list = body.get("id_list") or []
+        by_id = {task["id"]: task for task in self.pending}
+        if body.get("position") not in ("top", "bottom") or not all(task_id in by_id for task_id in id_list):
+            return self._json({"success": False})
+        # As Unmanic does: top adds the same offset, the highest priority
+        # plus 500, to each task's own priority, and bottom sets it to 0; the
+        # order of id_list plays no part.
+        offset = max((task["priority"] for task in self.pending), default=1) + 500
+        for task_id in id_list:
+            task = by_id[task_id]
+            task["priority"] = task["priority"] + offset if body["position"] == "top" else 0
+        return self._json({"success": True})
+
+    async def _history_tasks(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        return self._json(self._page(self.history, body, "task_label"))
+
+    async def _history_delete(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        id_list = set(body.get("id_list") or [])
+        self.history = [task for task in self.history if task["id"] not in id_list]
+        return self._json({"success": True})
+
+    def _add_pending(self, abspath: str) -> dict:
+        task_id = max((task["id"] for task in self.pending), default=0) + 1
+        task = {
+            "id": task_id,
+            "abspath": abspath,
+            # Unmanic defaults a new task's priority to its id.
+            "priority": task_id,
+            "type": "local",
+            "status": "pending",
+        }
+        self.pending.append(task)
+        return task
+
+    async def _history_reprocess(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        by_id = {task["id"]: task for task in self.history}
+        id_list = body.get("id_list") or []
+        if not all(task_id in by_id for task_id in id_list):
+            return self._json({"success": False})
+        for task_id in id_list:
+            self._add_pending(f"/library/{by_id[task_id]['task_label']}")
+        return self._json({"success": True})
+
+    async def _scan(self) -> None:
+        # Adds scan_files tasks, one every scan_interval seconds, like a library scan finding files.
+        for index in range(self.scan_files):
+            await asyncio.sleep(self.scan_interval)
+            self._add_pending(f"/library/Scanned/{self.scans}_{index}.mkv")
+
+    async def _rescan(self, request: web.Request) -> web.Response:
+        self.scans += 1
+        if self._scanning is None or self._scanning.done():
+            self._scanning = asyncio.ensure_future(self._scan())
+        return self._json({"success": True})
@@ -0,0 +1,213 @@
+"""Request lifecycle tracing for Unmanic."""
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+_last_stats: contextvars.ContextVar = contextvars.ContextVar("unmanic_api_last_stats", default=None)
+
+
+@dataclass
+class RequestStats:
+    """
+    Object holding the timings of a single API call.
+
+    All durations are in seconds and are None when the phase did not happen,
+    e.g. dns and connect on a reused connection, or when the session was not
+    created with the tracer's TraceConfig. aiohttp does not report the TLS
+    handshake separately, so for TLS connections connect includes it.
+
+    Attributes:
+
+    method: The HTTP method.
+
+    endpoint: The API endpoint, e.g. v2/history/tasks.
+
+    status: The HTTP status code, None if no response was received.
+
+    error: The name of the exception raised by the call, if any.
+
+    bytes_out: The size of the request body.
+
+    bytes_in: The size of the response body.
+
+    connection_reused: Whether a pooled connection was reused.
+
+    dns: Time spent resolving the host.
+
+    connect: Time spent opening the connection, including TLS.
+
+    ttfb: Time from the start of the call until the response headers arrived.
+
+    body_read: Time spent reading the response body.
+
+    decode: Time spent decoding the JSON body.
+
+    parse: Time spent building models from the decoded JSON.
+
+    total: Time for the whole call.
+    """
+
+    method: str
+    endpoint: str
+    status: Optional[int] = None
+    error: Optional[str] = None
+    bytes_out: int = 0
+    bytes_in: int = 0
+    connection_reused: bool = False
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    body_read: Optional[float] = None
+    decode: Optional[float] = None
+    parse: Optional[float] = None
+    total: Optional[float] = None
+    started: float = field(default_factory=time.perf_counter, repr=False, compare=False)
+
+
+def last_request_stats() -> Optional[RequestStats]:
+    """
+    Get the stats of the last traced call made by the current task.
+
+    Returns:
+        RequestStats: The stats, None if no traced call was made.
+    """
+    return _last_stats.get()
+
+
+class Tracer:
+    """
+    Collects per-call timings for a Client.
+
+    Pass an instance to Unmanic(tracer=...). Each completed call produces a
+    RequestStats which is handed to every callback, logged when slower than
+    slow_threshold, and available through last_request_stats(). When
+    attach_stats is set, TaskQueue and TaskHistory results carry it in their
+    stats attribute.
+
+    DNS and connect timings come from an aiohttp TraceConfig. Sessions created
+    by the client get it automatically; for a session passed in, add it with
+    aiohttp.ClientSession(trace_configs=[tracer.trace_config()]).
+
+    Args:
+
+    callbacks: Callables receiving each RequestStats.
+
+    slow_threshold: Calls taking longer than this many seconds are logged.
+
+    logger: The logger for slow calls.
+
+    attach_stats: Attach stats to TaskQueue and TaskHistory results.
+    """
+
+    def __init__(
+        self,
+        callbacks: Optional[List[Callable[[RequestStats], None]]] = None,
+        slow_threshold: Optional[float] = None,
+        logger: logging.Logger = _LOGGER,
+        attach_stats: bool = False,
+    ) -> None:
+        """Initialize the tracer."""
+        self.callbacks = list(callbacks or [])
+        self.slow_threshold = slow_threshold
+        self.logger = logger
+        self.attach_stats = attach_stats
+        self._trace_config = None
+
+    def add_callback(self, callback: Callable[[RequestStats], None]) -> None:
+        """
+        Register a callable receiving each RequestStats.
+
+        Args:
+
+        callback: The callable.
+        """
+        self.callbacks.append(callback)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Get the aiohttp TraceConfig feeding DNS and connection timings.
+
+        Returns:
+            aiohttp.TraceConfig: The trace config, shared by all sessions.
+        """
+        if self._trace_config is None:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+            trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+            trace_config.on_connection_create_start.append(_on_connect_start)
+            trace_config.on_connection_create_end.append(_on_connect_end)
+            trace_config.on_connection_reuseconn.append(_on_connection_reused)
+            self._trace_config = trace_config
+        return self._trace_config
+
+    def finish(self, stats: RequestStats) -> None:
+        """
+        Complete a call's stats and publish them.
+
+        Args:
+
+        stats: The stats of the finished call.
+        """
+        stats.total = time.perf_counter() - stats.started
+        _last_stats.set(stats)
+
+        for callback in self.callbacks:
+            callback(stats)
+
+        if self.slow_threshold is not None and stats.total >= self.slow_threshold:
+            self.logger.warning(
+                "Slow Unmanic call %s %s: %.3fs (status=%s, ttfb=%s, body_read=%s, "
+                "decode=%s, parse=%s, bytes_in=%d, bytes_out=%d)",
+                stats.method,
+                stats.endpoint,
+                stats.total,
+                stats.status,
+                _format(stats.ttfb),
+                _format(stats.body_read),
+                _format(stats.decode),
+                _format(stats.parse),
+                stats.bytes_in,
+                stats.bytes_out,
+            )
+
+
+def _format(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}s"
+
+
+def _stats(trace_config_ctx) -> Optional[RequestStats]:
+    stats = trace_config_ctx.trace_request_ctx
+    return stats if isinstance(stats, RequestStats) else None
+
+
+async def _on_dns_start(session, trace_config_ctx, params) -> None:
+    trace_config_ctx.dns_started = time.perf_counter()
+
+
+async def _on_dns_end(session, trace_config_ctx, params) -> None:
+    stats = _stats(trace_config_ctx)
+    if stats is not None:
+        stats.dns = time.perf_counter() - trace_config_ctx.dns_started
+
+
+async def _on_connect_start(session, trace_config_ctx, params) -> None:
+    trace_config_ctx.connect_started = time.perf_counter()
+
+
+async def _on_connect_end(session, trace_config_ctx, params) -> None:
+    stats = _stats(trace_config_ctx)
+    if stats is not None:
+        # Host resolution happens inside connection creation.
+        stats.connect = time.perf_counter() - trace_config_ctx.connect_started - (stats.dns or 0.0)
+
+
+async def _on_connection_reused(session, trace_config_ctx, params) -> None:
+    stats = _stats(trace_config_ctx)
+    if stats is not None:
+        stats.connection_reused = True
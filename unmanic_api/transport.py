@@ -0,0 +1,280 @@
+"""Pluggable transports, including recording and replaying Unmanic traffic."""
+import abc
+import asyncio
+import gzip
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, IO, List, Optional, Tuple
+
+from .exceptions import UnmanicError
+
+RecordKey = Tuple[str, str, str]
+
+
+def _body(data: Optional[Any]) -> str:
+    if data is None:
+        return ""
+    if isinstance(data, bytes):
+        return data.decode("utf8")
+    return str(data)
+
+
+def _open(path: str, mode: str) -> IO:
+    """Open a recording, gzip compressed when the name ends in .gz."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class _ReplayContent:
+    """The body stream of a ReplayResponse."""
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+        self._pos = 0
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for offset in range(0, len(self._body), size):
+            yield self._body[offset:offset + size]
+
+    async def read(self, size: int = -1) -> bytes:
+        end = len(self._body) if size < 0 else self._pos + size
+        chunk = self._body[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+
+class ReplayResponse:
+    """
+    In-memory response with the parts of aiohttp.ClientResponse used by the client.
+
+    Attributes:
+
+    status: The HTTP status.
+
+    headers: The response headers.
+
+    content: The body stream, supporting read and iter_chunked.
+    """
+
+    def __init__(self, status: int, content_type: str, body: bytes) -> None:
+        """Initialize the response."""
+        self.status = status
+        self.headers: Dict[str, str] = {"Content-Type": content_type} if content_type else {}
+        self.content = _ReplayContent(body)
+        self._body = body
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+    async def text(self) -> str:
+        """Return the body as text."""
+        return self._body.decode("utf8")
+
+    def release(self) -> None:
+        """Release the response; nothing to do in memory."""
+
+    def close(self) -> None:
+        """Close the response; nothing to do in memory."""
+
+
+class Transport(abc.ABC):
+    """
+    Base class for the transport sending a client's requests.
+
+    A transport is passed to Client or Unmanic as transport; the client
+    then sends every request through it instead of its aiohttp session.
+    Responses must provide status, headers, read(), text(), content and
+    release(), like aiohttp.ClientResponse. The client does not close a
+    transport it was given; close it, or use it as an async context
+    manager, once the clients using it are done. Subclasses must implement
+    request().
+    """
+
+    @abc.abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: Any,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        ssl: bool = True,
+        trace_request_ctx: Optional[Any] = None,
+    ) -> Any:
+        """
+        Send a request.
+
+        Args:
+
+        method: The HTTP method.
+
+        url: The yarl URL.
+
+        data: The request body.
+
+        headers: The request headers.
+
+        ssl: Whether to verify the SSL certificate.
+
+        trace_request_ctx: The RequestStats of the call, None when not tracing.
+
+        Returns:
+            The response.
+        """
+
+    async def close(self) -> None:
+        """Release the transport's resources."""
+
+    async def __aenter__(self) -> "Transport":
+        """Async enter."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self.close()
+
+
+class RecordingTransport(Transport):
+    """
+    Transport sending requests over aiohttp and recording every exchange.
+
+    Each request and response is appended to the recording as one line of
+    JSON holding the method, path, request body, status, content type,
+    response body and latency. Names ending in .gz are gzip compressed.
+    Responses are read in full before they are returned, so streamed calls
+    are recorded too.
+
+    Args:
+
+    path: The file to write the recording to.
+
+    session: The aiohttp.ClientSession to use, one is created when None.
+    """
+
+    def __init__(self, path: str, session=None) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self.records = 0
+        self._session = session
+        self._close_session = False
+        self._file = _open(path, "w")
+
+    async def request(
+        self,
+        method: str,
+        url: Any,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        ssl: bool = True,
+        trace_request_ctx: Optional[Any] = None,
+    ) -> ReplayResponse:
+        """Send a request, record the exchange and return the response read into memory."""
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession()
+            self._close_session = True
+
+        started = time.perf_counter()
+        response = await self._session.request(
+            method, url, data=data, headers=headers, ssl=ssl, trace_request_ctx=trace_request_ctx
+        )
+        try:
+            body = await response.read()
+        finally:
+            response.release()
+        latency = time.perf_counter() - started
+
+        content_type = response.headers.get("Content-Type", "")
+        self._file.write(json.dumps({
+            "method": method,
+            "path": url.path_qs,
+            "data": _body(data),
+            "status": response.status,
+            "content_type": content_type,
+            "body": body.decode("utf8"),
+            "latency": round(latency, 6),
+        }, separators=(",", ":")) + "\n")
+        self.records += 1
+
+        return ReplayResponse(response.status, content_type, body)
+
+    async def close(self) -> None:
+        """Close the recording and the session, if it was created here."""
+        if not self._file.closed:
+            self._file.close()
+        if self._session is not None and self._close_session:
+            await self._session.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport serving responses from a recording, without a network.
+
+    Requests are matched on method, path and body. Repeated requests get
+    the recorded responses for that request in order, starting over once
+    they run out when loop is set. Each response is delayed by its recorded
+    latency multiplied by latency_scale.
+
+    Args:
+
+    path: The recording written by RecordingTransport.
+
+    latency_scale: Multiplier for recorded latencies; 0 replays without delay.
+
+    loop: Whether to start over when the responses of a request run out.
+
+    Attributes:
+
+    requests: The number of requests served.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0, loop: bool = True) -> None:
+        """Initialize the replayer."""
+        self.latency_scale = latency_scale
+        self.loop = loop
+        self.requests = 0
+        self._recorded: Dict[RecordKey, List[dict]] = {}
+        self._pending: Dict[RecordKey, Deque[dict]] = {}
+
+        with _open(path, "r") as fptr:
+            for line in fptr:
+                if line.strip():
+                    record = json.loads(line)
+                    key = (record["method"], record["path"], record["data"])
+                    self._recorded.setdefault(key, []).append(record)
+
+    def __len__(self) -> int:
+        """The number of recorded exchanges."""
+        return sum(len(records) for records in self._recorded.values())
+
+    async def request(
+        self,
+        method: str,
+        url: Any,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        ssl: bool = True,
+        trace_request_ctx: Optional[Any] = None,
+    ) -> ReplayResponse:
+        """Return the next recorded response for the request."""
+        key = (method, url.path_qs, _body(data))
+        recorded = self._recorded.get(key)
+        if not recorded:
+            raise UnmanicError(f"No recorded response for {method} {url.path_qs}")
+
+        pending = self._pending.get(key)
+        if not pending:
+            if pending is not None and not self.loop:
+                raise UnmanicError(f"Recorded responses for {method} {url.path_qs} exhausted")
+            pending = self._pending[key] = deque(recorded)
+        record = pending.popleft()
+
+        delay = record["latency"] * self.latency_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self.requests += 1
+        return ReplayResponse(record["status"], record["content_type"], record["body"].encode("utf8"))
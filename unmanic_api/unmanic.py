@@ -1,14 +1,35 @@
 """Asynchronous Python client for Unmanic."""
-from typing import Dict, List, Optional, Type
+from concurrent.futures import Executor
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, Iterable, List, Optional, Type, Union
 from aiohttp.client import ClientSession
+import asyncio
+import dataclasses
+import datetime
 import json
+import os
+import time
 
-from .client import Client
-from .exceptions import UnmanicError
+from .capabilities import Capabilities
+from .bulk import BulkProgress, BulkReport, Items, PruneReport, TaskOutcome, iterate, submit_batches
+from .client import DEFAULT_DECODE_THRESHOLD, Client
+from .scheduling import Cost, ReorderPlan, chunks, history_extension_costs, plan_reorder
+from .exceptions import (
+    UnmanicBadRequestRequestedEndpointNotFoundError,
+    UnmanicBadRequestRequestedMethodNotAllowedError,
+    UnmanicError,
+    UnmanicUnsupportedOperationError,
+)
+from .metrics import MetricsRegistry
+from .streaming import PagedTasks, TaskStream
+from .tracing import Tracer
+from .transport import Transport
+from .watcher import TaskWatcher
 
 from .models import (
     Worker,
     Settings,
+    Snapshot,
     PendingTask,
     TaskQueue,
     CompletedTask,
@@ -16,6 +37,22 @@ from .models import (
 )
 
 
+# Parsers handed to _request, which may run them in a process pool, so they
+# are module level. Only the model parsing is guarded, not the request.
+def _parse_task_queue(data) -> TaskQueue:
+    try:
+        return TaskQueue.from_dict(data)
+    except TypeError:
+        raise UnmanicError("Unable to get pending tasks, type error, no results")
+
+
+def _parse_task_history(data) -> TaskHistory:
+    try:
+        return TaskHistory.from_dict(data)
+    except TypeError:
+        raise UnmanicError("Unable to get task history, type error, no results")
+
+
 class Unmanic(Client):
     """
     Main class for Python API.
@@ -37,6 +74,19 @@ class Unmanic(Client):
     verify_ssl: Whether to verify the SSL certificate.
 
     user_agent: The user agent to use.
+
+    decode_threshold: Response size in bytes above which JSON is decoded and
+        parsed off the event loop. None keeps all decoding inline.
+
+    decode_executor: The executor used for large responses, e.g. a
+        ProcessPoolExecutor. Defaults to the loop's thread pool.
+
+    tracer: A Tracer collecting per-call timings, None disables tracing.
+
+    metrics: A MetricsRegistry recording counts, errors, latency and bytes per endpoint.
+
+    transport: A Transport sending requests instead of the aiohttp session,
+        e.g. a RecordingTransport or ReplayTransport.
     """
 
     def __init__(
@@ -49,6 +99,11 @@ class Unmanic(Client):
         tls: bool = False,
         verify_ssl: bool = True,
         user_agent: str = None,
+        decode_threshold: Optional[int] = DEFAULT_DECODE_THRESHOLD,
+        decode_executor: Optional[Executor] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        transport: Optional[Transport] = None,
     ) -> None:
         """Initilize connection with Unmanic"""
         super().__init__(
@@ -60,7 +115,48 @@ class Unmanic(Client):
             tls=tls,
             verify_ssl=verify_ssl,
             user_agent=user_agent,
+            decode_threshold=decode_threshold,
+            decode_executor=decode_executor,
+            tracer=tracer,
+            metrics=metrics,
+            transport=transport,
         )
+        self._scan: Optional[asyncio.Future] = None
+        self._watcher: Optional[TaskWatcher] = None
+        self._capabilities = Capabilities()
+
+    async def get_capabilities(self) -> Capabilities:
+        """
+        Get what the server supports, detecting its version on first use
+
+        Returns:
+            Capabilities: The cached capabilities of the server.
+        """
+        return await self._capabilities.detect(self)
+
+    async def _negotiated_request(self, operation: str, data: Optional[str] = None):
+        """
+        Send an operation listed in capabilities.OPERATIONS.
+
+        Endpoints answering 404 or 405 are remembered and the next listed
+        one, if any, is tried; when none is left,
+        UnmanicUnsupportedOperationError is raised, and later calls raise it
+        without a round trip. The server version is only read when one of
+        the operation's endpoints declares a min_version.
+        """
+        capabilities = self._capabilities
+        if capabilities.version_gated(operation):
+            await capabilities.detect(self)
+        while True:
+            endpoint = capabilities.endpoint(operation)
+            try:
+                return await self._request(endpoint.uri, method=endpoint.method, data=data)
+            except (UnmanicBadRequestRequestedEndpointNotFoundError, UnmanicBadRequestRequestedMethodNotAllowedError) as exception:
+                capabilities.mark_unsupported(endpoint)
+                if not capabilities.supports(operation):
+                    raise UnmanicUnsupportedOperationError(
+                        f"Unable to {operation.replace('_', ' ')}, not supported by this server"
+                    ) from exception
 
     async def get_installation_name(self) -> str:
         """
@@ -265,6 +361,57 @@ class Unmanic(Client):
         except UnmanicError as e:
             raise UnmanicError(f"Unable to set worker count: {e}")
 
+    async def get_snapshot(self, queue_length=10, history_length=10, timeout=5.0, section_timeouts: Optional[Dict[str, float]] = None) -> Snapshot:
+        """
+        Get version, settings, workers, queue head and history head at once
+
+        The five calls run concurrently, so the snapshot takes as long as
+        the slowest section rather than the sum. Each section is bounded by
+        timeout, or by its own entry in section_timeouts if lower; a section
+        that fails or runs out of time is left None and the rest are still
+        returned.
+
+        Args:
+
+        queue_length: The number of pending tasks in the queue head.
+
+        history_length: The number of completed tasks in the history head.
+
+        timeout: Seconds the whole snapshot may take.
+
+        section_timeouts: Seconds per section, keyed by version, settings,
+            workers, queue or history.
+
+        Returns:
+            Snapshot: The sections, with timings and errors.
+        """
+        section_timeouts = section_timeouts or {}
+        sections = {
+            "version": self.get_version(),
+            "settings": self.get_settings(),
+            "workers": self.get_workers_status(),
+            "queue": self.get_pending_tasks(length=queue_length),
+            "history": self.get_task_history(length=history_length),
+        }
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        async def section(name: str, call):
+            limit = min(timeout, section_timeouts.get(name, timeout))
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(call, limit)
+            except asyncio.TimeoutError:
+                errors[name] = f"Timed out after {limit} seconds"
+            except UnmanicError as exception:
+                errors[name] = f"{type(exception).__name__}: {exception.args[0] if exception.args else ''}"
+            finally:
+                timings[name] = time.perf_counter() - started
+            return None
+
+        results = await asyncio.gather(*(section(name, call) for name, call in sections.items()))
+        return Snapshot(**dict(zip(sections, results)), timings=timings, errors=errors)
+
     async def trigger_library_scan(self) -> bool:
         """
         Trigger library scan
@@ -280,6 +427,60 @@ class Unmanic(Client):
         except TypeError:
             raise UnmanicError("Unable to trigger library scan, type error, no results")
 
+    async def scan_and_wait(self, stable_for=10.0, timeout=600.0, min_interval=0.5, max_interval=5.0) -> int:
+        """
+        Trigger a library scan and wait until the pending queue stops growing
+
+        recordsTotal of the pending queue is polled, backing off from
+        min_interval to max_interval while it is unchanged and starting over
+        when it changes, until it has been stable for stable_for seconds.
+        Calls made while a scan is being waited on do not trigger another
+        scan; they wait for the same one.
+
+        Args:
+
+        stable_for: Seconds recordsTotal must stay unchanged.
+
+        timeout: Seconds to wait at most.
+
+        min_interval: Seconds between polls while the queue changes.
+
+        max_interval: The longest wait between polls.
+
+        Returns:
+            int: The change in the number of pending tasks, i.e. the tasks
+            added by the scan less any that were processed meanwhile.
+        """
+        if self._scan is None or self._scan.done():
+            self._scan = asyncio.ensure_future(self._scan_and_wait(stable_for, timeout, min_interval, max_interval))
+        return await asyncio.shield(self._scan)
+
+    async def _scan_and_wait(self, stable_for: float, timeout: float, min_interval: float, max_interval: float) -> int:
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+
+        baseline = (await self.get_pending_tasks(length=1)).recordsTotal
+        if not await self.trigger_library_scan():
+            raise UnmanicError("Unable to trigger library scan, rejected by server")
+
+        total = baseline
+        changed_at = loop.time()
+        interval = min_interval
+        while loop.time() - changed_at < stable_for:
+            if loop.time() >= deadline:
+                raise UnmanicError(f"Library scan did not settle within {timeout} seconds")
+            await asyncio.sleep(min(interval, max(0.0, deadline - loop.time())))
+
+            latest = (await self.get_pending_tasks(length=1)).recordsTotal
+            if latest != total:
+                total = latest
+                changed_at = loop.time()
+                interval = min_interval
+            else:
+                interval = min(interval * 2, max_interval)
+
+        return total - baseline
+
     async def get_pending_tasks(self, start=0, length=10, search_value="", order_by="priority", order_direction="desc") -> List[PendingTask]:
         """
         Get pending tasks
@@ -287,11 +488,29 @@ class Unmanic(Client):
         Returns:
             Dict: TaskQueue
         """
-        results = await self._request("v2/pending/tasks", method='POST', data=json.dumps({'start': start, 'length': length, 'search_value': search_value, 'order_by': order_by, 'order_direction': order_direction}))
-        try:
-            return TaskQueue.from_dict(results)
-        except TypeError:
-            raise UnmanicError("Unable to get pending tasks, type error, no results")
+        return await self._request("v2/pending/tasks", method='POST', data=json.dumps({'start': start, 'length': length, 'search_value': search_value, 'order_by': order_by, 'order_direction': order_direction}), parser=_parse_task_queue)
+
+    async def get_all_pending_tasks(self, length=500, search_value="", order_by="priority", order_direction="desc") -> TaskQueue:
+        """
+        Get the whole pending queue in one request
+
+        Offset pages overlap or skip tasks when the queue changes between
+        them, so the queue is read whole instead: the first request asks for
+        length tasks and, while recordsFiltered is larger, the next asks for
+        all of them.
+
+        Args:
+
+        length: Tasks requested by the first read.
+
+        Returns:
+            TaskQueue: One consistent snapshot of the matching tasks.
+        """
+        while True:
+            queue = await self.get_pending_tasks(length=length, search_value=search_value, order_by=order_by, order_direction=order_direction)
+            if len(queue.results) < length or len(queue.results) >= (queue.recordsFiltered or 0):
+                return queue
+            length = max(queue.recordsFiltered, 2 * length)
 
     async def get_task_history(self, start=0, length=10, search_value="", order_by="finish_time", order_direction="desc") -> List[CompletedTask]:
         """
@@ -300,11 +519,610 @@ class Unmanic(Client):
         Returns:
             Dict: TaskHistory
         """
-        results = await self._request("v2/history/tasks", method='POST', data=json.dumps({'start': start, 'length': length, 'search_value': search_value, 'order_by': order_by, 'order_direction': order_direction}))
+        return await self._request("v2/history/tasks", method='POST', data=json.dumps({'start': start, 'length': length, 'search_value': search_value, 'order_by': order_by, 'order_direction': order_direction}), parser=_parse_task_history)
+
+    def stream_pending_tasks(self, start=0, length=10, search_value="", order_by="priority", order_direction="desc") -> TaskStream:
+        """
+        Stream pending tasks
+
+        Parses the response incrementally, yielding each PendingTask as soon
+        as it arrives, so memory stays flat however large length is.
+
+        Usage:
+            async with unmanic.stream_pending_tasks(length=100000) as queue:
+                async for task in queue:
+                    ...
+
+        Returns:
+            TaskStream: Async iterator of PendingTask
+        """
+        return TaskStream(self, "v2/pending/tasks", json.dumps({'start': start, 'length': length, 'search_value': search_value, 'order_by': order_by, 'order_direction': order_direction}), PendingTask.from_dict)
+
+    def stream_task_history(self, start=0, length=10, search_value="", order_by="finish_time", order_direction="desc") -> TaskStream:
+        """
+        Stream task history
+
+        Parses the response incrementally, yielding each CompletedTask as soon
+        as it arrives, so memory stays flat however large length is.
+
+        Usage:
+            async with unmanic.stream_task_history(length=100000) as history:
+                async for task in history:
+                    ...
+
+        Returns:
+            TaskStream: Async iterator of CompletedTask
+        """
+        return TaskStream(self, "v2/history/tasks", json.dumps({'start': start, 'length': length, 'search_value': search_value, 'order_by': order_by, 'order_direction': order_direction}), CompletedTask.from_dict)
+
+    def iter_pending_tasks(self, page_size=500, search_value="", order_by="id", order_direction="asc") -> PagedTasks:
+        """
+        Iterate over all pending tasks, page by page
+
+        Ordering by id ascending keeps pages stable while new tasks are added.
+
+        Usage:
+            async for task in unmanic.iter_pending_tasks():
+                ...
+
+        Returns:
+            PagedTasks: Async iterator of PendingTask
+        """
+        return PagedTasks(
+            lambda start, length: self.get_pending_tasks(start=start, length=length, search_value=search_value, order_by=order_by, order_direction=order_direction),
+            page_size=page_size,
+        )
+
+    def iter_task_history(self, page_size=500, search_value="", order_by="id", order_direction="asc") -> PagedTasks:
+        """
+        Iterate over all completed tasks, page by page
+
+        Ordering by id ascending keeps pages stable while new tasks complete.
+
+        Usage:
+            async for task in unmanic.iter_task_history():
+                ...
+
+        Returns:
+            PagedTasks: Async iterator of CompletedTask
+        """
+        return PagedTasks(
+            lambda start, length: self.get_task_history(start=start, length=length, search_value=search_value, order_by=order_by, order_direction=order_direction),
+            page_size=page_size,
+        )
+
+    async def reprocess_history_tasks(self, id_list: List[int], library_id: Optional[int] = None) -> bool:
+        """
+        Add completed tasks back to the pending queue
+
+        Args:
+
+        id_list: The ids of the completed tasks.
+
+        library_id: The library to add them to, the task's own library if None.
+
+        Returns:
+            bool: True if successful.
+        """
+        data = {"id_list": list(id_list)}
+        if library_id is not None:
+            data["library_id"] = library_id
+        results = await self._negotiated_request("reprocess_history_tasks", json.dumps(data))
+        try:
+            return results['success']
+        except KeyError:
+            raise UnmanicError("Unable to reprocess tasks, key not found")
+        except TypeError:
+            raise UnmanicError("Unable to reprocess tasks, type error, no results")
+
+    async def requeue_failed_tasks(self, library_id: Optional[int] = None, search_value="", batch_size=100, concurrency=4, page_size=500) -> BulkReport:
+        """
+        Add every failed task in the history back to the pending queue
+
+        Failed ids are collected from the whole history, paged by id, before
+        the first batch is sent, so changes to the history while requeueing
+        cannot shift later pages.
+
+        Args:
+
+        library_id: The library to add them to, the task's own library if None.
+
+        search_value: Only requeue failed tasks matching this search.
+
+        batch_size: The maximum ids per request.
+
+        concurrency: The maximum number of requests in flight.
+
+        page_size: Tasks requested per history page.
+
+        Returns:
+            BulkReport: The outcome for every failed task id.
+        """
+        history = self.iter_task_history(page_size=page_size, search_value=search_value, order_by="id", order_direction="asc")
+        failed_ids = [task.id async for task in history if task.task_success is False]
+
+        return await submit_batches(
+            failed_ids,
+            lambda batch: self.reprocess_history_tasks(batch, library_id),
+            batch_size=batch_size,
+            concurrency=concurrency,
+        )
+
+    async def delete_history_tasks(self, id_list: List[int]) -> bool:
+        """
+        Delete completed tasks from the history
+
+        Args:
+
+        id_list: The ids of the completed tasks.
+
+        Returns:
+            bool: True if successful.
+        """
+        results = await self._negotiated_request("delete_history_tasks", json.dumps({"id_list": list(id_list)}))
+        try:
+            return results['success']
+        except KeyError:
+            raise UnmanicError("Unable to delete history tasks, key not found")
+        except TypeError:
+            raise UnmanicError("Unable to delete history tasks, type error, no results")
+
+    async def prune_task_history(
+        self,
+        older_than=None,
+        success: Optional[bool] = None,
+        label_pattern: Optional[str] = None,
+        search_value="",
+        dry_run=False,
+        batch_size=100,
+        concurrency=2,
+        rate: Optional[float] = None,
+        page_size=500,
+    ) -> PruneReport:
+        """
+        Delete completed tasks matching every given criterion
+
+        The history is read page by page and only the matching ids are kept.
+        They are deleted once the whole history has been read, as deleting
+        while paging would shift later pages and skip tasks.
+
+        Args:
+
+        older_than: A datetime.timedelta age or a datetime.datetime cutoff on finish_time.
+
+        success: Only tasks with this task_success, None for both.
+
+        label_pattern: Only tasks whose task_label matches this glob, e.g. "*.avi".
+
+        search_value: Server side search narrowing the history read.
+
+        dry_run: Only count the matching tasks.
+
+        batch_size: The maximum ids per delete request.
+
+        concurrency: The maximum number of delete requests in flight.
+
+        rate: The maximum delete requests per second, None for no limit.
+
+        page_size: Tasks requested per history page.
+
+        Returns:
+            PruneReport: The number of tasks scanned and matched, and the deletion outcome.
+        """
+        cutoff = older_than
+        if isinstance(older_than, datetime.timedelta):
+            cutoff = datetime.datetime.now() - older_than
+
+        scanned = 0
+        targets = []
+        async for task in self.iter_task_history(page_size=page_size, search_value=search_value):
+            scanned += 1
+            if cutoff is not None and task.finish_time >= cutoff:
+                continue
+            if success is not None and task.task_success is not success:
+                continue
+            if label_pattern is not None and not fnmatchcase(task.task_label or "", label_pattern):
+                continue
+            targets.append(task.id)
+
+        if dry_run:
+            return PruneReport(scanned=scanned, matched=len(targets), dry_run=True)
+
+        deleted = await submit_batches(
+            targets,
+            self.delete_history_tasks,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            rate=rate,
+        )
+        return PruneReport(scanned=scanned, matched=len(targets), dry_run=False, deleted=deleted)
+
+    async def create_pending_task(self, path: str, library_id: Optional[int] = None, priority_score: int = 0) -> bool:
+        """
+        Add a file to the pending queue
+
+        Args:
+
+        path: The absolute path of the file on the Unmanic server.
+
+        library_id: The library to add it to, the default library if None.
+
+        priority_score: Added to the task's priority.
+
+        Returns:
+            bool: True if successful.
+        """
+        data = {"path": path, "type": "local", "priority_score": priority_score}
+        if library_id is not None:
+            data["library_id"] = library_id
+        results = await self._negotiated_request("create_pending_task", json.dumps(data))
+        try:
+            return results['success']
+        except KeyError:
+            raise UnmanicError("Unable to create pending task, key not found")
+        except TypeError:
+            raise UnmanicError("Unable to create pending task, type error, no results")
+
+    async def enqueue_paths(
+        self,
+        paths: Items,
+        library_id: Optional[int] = None,
+        concurrency=8,
+        skip_queued=True,
+        progress: Optional[Callable[[BulkProgress], None]] = None,
+        page_size=500,
+    ) -> BulkReport:
+        """
+        Add many files to the pending queue without a library scan
+
+        Paths are consumed as they arrive, e.g. from bulk.scan_paths, and
+        submitted with at most concurrency requests in flight. The create
+        endpoint takes one path per request.
+
+        Usage:
+            await unmanic.enqueue_paths(scan_paths("/library/new", [".mkv"]))
+
+        Args:
+
+        paths: The paths on the Unmanic server, sync or async iterable.
+
+        library_id: The library to add them to, the default library if None.
+
+        concurrency: The maximum number of requests in flight.
+
+        skip_queued: Skip paths already pending, read from the queue first,
+            and repeats within paths.
+
+        progress: Called with a BulkProgress after every path.
+
+        page_size: Tasks requested per queue page when reading queued paths.
+
+        Returns:
+            BulkReport: The outcome per path, with the number skipped.
+        """
+        seen = set()
+        if skip_queued:
+            seen = {task.abspath async for task in self.iter_pending_tasks(page_size=page_size)}
+        skipped = 0
+
+        async def new_paths():
+            nonlocal skipped
+            async for path in iterate(paths):
+                if skip_queued:
+                    if path in seen:
+                        skipped += 1
+                        continue
+                    seen.add(path)
+                yield path
+
+        report = await submit_batches(
+            new_paths(),
+            lambda batch: self.create_pending_task(batch[0], library_id),
+            batch_size=1,
+            concurrency=concurrency,
+            progress=progress,
+        )
+        return dataclasses.replace(report, skipped=skipped)
+
+    async def delete_pending_tasks(self, id_list: List[int]) -> bool:
+        """
+        Remove tasks from the pending queue
+
+        Args:
+
+        id_list: The ids of the pending tasks.
+
+        Returns:
+            bool: True if successful.
+        """
+        results = await self._negotiated_request("delete_pending_tasks", json.dumps({"id_list": list(id_list)}))
+        try:
+            return results['success']
+        except KeyError:
+            raise UnmanicError("Unable to delete pending tasks, key not found")
+        except TypeError:
+            raise UnmanicError("Unable to delete pending tasks, type error, no results")
+
+    async def _resolve_pending(self, tasks: Union[Iterable[int], Callable[[PendingTask], bool]], search_value: str, page_size: int) -> List[int]:
+        """Resolve ids or a predicate over the queue to a list of ids."""
+        if not callable(tasks):
+            return list(tasks)
+        # Collected before any change is sent, as changes shift later pages.
+        return [task.id async for task in self.iter_pending_tasks(page_size=page_size, search_value=search_value) if tasks(task)]
+
+    async def remove_pending_tasks(
+        self,
+        tasks: Union[Iterable[int], Callable[[PendingTask], bool]],
+        search_value="",
+        batch_size=500,
+        concurrency=2,
+        retries=3,
+        page_size=500,
+    ) -> BulkReport:
+        """
+        Remove many tasks from the pending queue in batches
+
+        Usage:
+            await unmanic.remove_pending_tasks(lambda task: task.abspath.endswith(".nfo"))
+
+        Args:
+
+        tasks: The ids to remove, or a predicate selecting PendingTasks from the queue.
+
+        search_value: Server side search narrowing the queue read for a predicate.
+
+        batch_size: The maximum ids per request.
+
+        concurrency: The maximum number of requests in flight.
+
+        retries: Extra attempts for batches failing with connection or server errors.
+
+        page_size: Tasks requested per queue page for a predicate.
+
+        Returns:
+            BulkReport: The outcome for every id.
+        """
+        id_list = await self._resolve_pending(tasks, search_value, page_size)
+        return await submit_batches(
+            id_list,
+            self.delete_pending_tasks,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            retries=retries,
+        )
+
+    async def set_pending_priority(
+        self,
+        tasks: Union[Iterable[int], Callable[[PendingTask], bool]],
+        position: str = "top",
+        search_value="",
+        batch_size=500,
+        retries=3,
+        page_size=500,
+    ) -> BulkReport:
+        """
+        Move many pending tasks to the top or bottom of the queue in batches
+
+        Unmanic raises the priority of tasks moved to the top above every
+        other task and sets that of tasks moved to the bottom to 0, so their
+        order among themselves is not set here; use optimize_pending_queue
+        to put the queue in a given order.
+
+        Args:
+
+        tasks: The ids to move, or a predicate selecting PendingTasks from the queue.
+
+        position: "top" or "bottom".
+
+        search_value: Server side search narrowing the queue read for a predicate.
+
+        batch_size: The maximum ids per request.
+
+        retries: Extra attempts for batches failing with connection or server errors.
+
+        page_size: Tasks requested per queue page for a predicate.
+
+        Returns:
+            BulkReport: The outcome for every id.
+        """
+        if position not in ("top", "bottom"):
+            raise UnmanicError(f"Unable to reorder pending tasks, unknown position {position}")
+
+        id_list = await self._resolve_pending(tasks, search_value, page_size)
+        report = await submit_batches(
+            chunks(id_list, batch_size),
+            lambda batch: self.reorder_pending_tasks(batch[0], position),
+            batch_size=1,
+            concurrency=1,
+            retries=retries,
+        )
+        outcomes = [TaskOutcome(task_id, outcome.success, outcome.error) for outcome in report.outcomes for task_id in outcome.id]
+        return dataclasses.replace(report, outcomes=outcomes)
+
+    @property
+    def watcher(self) -> TaskWatcher:
+        """The TaskWatcher shared by every process_and_wait call on this client."""
+        if self._watcher is None:
+            self._watcher = TaskWatcher(self)
+        return self._watcher
+
+    async def process_and_wait(self, path: str, library_id: Optional[int] = None, timeout: Optional[float] = None) -> CompletedTask:
+        """
+        Queue a file and wait until it has been processed
+
+        The file is added to the pending queue unless it is already there,
+        then followed through the queue into the history by the client's
+        shared watcher, so concurrent waits share one poll loop.
+
+        Args:
+
+        path: The absolute path of the file on the Unmanic server.
+
+        library_id: The library to add it to, the default library if None.
+
+        timeout: Seconds to wait at most, None to wait indefinitely.
+
+        Returns:
+            CompletedTask: The history entry; check task_success.
+        """
+        watch = await self.watcher.register(path)
+        try:
+            if not await self.create_pending_task(path, library_id):
+                # Rejected, usually because the file is queued already; confirm it is.
+                queued = await self.get_pending_tasks(length=1, search_value=path)
+                if not any(task.abspath == path for task in queued.results):
+                    raise UnmanicError(f"Unable to queue {path}, rejected by server")
+        except BaseException:
+            self.watcher.discard(watch)
+            raise
+        return await self.watcher.result(watch, timeout)
+
+    async def process_many_and_wait(
+        self,
+        paths: List[str],
+        library_id: Optional[int] = None,
+        timeout: Optional[float] = None,
+        concurrency=8,
+    ) -> Dict[str, Optional[CompletedTask]]:
+        """
+        Queue many files and wait until they have been processed
+
+        Args:
+
+        paths: The absolute paths of the files on the Unmanic server.
+
+        library_id: The library to add them to, the default library if None.
+
+        timeout: Seconds to wait at most for all of them, None to wait indefinitely.
+
+        concurrency: The maximum number of queueing requests in flight.
+
+        Returns:
+            Dict: The history entry per path, None for paths that could not be
+            queued, share their file name with an earlier path, or had not
+            finished by the timeout.
+        """
+        results: Dict[str, Optional[CompletedTask]] = {path: None for path in paths}
+
+        # History only records file names, so of several paths sharing one,
+        # only the first can be followed.
+        names = set()
+        watched = []
+        for path in results:
+            name = os.path.basename(path)
+            if name not in names:
+                names.add(name)
+                watched.append(path)
+
+        watches = dict(zip(watched, await self.watcher.register_many(watched)))
+        waits = {}
+        try:
+            report = await self.enqueue_paths(watched, library_id, concurrency=concurrency)
+            for path in report.failed:
+                self.watcher.discard(watches.pop(path))
+            waits = {path: asyncio.ensure_future(self.watcher.result(watch, timeout)) for path, watch in watches.items()}
+            await asyncio.gather(*waits.values(), return_exceptions=True)
+        finally:
+            for watch in watches.values():
+                self.watcher.discard(watch)
+            for wait in waits.values():
+                wait.cancel()
+
+        for path, wait in waits.items():
+            if not wait.cancelled() and wait.exception() is None:
+                results[path] = wait.result()
+        return results
+
+    async def reorder_pending_tasks(self, id_list: List[int], position: str = "top") -> bool:
+        """
+        Move pending tasks to the top or bottom of the queue
+
+        Args:
+
+        id_list: The ids of the pending tasks; their order is not kept.
+
+        position: "top" or "bottom".
+
+        Returns:
+            bool: True if successful.
+        """
+        if position not in ("top", "bottom"):
+            raise UnmanicError(f"Unable to reorder pending tasks, unknown position {position}")
+        results = await self._negotiated_request("reorder_pending_tasks", json.dumps({"id_list": list(id_list), "position": position}))
         try:
-            return TaskHistory.from_dict(results)
+            return results['success']
+        except KeyError:
+            raise UnmanicError("Unable to reorder pending tasks, key not found")
         except TypeError:
-            raise UnmanicError("Unable to get task history, type error, no results")
+            raise UnmanicError("Unable to reorder pending tasks, type error, no results")
+
+    async def get_extension_costs(self, length=1000, max_gap=3600.0) -> Dict[str, float]:
+        """
+        Estimate the seconds per file of each extension from recent history
+
+        Usage:
+            costs = await unmanic.get_extension_costs()
+            await unmanic.optimize_pending_queue(extension_cost(costs))
+
+        Args:
+
+        length: The number of most recently finished tasks to use.
+
+        max_gap: The longest gap in seconds between tasks counted as processing.
+
+        Returns:
+            Dict: Seconds per file by lower case extension, for extension_cost.
+        """
+        history, workers = await asyncio.gather(
+            self.get_task_history(length=length, order_by="finish_time", order_direction="desc"),
+            self.get_workers_count(),
+        )
+        return history_extension_costs(history.results, workers=workers or 1, max_gap=max_gap)
+
+    async def optimize_pending_queue(self, cost: Cost, dry_run=False, page_size=500) -> ReorderPlan:
+        """
+        Reorder the pending queue by ascending cost, e.g. shortest job first
+
+        The whole queue is read, every task scored with cost, and the tasks
+        before the longest already correctly ordered tail are moved to the
+        top, one request each, since Unmanic gives every task in a request
+        the same priority boost.
+        Costs are computed in the default executor, as they may touch the
+        filesystem.
+
+        Usage:
+            await unmanic.optimize_pending_queue(file_size_cost({"/library": "/mnt/media"}))
+
+        Args:
+
+        cost: Callable scoring a PendingTask, lower runs first.
+
+        dry_run: Only plan the moves.
+
+        page_size: Tasks requested by the first queue read. A larger queue is
+            read again whole, in one request, so the plan starts from a
+            consistent snapshot.
+
+        Returns:
+            ReorderPlan: The desired order, the moves and the number of requests sent.
+        """
+        # Tasks often share a priority, and offset pages can then overlap or
+        # miss some; one read of the whole queue gives a consistent order.
+        tasks = (await self.get_all_pending_tasks(length=page_size)).results
+
+        loop = asyncio.get_event_loop()
+        costs = await loop.run_in_executor(None, lambda: [cost(task) for task in tasks])
+
+        plan = plan_reorder([task.id for task in tasks], costs, [task.priority for task in tasks])
+        if dry_run:
+            return plan
+
+        # Each top request lands above the previous one, so send the last task first.
+        for task_id in reversed(plan.top):
+            if not await self.reorder_pending_tasks([task_id], "top"):
+                raise UnmanicError("Unable to reorder pending tasks, rejected by server")
+
+        return dataclasses.replace(plan, batches=len(plan.top))
 
     async def __aenter__(self) -> "Unmanic":
         """Async enter."""
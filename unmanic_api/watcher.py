@@ -0,0 +1,244 @@
+"""Shared watcher resolving waits for files to finish processing."""
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from .exceptions import UnmanicError
+from .models import CompletedTask
+from .queue_index import QueueIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Watch:
+    """
+    One registered wait for a path.
+
+    Attributes:
+
+    path: The absolute path of the file.
+
+    after: The newest history id when the wait was registered; only later
+        history entries can resolve it.
+
+    future: Resolved with the CompletedTask.
+    """
+
+    __slots__ = ("path", "after", "future")
+
+    def __init__(self, path: str, after: int, future: asyncio.Future) -> None:
+        self.path = path
+        self.after = after
+        self.future = future
+
+
+class TaskWatcher:
+    """
+    Single poll loop serving every outstanding wait for a file to finish.
+
+    Registering a wait records the newest history id on the server, so
+    only tasks finished after it count, whatever the clocks of client and
+    server say. Each poll reads the pending queue once, into a QueueIndex,
+    and the task history newest id first down to the oldest registration.
+    Unmanic history only labels tasks with the file name, so a wait
+    resolves with the first later history task whose task_label is the
+    file's name, once the file is no longer pending, and two paths with
+    the same file name cannot be waited on at once. Any number of waits
+    therefore costs one queue read and one short history read per
+    interval. The loop runs only while waits are outstanding.
+
+    Args:
+
+    unmanic: The Unmanic client.
+
+    interval: Seconds between polls.
+
+    page_size: Tasks requested per page.
+
+    track_pending: Whether to read the pending queue each poll, so a file
+        still queued is not matched while an earlier run of it finishes.
+        Disable for very large queues.
+    """
+
+    def __init__(self, unmanic, interval: float = 2.0, page_size: int = 500, track_pending: bool = True) -> None:
+        """Initialize the watcher."""
+        self._unmanic = unmanic
+        self.interval = interval
+        self._page_size = page_size
+        self._index = QueueIndex(unmanic, page_size) if track_pending else None
+        self._waits: Dict[str, List[Watch]] = {}
+        self._names: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+
+    @property
+    def outstanding(self) -> int:
+        """The number of waits not yet resolved."""
+        return sum(len(waits) for waits in self._waits.values())
+
+    def status(self, path: str) -> Optional[str]:
+        """
+        The last known state of a watched path.
+
+        Returns:
+            str: "pending" while queued, "waiting" otherwise, None if not watched.
+        """
+        if path not in self._waits:
+            return None
+        if self._index is not None and path in self._index:
+            return "pending"
+        return "waiting"
+
+    async def _newest_id(self) -> int:
+        history = await self._unmanic.get_task_history(length=1, order_by="id", order_direction="desc")
+        return max((task.id for task in history.results), default=0)
+
+    async def register(self, path: str) -> Watch:
+        """
+        Start watching a path; register before queueing the file.
+
+        Args:
+
+        path: The absolute path of the file, as queued.
+
+        Returns:
+            Watch: The registration, to pass to result().
+        """
+        return (await self.register_many([path]))[0]
+
+    async def register_many(self, paths: Iterable[str]) -> List[Watch]:
+        """
+        Start watching several paths with one history read.
+
+        Args:
+
+        paths: The absolute paths of the files, as queued.
+
+        Returns:
+            List: The Watch of each path, in order.
+        """
+        paths = list(paths)
+        after = await self._newest_id()
+
+        names = dict(self._names)
+        for path in paths:
+            name = os.path.basename(path)
+            if names.setdefault(name, path) != path:
+                raise UnmanicError(f"Unable to watch {path}, another file named {name} is being watched")
+
+        loop = asyncio.get_event_loop()
+        watches = []
+        for path in paths:
+            watch = Watch(path, after, loop.create_future())
+            self._waits.setdefault(path, []).append(watch)
+            watches.append(watch)
+        self._names = names
+
+        if watches and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+        return watches
+
+    async def result(self, watch: Watch, timeout: Optional[float] = None) -> CompletedTask:
+        """
+        Wait for a registered path's task to finish.
+
+        Cancelling the caller cancels only its own wait.
+
+        Args:
+
+        watch: The registration.
+
+        timeout: Seconds to wait at most, None to wait indefinitely.
+
+        Returns:
+            CompletedTask: The history entry of the finished task; check task_success.
+        """
+        try:
+            return await asyncio.wait_for(watch.future, timeout)
+        except asyncio.TimeoutError:
+            raise UnmanicError(f"Timed out waiting for {watch.path} to be processed")
+        finally:
+            self.discard(watch)
+
+    async def wait(self, path: str, timeout: Optional[float] = None) -> CompletedTask:
+        """
+        Wait for a file's task to finish.
+
+        Only tasks finished after this call count, so queue the file after
+        calling it, or use register() and result().
+
+        Args:
+
+        path: The absolute path of the file, as queued.
+
+        timeout: Seconds to wait at most, None to wait indefinitely.
+
+        Returns:
+            CompletedTask: The history entry of the finished task; check task_success.
+        """
+        return await self.result(await self.register(path), timeout)
+
+    async def close(self) -> None:
+        """Stop polling and cancel every outstanding wait."""
+        for waits in list(self._waits.values()):
+            for watch in waits:
+                watch.future.cancel()
+        self._waits = {}
+        self._names = {}
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def discard(self, watch: Watch) -> None:
+        """Stop watching for a registration, e.g. when its file could not be queued."""
+        if not watch.future.done():
+            watch.future.cancel()
+        waits = self._waits.get(watch.path)
+        if waits is not None and watch in waits:
+            waits.remove(watch)
+            if not waits:
+                del self._waits[watch.path]
+                del self._names[os.path.basename(watch.path)]
+
+    async def _run(self) -> None:
+        while self._waits:
+            try:
+                await self.poll()
+            except UnmanicError as exception:
+                _LOGGER.warning("Unable to poll Unmanic for finished tasks: %s", exception)
+            if self._waits:
+                await asyncio.sleep(self.interval)
+
+    async def poll(self) -> None:
+        """Poll once, resolving the waits whose tasks have finished."""
+        self.polls += 1
+        if self._index is not None:
+            await self._index.refresh()
+
+        # Paths waited on and not queued any more, by file name.
+        candidates: Dict[str, str] = {}
+        for path in self._waits:
+            if self._index is None or path not in self._index:
+                candidates[os.path.basename(path)] = path
+        if not candidates:
+            return
+
+        oldest = min(watch.after for waits in self._waits.values() for watch in waits)
+        history = self._unmanic.iter_task_history(page_size=self._page_size, order_by="id", order_direction="desc")
+        finished = []
+        async for task in history:
+            if task.id <= oldest:
+                break
+            if task.task_label in candidates:
+                finished.append(task)
+
+        # Oldest first, so each wait gets the first run finished after it.
+        for task in reversed(finished):
+            for watch in self._waits.get(candidates[task.task_label], []):
+                if watch.after < task.id and not watch.future.done():
+                    watch.future.set_result(task)